@@ -13,14 +13,18 @@ app.autodiscover_tasks([
     "propertylist_app.notifications",
 ])
 
-# Register compatibility bridge task names.
-app.conf.imports = tuple(app.conf.get("imports", ())) + ("notifications.tasks",)
+# Register compatibility bridge task names, and task modules autodiscovery misses.
+app.conf.imports = tuple(app.conf.get("imports", ())) + (
+    "notifications.tasks",
+    "propertylist_app.tasks_webhooks",
+)
 
 app.conf.beat_schedule = {
     # Notifications
-    "send-due-notifications-every-minute": {
+    # reconciliation only: queued emails are dispatched by their Celery ETA
+    "send-due-notifications-every-5-minutes": {
         "task": "notifications.tasks.send_due_notifications",
-        "schedule": crontab(minute="*"),
+        "schedule": crontab(minute="*/5"),
     },
     "notify-listing-expiring-daily-7am": {
         "task": "notifications.tasks.notify_listing_expiring",
@@ -36,6 +40,12 @@ app.conf.beat_schedule = {
         "schedule": crontab(minute=0),
     },
 
+    # Payments
+    "sweep-stripe-webhooks-every-5-minutes": {
+        "task": "propertylist_app.sweep_stripe_webhooks",
+        "schedule": crontab(minute="*/5"),
+    },
+
     # Listings & accounts
     "expire-paid-listings-daily-03:00": {
         "task": "propertylist_app.expire_paid_listings",
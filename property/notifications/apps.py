@@ -20,9 +20,10 @@ def ensure_notification_periodic_tasks(**kwargs) -> None:
 
     tz = getattr(settings, "TIME_ZONE", "UTC")
 
-    # Every minute
-    every_minute, _ = CrontabSchedule.objects.get_or_create(
-        minute="*",
+    # Every 5 minutes: only a reconciliation pass, queued emails are sent by
+    # their Celery ETA (notifications/services.py)
+    every_5_minutes, _ = CrontabSchedule.objects.get_or_create(
+        minute="*/5",
         hour="*",
         day_of_week="*",
         day_of_month="*",
@@ -30,11 +31,12 @@ def ensure_notification_periodic_tasks(**kwargs) -> None:
         timezone=tz,
     )
 
+    PeriodicTask.objects.filter(name="send-due-notifications-every-minute").delete()
     PeriodicTask.objects.update_or_create(
-        name="send-due-notifications-every-minute",
+        name="send-due-notifications-every-5-minutes",
         defaults={
             "task": "notifications.tasks.send_due_notifications",
-            "crontab": every_minute,
+            "crontab": every_5_minutes,
             "enabled": True,
             "queue": "celery",
             "routing_key": "celery",
@@ -1,6 +1,8 @@
+import logging
 from urllib.parse import quote
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
 from django.db import transaction
 from django.template import Context, Template
@@ -8,6 +10,8 @@ from django.utils import timezone
 
 from .models import NotificationTemplate, OutboundNotification, DeliveryAttempt
 
+logger = logging.getLogger(__name__)
+
 
 def send_mail(subject, message, from_email, recipient_list, *, html_message=None):
     """
@@ -107,6 +111,42 @@ class EmailTransport:
         return {"sent": sent}
 
 
+# ---------------------------------------------------------------------
+# Delay queue
+#
+# Each queued email notification is registered as a Celery task with
+# eta=scheduled_for (dispatch_notification), so it goes out when it is due
+# rather than on the next minute tick. A cache key per (notification,
+# scheduled_for) dedupes registrations. Celery ETAs are only used up to
+# NOTIFICATION_ETA_HORIZON_SECONDS ahead (brokers redeliver long-held ETA
+# messages); send_due_notifications registers later ones as they come into
+# range and delivers anything whose registration was lost.
+# ---------------------------------------------------------------------
+
+
+def eta_horizon() -> int:
+    return int(getattr(settings, "NOTIFICATION_ETA_HORIZON_SECONDS", 3600))
+
+
+def dispatch_grace() -> int:
+    """How long a registered notification may be overdue before the minute scan delivers it."""
+    return int(getattr(settings, "NOTIFICATION_DISPATCH_GRACE_SECONDS", 120))
+
+
+def _eta_key(notification_id: int, scheduled_for) -> str:
+    return f"notifications:eta:{notification_id}:{int(scheduled_for.timestamp())}"
+
+
+def registered_notification_ids(rows) -> set:
+    """ids of (id, scheduled_for) rows that have a live delay-queue registration."""
+    keys = {_eta_key(pk, when): pk for pk, when in rows}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception:
+        return set()
+    return {keys[k] for k in found}
+
+
 class NotificationService:
     @staticmethod
     def _enrich_context(context_dict: dict) -> dict:
@@ -178,13 +218,70 @@ class NotificationService:
     @staticmethod
     def queue(user, template_key: str, context: dict, scheduled_for=None, channel="email"):
         scheduled_for = scheduled_for or timezone.now()
-        return OutboundNotification.objects.create(
+        notification = OutboundNotification.objects.create(
             user=user,
             template_key=template_key,
             context=context,
             scheduled_for=scheduled_for,
             channel=channel,
         )
+        transaction.on_commit(lambda: NotificationService.schedule(notification))
+        return notification
+
+    @staticmethod
+    def schedule(notification: OutboundNotification) -> bool:
+        """
+        Register the notification in the delay queue. Returns False when it is
+        left to send_due_notifications (not email, beyond the ETA horizon,
+        already registered, or the cache/broker is unavailable).
+        """
+        if notification.channel != NotificationTemplate.CHANNEL_EMAIL:
+            return False
+
+        delay = (notification.scheduled_for - timezone.now()).total_seconds()
+        if delay > eta_horizon():
+            return False
+
+        key = _eta_key(notification.pk, notification.scheduled_for)
+        try:
+            if not cache.add(key, 1, timeout=int(max(delay, 0)) + dispatch_grace()):
+                return False
+        except Exception:
+            return False
+
+        # imported here: the tasks module imports this one
+        from propertylist_app.notifications.tasks import dispatch_notification
+
+        try:
+            dispatch_notification.apply_async(args=[notification.pk], eta=notification.scheduled_for)
+        except Exception:
+            logger.warning("could not register notification %s for dispatch", notification.pk, exc_info=True)
+            cache.delete(key)
+            return False
+        return True
+
+    @staticmethod
+    def deliver_pending(notification_id: int, *, retry_failed: bool = False):
+        """
+        Deliver the notification if it is due and still pending, holding its row
+        lock so the dispatcher and the minute scan never both send it.
+        Returns the notification, or None if there was nothing to do.
+        """
+        pending = [OutboundNotification.STATUS_QUEUED]
+        if retry_failed:
+            pending.append(OutboundNotification.STATUS_FAILED)
+
+        with transaction.atomic():
+            notification = (
+                OutboundNotification.objects.select_for_update(of=("self",))
+                .select_related("user")
+                .filter(pk=notification_id, status__in=pending, scheduled_for__lte=timezone.now())
+                .first()
+            )
+            if notification is None:
+                return None
+            NotificationService.deliver(notification)
+        return notification
 
     @staticmethod
     @transaction.atomic
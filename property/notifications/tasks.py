@@ -7,11 +7,13 @@ Celery Beat uses:
 """
 
 from propertylist_app.notifications.tasks import (
+    dispatch_notification,
     send_due_notifications,
     notify_listing_expiring,
 )
 
 __all__ = (
+    "dispatch_notification",
     "send_due_notifications",
     "notify_listing_expiring",
 )
\ No newline at end of file
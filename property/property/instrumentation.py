@@ -0,0 +1,182 @@
+"""
+Per-request performance counters.
+
+RequestIDMiddleware opens a RequestStats for every request and code further
+down the stack reports into it with the record_* helpers below. Outside a
+request (Celery, management commands, shell) only the process-wide metrics
+in property/metrics.py are updated.
+"""
+import heapq
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from property.metrics import count_cache_lookup
+from property.query_budget import call_site
+
+_stats_local = threading.local()
+
+# keep log lines readable when an ORM query is huge
+MAX_LOGGED_SQL_CHARS = 500
+
+
+class RequestStats:
+    """
+    Counters for one request.
+
+    Instances are also usable as a DB execute wrapper
+    (connection.execute_wrapper(stats)) so every query is counted and timed.
+    """
+
+    def __init__(self, keep_queries: int = 5):
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_by_name = {}  # name -> [hits, misses]
+        self.serialize_ms = 0.0
+        self._serializing = False
+        self._keep_queries = max(int(keep_queries), 0)
+        self._top = []  # min-heap of (ms, seq, sql): the slowest N queries
+        self._seq = 0
+        self.captured = None  # [(sql, call site)] once start_capture() is called
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add_query(sql, (perf_counter() - start) * 1000)
+
+    def start_capture(self) -> None:
+        """Also keep every statement with its call site (query budget checks)."""
+        self.captured = []
+
+    def add_query(self, sql, ms: float) -> None:
+        self.query_count += 1
+        self.db_ms += ms
+        if self.captured is not None:
+            self.captured.append((str(sql), call_site()))
+        if not self._keep_queries:
+            return
+        self._seq += 1
+        item = (ms, self._seq, str(sql)[:MAX_LOGGED_SQL_CHARS])
+        if len(self._top) < self._keep_queries:
+            heapq.heappush(self._top, item)
+        else:
+            heapq.heappushpop(self._top, item)
+
+    def add_cache_lookup(self, name: str, hit: bool) -> None:
+        counts = self.cache_by_name.setdefault(name, [0, 0])
+        if hit:
+            self.cache_hits += 1
+            counts[0] += 1
+        else:
+            self.cache_misses += 1
+            counts[1] += 1
+
+    def top_queries(self):
+        """Slowest queries first, as (ms, sql)."""
+        return [(round(ms, 2), sql) for ms, _seq, sql in sorted(self._top, reverse=True)]
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = [
+            f'db;dur={self.db_ms:.1f};desc="{self.query_count} queries"',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"',
+            f"serialize;dur={self.serialize_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ]
+        return ", ".join(parts)
+
+    def log_fields(self) -> dict:
+        return {
+            "db_queries": self.query_count,
+            "db_ms": round(self.db_ms, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "serialize_ms": round(self.serialize_ms, 2),
+        }
+
+
+def start_request_stats(keep_queries: int = 5) -> RequestStats:
+    stats = RequestStats(keep_queries=keep_queries)
+    _stats_local.stats = stats
+    return stats
+
+
+def end_request_stats() -> None:
+    _stats_local.stats = None
+
+
+def current_request_stats():
+    """The RequestStats for the request being handled on this thread, or None."""
+    return getattr(_stats_local, "stats", None)
+
+
+def record_cache_lookup(name: str, hit: bool) -> None:
+    """Count a cache read (name groups related keys, e.g. "geo", "rooms:list")."""
+    count_cache_lookup(name, hit)
+    stats = current_request_stats()
+    if stats is not None:
+        stats.add_cache_lookup(name, hit)
+
+
+@contextmanager
+def record_serialization(stats=None):
+    """
+    Add the time spent inside the block to the request's serialisation time.
+
+    Nested blocks (a serializer's .data read inside another one) are counted
+    once, by the outermost block. `stats` is for code that runs after the
+    request's stats were closed (streamed bodies).
+    """
+    stats = stats or current_request_stats()
+    if stats is None or stats._serializing:
+        yield
+        return
+    stats._serializing = True
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_ms += (perf_counter() - start) * 1000
+        stats._serializing = False
+
+
+def record_streamed_serialization(chunks):
+    """
+    Wrap a streamed body so producing each chunk counts as serialisation time
+    of the request that created it (the body is consumed after the view returns).
+    """
+    stats = current_request_stats()
+    iterator = iter(chunks)
+
+    def timed():
+        while True:
+            with record_serialization(stats):
+                chunk = next(iterator, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    return timed()
+
+
+def instrument_serializers() -> None:
+    """
+    Count DRF serializer representation (serializer.data, run inside the view)
+    as serialisation time, next to the renderer's JSON encoding.
+    Called once from PropertylistAppConfig.ready().
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, "records_serialization", False):
+        return
+
+    def data(self):
+        with record_serialization():
+            return original(self)
+
+    data.records_serialization = True
+    BaseSerializer.data = property(data)
@@ -0,0 +1,278 @@
+"""
+Process-local metrics registry with Prometheus text exposition.
+
+Every gunicorn worker / Celery process accumulates counters in memory and
+periodically flushes the deltas into the shared cache with atomic incr()
+(METRICS_FLUSH_INTERVAL_SECONDS). The /metrics endpoint reads the merged
+totals back from the cache, so one scrape sees all workers on all hosts.
+
+Values are stored as integers: histogram sums are kept in microseconds and
+converted back to seconds on exposition.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics"
+INDEX_KEY = f"{KEY_PREFIX}:index"
+INDEX_LOCK_KEY = f"{KEY_PREFIX}:index:lock"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# name -> (type, help)
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Request latency by route name."),
+    "http_requests_total": ("counter", "Requests by route name, method and status class."),
+    "celery_task_duration_seconds": ("histogram", "Celery task run time."),
+    "celery_tasks_total": ("counter", "Celery task runs by outcome."),
+    "cache_lookups_total": ("counter", "Cache reads by cache name and result."),
+    "cache_hit_ratio": ("gauge", "Share of cache reads that were hits."),
+    "notification_queue_depth": ("gauge", "Outbound notifications waiting to be sent."),
+}
+
+_MICRO = 1_000_000
+
+
+def _series(name: str, labels: dict) -> str:
+    return json.dumps([name, sorted((k, str(v)) for k, v in labels.items())], separators=(",", ":"))
+
+
+def _value_key(series: str) -> str:
+    return f"{KEY_PREFIX}:v:{hashlib.sha1(series.encode()).hexdigest()}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)  # series -> delta since last flush
+        self._indexed = set()  # series this process knows are in the shared index
+        self._unindexed = set()  # written but not yet in the index (lock was busy)
+        self._last_flush = monotonic()
+
+    # ---- recording ----
+
+    def inc(self, name: str, labels: dict, amount: int = 1) -> None:
+        with self._lock:
+            self._pending[_series(name, labels)] += int(amount)
+
+    def observe(self, name: str, labels: dict, seconds: float, buckets=LATENCY_BUCKETS) -> None:
+        le = next((b for b in buckets if seconds <= b), "+Inf")
+        with self._lock:
+            self._pending[_series(f"{name}_bucket", {**labels, "le": le})] += 1
+            self._pending[_series(f"{name}_count", labels)] += 1
+            self._pending[_series(f"{name}_sum", labels)] += int(seconds * _MICRO)
+
+    # ---- shared storage ----
+
+    def maybe_flush(self) -> None:
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL_SECONDS", 10)
+        if monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = monotonic()
+            if not pending and not self._unindexed:
+                return
+
+        try:
+            created = set()
+            for series, delta in pending.items():
+                key = _value_key(series)
+                try:
+                    cache.incr(key, delta)
+                except ValueError:
+                    # first write of this series (or the cache was flushed)
+                    created.add(series)
+                    if not cache.add(key, delta, timeout=None):
+                        cache.incr(key, delta)
+            self._register((set(pending) - self._indexed) | created)
+        except Exception:
+            # metrics must never break a request; drop this batch
+            logger.warning("metrics flush failed", exc_info=True)
+
+    def _register(self, new) -> None:
+        with self._lock:
+            new = set(new) | self._unindexed
+            self._unindexed = set()
+        if not new:
+            return
+        # kept until a flush gets the lock, even if the series never changes again
+        try:
+            # the index is a plain list, so guard the read-modify-write across processes
+            locked = cache.add(INDEX_LOCK_KEY, 1, timeout=5)
+            if locked:
+                try:
+                    index = set(cache.get(INDEX_KEY) or [])
+                    index |= new
+                    cache.set(INDEX_KEY, sorted(index), timeout=None)
+                finally:
+                    cache.delete(INDEX_LOCK_KEY)
+        except Exception:
+            locked = False
+            raise
+        finally:
+            with self._lock:
+                if locked:
+                    self._indexed |= new
+                else:
+                    self._unindexed |= new
+
+    def snapshot(self) -> dict:
+        """Merged totals from every process: {(name, labels_tuple): value}."""
+        index = cache.get(INDEX_KEY) or []
+        values = cache.get_many([_value_key(s) for s in index])
+        out = {}
+        for series in index:
+            value = values.get(_value_key(series))
+            if value is None:
+                continue
+            name, labels = json.loads(series)
+            out[(name, tuple(tuple(pair) for pair in labels))] = value
+        return out
+
+
+registry = MetricsRegistry()
+
+
+# ---- recording helpers used across the app ----
+
+def observe_request(route: str, method: str, status_code: int, seconds: float) -> None:
+    labels = {"route": route, "method": method}
+    registry.observe("http_request_duration_seconds", labels, seconds)
+    registry.inc("http_requests_total", {**labels, "status": f"{int(status_code) // 100}xx"})
+
+
+def observe_task(task_name: str, outcome: str, seconds) -> None:
+    registry.inc("celery_tasks_total", {"task": task_name, "outcome": outcome})
+    if seconds is not None:
+        registry.observe("celery_task_duration_seconds", {"task": task_name}, seconds, buckets=TASK_BUCKETS)
+
+
+def count_cache_lookup(name: str, hit: bool) -> None:
+    registry.inc("cache_lookups_total", {"cache": name, "result": "hit" if hit else "miss"})
+
+
+# ---- exposition ----
+
+def _fmt_labels(labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + inner + "}"
+
+
+def _fmt_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram_lines(name, samples):
+    """Stored buckets are per-bucket counts; Prometheus wants cumulative ones."""
+    lines = []
+    groups = defaultdict(dict)  # labels without le -> {le: count}
+    for (sample, labels), value in samples.items():
+        if sample == f"{name}_bucket":
+            base = tuple(p for p in labels if p[0] != "le")
+            le = dict(labels)["le"]
+            groups[base][le] = value
+
+    for base in sorted(groups):
+        per_bucket = groups[base]
+        bounds = sorted((b for b in per_bucket if b != "+Inf"), key=float)
+        running = 0
+        for le in bounds:
+            running += per_bucket[le]
+            lines.append(f"{name}_bucket{_fmt_labels(base + (('le', le),))} {running}")
+        running += per_bucket.get("+Inf", 0)
+        lines.append(f"{name}_bucket{_fmt_labels(base + (('le', '+Inf'),))} {running}")
+        total = samples.get((f"{name}_sum", base), 0) / _MICRO
+        lines.append(f"{name}_sum{_fmt_labels(base)} {_fmt_value(float(total))}")
+        lines.append(f"{name}_count{_fmt_labels(base)} {samples.get((f'{name}_count', base), 0)}")
+    return lines
+
+
+def _cache_ratio_samples(samples) -> dict:
+    totals = defaultdict(lambda: [0, 0])
+    for (sample, labels), value in samples.items():
+        if sample != "cache_lookups_total":
+            continue
+        labels = dict(labels)
+        totals[labels["cache"]][0 if labels["result"] == "hit" else 1] += value
+    return {
+        ("cache_hit_ratio", (("cache", name),)): round(hits / (hits + misses), 4)
+        for name, (hits, misses) in totals.items()
+        if hits + misses
+    }
+
+
+def _queue_depth_samples() -> dict:
+    from django.utils import timezone
+    from notifications.models import OutboundNotification
+
+    now = timezone.now()
+    pending = OutboundNotification.objects.filter(
+        status__in=[OutboundNotification.STATUS_QUEUED, OutboundNotification.STATUS_FAILED]
+    )
+    return {
+        ("notification_queue_depth", (("state", "due"),)): pending.filter(scheduled_for__lte=now).count(),
+        ("notification_queue_depth", (("state", "scheduled"),)): pending.filter(scheduled_for__gt=now).count(),
+    }
+
+
+def render_prometheus_text() -> str:
+    registry.flush()
+    samples = registry.snapshot()
+    samples.update(_cache_ratio_samples(samples))
+    try:
+        samples.update(_queue_depth_samples())
+    except Exception:
+        logger.warning("notification queue depth unavailable", exc_info=True)
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            lines.extend(_histogram_lines(name, samples))
+            continue
+        for (sample, labels), value in sorted(samples.items()):
+            if sample == name:
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ---- Celery task timing ----
+
+try:
+    from celery.signals import task_postrun, task_prerun
+except Exception:  # pragma: no cover - celery is a hard dependency in deployments
+    task_prerun = task_postrun = None
+
+_task_started = {}
+
+
+if task_prerun is not None:
+
+    @task_prerun.connect(weak=False)
+    def _on_task_prerun(task_id=None, **kwargs):
+        _task_started[task_id] = monotonic()
+
+    @task_postrun.connect(weak=False)
+    def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+        started = _task_started.pop(task_id, None)
+        name = getattr(task, "name", None) or "unknown"
+        observe_task(name, (state or "unknown").lower(), None if started is None else monotonic() - started)
+        registry.maybe_flush()
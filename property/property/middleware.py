@@ -1,9 +1,25 @@
+import logging
 import uuid
+from contextlib import ExitStack
 from time import perf_counter
 import threading
 
+from django.conf import settings
+from django.db import connections
+
+from property.instrumentation import (
+    current_request_stats,
+    end_request_stats,
+    record_cache_lookup,
+    start_request_stats,
+)
+from property.metrics import observe_request, registry as metrics_registry
+from property.query_budget import budget_for_view, report_violation, should_check
+
 _request_local = threading.local()
 
+logger = logging.getLogger("property.request")
+
 def get_current_request_id() -> str:
     return getattr(_request_local, "request_id", "-")
 
@@ -14,6 +30,14 @@ class RequestIDMiddleware:
     - If client sends X-Request-ID, we keep it.
     - Otherwise generate UUID4.
     Also stores request_id in threadlocal so logs can include it.
+
+    Each request is also instrumented (see property/instrumentation.py):
+    - SQL query count + total DB time, cache hits/misses, serialisation time
+    - sent back as a Server-Timing header (REQUEST_SERVER_TIMING)
+    - logged as structured fields on the "property.request" logger
+    - requests slower than SLOW_REQUEST_THRESHOLD_MS log their slowest queries
+    - latency per route name feeds the shared metrics registry (property/metrics.py)
+    - views declaring a query_budget are checked against it (property/query_budget.py)
     """
     HEADER_IN = "HTTP_X_REQUEST_ID"
     HEADER_OUT = "X-Request-ID"
@@ -26,13 +50,100 @@ class RequestIDMiddleware:
         request.request_id = request_id
         _request_local.request_id = request_id
 
+        stats = start_request_stats(
+            keep_queries=getattr(settings, "SLOW_REQUEST_TOP_QUERIES", 5)
+        )
+
         start = perf_counter()
         try:
-            response = self.get_response(request)
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+                self._record_page_cache(request)
+                self._check_query_budget(request, stats)
         finally:
-            duration_ms = int((perf_counter() - start) * 1000)
+            elapsed_ms = (perf_counter() - start) * 1000
+            end_request_stats()
+
+        duration_ms = int(elapsed_ms)
 
         response[self.HEADER_OUT] = request_id
         response["X-Response-Time-ms"] = str(duration_ms)
+        if getattr(settings, "REQUEST_SERVER_TIMING", True):
+            response["Server-Timing"] = stats.server_timing(elapsed_ms)
+
+        if response.streaming:
+            # encoding a streamed body happens while it is sent: log once it is done
+            response.streaming_content = self._log_when_sent(
+                response.streaming_content, request, response, stats, start
+            )
+        else:
+            self._log(request, response, stats, duration_ms)
+
+        observe_request(self._route_name(request), request.method, response.status_code, elapsed_ms / 1000)
+        metrics_registry.maybe_flush()
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = budget_for_view(view_func, request.method)
+        stats = current_request_stats()
+        if budget is None or stats is None or not should_check():
+            return None
+        label = getattr(view_func, "__name__", "view")
+        view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+        if view_class is not None:
+            label = view_class.__name__
+        # only the view's own queries count, not session/auth middleware
+        request._query_budget = (label, budget, stats.query_count)
+        stats.start_capture()
+        return None
+
+    def _check_query_budget(self, request, stats):
+        check = getattr(request, "_query_budget", None)
+        if check is None:
+            return
+        label, budget, before = check
+        used = stats.query_count - before
+        if used > budget:
+            report_violation(f"{request.method} {label}", budget, used, stats.captured or [])
+
+    @staticmethod
+    def _route_name(request):
+        match = getattr(request, "resolver_match", None)
+        return (match.view_name if match else None) or "unmatched"
+
+    def _record_page_cache(self, request):
+        # cache_page() leaves this flag behind on GET/HEAD: False = served from cache
+        if request.method not in ("GET", "HEAD"):
+            return
+        flag = getattr(request, "_cache_update_cache", None)
+        if flag is not None:
+            record_cache_lookup(f"page:{self._route_name(request)}", not flag)
+
+    def _log_when_sent(self, content, request, response, stats, start):
+        try:
+            yield from content
+        finally:
+            self._log(request, response, stats, int((perf_counter() - start) * 1000))
+
+    def _log(self, request, response, stats, duration_ms):
+        fields = {
+            "request_id": request.request_id,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": duration_ms,
+            **stats.log_fields(),
+        }
+        summary = " ".join(f"{k}={v}" for k, v in fields.items() if k != "request_id")
 
-        return response
\ No newline at end of file
+        threshold = getattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 1000)
+        if threshold is not None and duration_ms >= threshold:
+            top = stats.top_queries()
+            fields["top_queries"] = top
+            lines = "".join(f"\n  {ms}ms {sql}" for ms, sql in top)
+            logger.warning("slow request %s%s", summary, lines, extra=fields)
+        else:
+            logger.info("request %s", summary, extra=fields)
@@ -0,0 +1,124 @@
+"""
+Declarative per-view query budgets.
+
+    class InboxListView(APIView):
+        query_budget = 8                      # every method
+        query_budget = {"GET": 8, "POST": 6}  # or per method
+
+    @query_budget(3)
+    def some_view(request): ...
+
+RequestIDMiddleware compares the queries run by the view (everything after URL
+resolution) with its budget. QUERY_BUDGET_MODE decides what happens:
+
+- "raise": tests - raise QueryBudgetExceeded, so an N+1 fails the test
+- "log":   production - check a QUERY_BUDGET_SAMPLE_RATE share of requests and log
+- "off"
+
+Violations are logged with SQL fingerprints grouped by the call site (first
+frame in our own code) that issued them.
+"""
+import logging
+import os
+import random
+import re
+import sys
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger("property.query_budget")
+
+_SKIP_FILES = ("instrumentation.py", "query_budget.py", "middleware.py")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries than its declared budget."""
+
+
+def query_budget(limit):
+    """Decorator form of the `query_budget` class attribute (views or view functions)."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def budget_for_view(view_func, method: str):
+    """The budget declared on a resolved view (DRF/Django class views or functions), or None."""
+    view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    budget = getattr(view_class, "query_budget", None)
+    if budget is None:
+        budget = getattr(view_func, "query_budget", None)
+    if isinstance(budget, dict):
+        budget = budget.get(method)
+    return budget
+
+
+def should_check() -> bool:
+    mode = getattr(settings, "QUERY_BUDGET_MODE", "off")
+    if mode == "raise":
+        return True
+    if mode == "log":
+        return random.random() < float(getattr(settings, "QUERY_BUDGET_SAMPLE_RATE", 0.0))
+    return False
+
+
+# ---- SQL fingerprints / call sites ----
+
+_FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Literal-free shape of a statement: same query, different ids -> same fingerprint."""
+    out = str(sql)
+    for pattern, repl in _FINGERPRINT_RULES:
+        out = pattern.sub(repl, out)
+    return out.strip()
+
+
+def call_site() -> str:
+    """'path/to/file.py:123 (func)' of the first caller frame in project code."""
+    base = str(getattr(settings, "BASE_DIR", "")).rstrip(os.sep) + os.sep
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base)
+            and "site-packages" not in filename
+            and not filename.endswith(_SKIP_FILES)
+        ):
+            return f"{filename[len(base):]}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def group_queries(captured):
+    """[(sql, site), ...] -> [((site, fingerprint), count), ...] most repeated first."""
+    return Counter((site, fingerprint_sql(sql)) for sql, site in captured).most_common()
+
+
+def report_violation(label: str, budget: int, used: int, captured) -> None:
+    groups = group_queries(captured)
+    lines = "".join(f"\n  {count}x {site}: {fp}" for (site, fp), count in groups)
+    message = f"query budget exceeded for {label}: {used} queries (budget {budget}){lines}"
+
+    logger.warning(
+        message,
+        extra={
+            "view": label,
+            "query_budget": budget,
+            "queries": used,
+            "query_groups": [
+                {"call_site": site, "fingerprint": fp, "count": count} for (site, fp), count in groups
+            ],
+        },
+    )
+    if getattr(settings, "QUERY_BUDGET_MODE", "off") == "raise":
+        raise QueryBudgetExceeded(message)
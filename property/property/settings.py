@@ -30,6 +30,13 @@ load_dotenv(BASE_DIR / ".env")
 
 # Cache TTL for geocode results (seconds)
 GEO_CACHE_TTL_SECONDS = 60 * 60 * 24 * 7  # 7 days
+# size of the lat/lon squares used by grid_cell() (saved-search index)
+GEO_GRID_CELL_DEGREES = 0.1
+# rooms/map/: individual pins from this zoom on (capped at MAP_MAX_PINS),
+# below it clusters of 2**MAP_CLUSTER_SUBDIVISION cells per map tile edge
+MAP_PINS_MIN_ZOOM = 15
+MAP_MAX_PINS = 500
+MAP_CLUSTER_SUBDIVISION = 3
 
 
 OTP_EXPIRY_MINUTES = 10
@@ -112,6 +119,11 @@ SITE_URL = os.getenv("SITE_URL", "").strip()
 # Frontend base URL used for links in emails
 FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "https://rentout.co.uk")
 IDEAL_POSTCODES_API_KEY = os.getenv("IDEAL_POSTCODES_API_KEY", "").strip()
+# FindAddressView: suggestions cached per normalised postcode, 404s cached separately
+ADDRESS_LOOKUP_CACHE_TTL = 60 * 60 * 24
+ADDRESS_LOOKUP_NEGATIVE_TTL = 60 * 60
+# concurrent lookups of the same postcode wait this long for the first one, then 503
+ADDRESS_LOOKUP_COALESCE_WAIT_SECONDS = 0.5
 GOOGLE_WEB_CLIENT_ID = os.getenv("GOOGLE_WEB_CLIENT_ID", "").strip()
 APPLE_AUDIENCE = os.getenv("APPLE_AUDIENCE", "").strip()
 # -----------------------------
@@ -239,15 +251,15 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # -----------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "propertylist_app.api.authentication.CachedJWTAuthentication",
     ],
         "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "propertylist_app.api.throttling.UserCounterThrottle",
+        "propertylist_app.api.throttling.AnonCounterThrottle",
+        "propertylist_app.api.throttling.ScopedCounterThrottle",
     ],
     
     "DEFAULT_THROTTLE_RATES": {
@@ -350,6 +362,8 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+# user + profile resolved by CachedJWTAuthentication (services/auth_cache.py)
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
 
 # -----------------------------
 # Security / Abuse controls
@@ -367,6 +381,15 @@ ACCOUNT_DELETION_GRACE_DAYS = 7
 
 LOGIN_FAIL_LIMIT = int(os.getenv("LOGIN_FAIL_LIMIT", "5"))
 LOGIN_LOCKOUT_SECONDS = int(os.getenv("LOGIN_LOCKOUT_SECONDS", "900"))
+# failures from one IP across all usernames (services/security.py); 0 = off,
+# since it locks every account behind a shared address
+LOGIN_IP_FAIL_LIMIT = int(os.getenv("LOGIN_IP_FAIL_LIMIT", "0"))
+# proxies in front of Django that append to X-Forwarded-For (Render's TLS proxy
+# outside DEBUG); services/security.client_ip() trusts that many entries
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0" if DEBUG else "1"))
+
+# Counter throttles (api/throttling.py): "sliding" | "fixed"
+THROTTLE_ALGORITHM = os.getenv("THROTTLE_ALGORITHM", "sliding")
 
 # -----------------------------
 # CORS / CSRF
@@ -482,7 +505,21 @@ CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://127.0.0.1:6379/1")
 
 CACHE_DEFAULT_TTL = 60
+# per-user response cache (CachedPerUserGETMixin); entries are invalidated by version bumps
+USER_RESPONSE_CACHE_TTL = int(os.getenv("USER_RESPONSE_CACHE_TTL", "300"))
 CACHE_SEARCH_TTL = 120
+# in-process bitmap index for advanced room search (services/facet_index.py)
+ROOM_FACET_INDEX_ENABLED = os.getenv("ROOM_FACET_INDEX_ENABLED", "true").lower() == "true"
+ROOM_FACET_INDEX_MAX_AGE_SECONDS = int(os.getenv("ROOM_FACET_INDEX_MAX_AGE_SECONDS", "300"))
+# full rebuilds run in a thread; searches use SQL meanwhile
+ROOM_FACET_INDEX_BACKGROUND_REBUILD = os.getenv("ROOM_FACET_INDEX_BACKGROUND_REBUILD", "true").lower() == "true"
+# search/rooms/facets/: price histogram bucket lower bounds (last bucket is open-ended)
+ROOM_FACET_PRICE_EDGES = [0, 500, 750, 1000, 1250, 1500, 2000]
+ROOM_FACETS_CACHE_TTL = int(os.getenv("ROOM_FACETS_CACHE_TTL", "60"))
+# saved-search alerts (services/saved_searches.py): price band width of the
+# inverted index; prices above SAVED_SEARCH_MAX_PRICE share the last band
+SAVED_SEARCH_PRICE_BAND = 100
+SAVED_SEARCH_MAX_PRICE = 5000
 
 # -----------------------------
 # GDPR policy knobs
@@ -519,9 +556,46 @@ CELERY_TASK_ROUTES = {
     "notifications.tasks.*": {"queue": "emails"},
     "propertylist_app.tasks.task_send_new_message_email": {"queue": "emails"},
     "propertylist_app.expire_paid_listings": {"queue": "maintenance"},
+    "propertylist_app.tasks_webhooks.*": {"queue": "webhooks"},
 }
 
+# Outbound webhooks (propertylist_app/services/webhooks.py), all per destination host
+WEBHOOK_CONNECT_TIMEOUT = 3
+WEBHOOK_READ_TIMEOUT = int(os.getenv("WEBHOOK_READ_TIMEOUT", "10"))
+WEBHOOK_MAX_IN_FLIGHT = int(os.getenv("WEBHOOK_MAX_IN_FLIGHT", "4"))
+WEBHOOK_BREAKER_FAILURES = 5
+WEBHOOK_BREAKER_RESET_SECONDS = 60
+WEBHOOK_BATCH_WINDOW_SECONDS = int(os.getenv("WEBHOOK_BATCH_WINDOW_SECONDS", "2"))
+WEBHOOK_BATCH_MAX_EVENTS = 100
+# deferred (circuit open / busy) deliveries are dead-lettered this long after their first attempt
+WEBHOOK_DEFER_MAX_SECONDS = int(os.getenv("WEBHOOK_DEFER_MAX_SECONDS", str(6 * 60 * 60)))
+
+# Inbound Stripe webhooks are stored then applied by Celery (services/stripe_webhooks.py)
+STRIPE_WEBHOOK_STUCK_SECONDS = 300
+STRIPE_WEBHOOK_MAX_ATTEMPTS = 8
+
+# Queued email notifications are dispatched by Celery ETA (notifications/services.py);
+# send_due_notifications picks up anything further out or overdue by the grace period
+NOTIFICATION_ETA_HORIZON_SECONDS = 3600
+NOTIFICATION_DISPATCH_GRACE_SECONDS = 120
+
+
+
+# RequestIDMiddleware instrumentation (DB/cache/serialisation per request)
+REQUEST_SERVER_TIMING = os.getenv("REQUEST_SERVER_TIMING", "true").lower() in {"1", "true", "yes"}
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "1000"))
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# Per-view query budgets (property/query_budget.py): "raise" | "log" | "off"
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log")
+QUERY_BUDGET_SAMPLE_RATE = float(os.getenv("QUERY_BUDGET_SAMPLE_RATE", "0.01"))
+
+# Compact-envelope list pages at least this long are streamed (api/views/common.StreamingEnvelopeMixin)
+STREAMING_JSON_MIN_ITEMS = int(os.getenv("STREAMING_JSON_MIN_ITEMS", "50"))
 
+# Prometheus metrics at /metrics/ (property/metrics.py); empty token = endpoint disabled
+METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN", "").strip()
+METRICS_FLUSH_INTERVAL_SECONDS = int(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "10"))
 
 LOGGING = {
     "version": 1,
@@ -28,6 +28,9 @@ CACHES = {
 
 
 LOGIN_FAIL_LIMIT = 3
+
+# views declaring query_budget fail the test when they go over it
+QUERY_BUDGET_MODE = "raise"
 LOGIN_LOCKOUT_SECONDS = 300
 
 
@@ -45,9 +48,9 @@ os.makedirs(MEDIA_ROOT, exist_ok=True)
 REST_FRAMEWORK = {
     **REST_FRAMEWORK,  # keep whatever you already set
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "propertylist_app.api.throttling.UserCounterThrottle",
+        "propertylist_app.api.throttling.AnonCounterThrottle",
+        "propertylist_app.api.throttling.ScopedCounterThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         # Baselines; tests narrow these when needed:
@@ -125,3 +128,10 @@ CELERY_BEAT_SCHEDULE = {
 }
 
 
+
+
+# Room cards must be fully preloaded by the view: fail on any query during card rendering.
+ROOM_CARD_QUERY_GUARD = True
+
+# a rebuild thread would not see the test transaction's rooms
+ROOM_FACET_INDEX_BACKGROUND_REBUILD = False
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
+from django.utils.crypto import constant_time_compare
 from django.shortcuts import redirect
 
 from django.http.response import HttpResponseRedirectBase
@@ -45,6 +46,21 @@ def health_root(request):
     return JsonResponse({"status": "ok"}, status=200)
 
 
+def metrics_root(request):
+    """
+    Prometheus scrape target. Internal only: needs
+    `Authorization: Bearer <METRICS_AUTH_TOKEN>`, and is switched off (404) when no token is set.
+    """
+    from property.metrics import render_prometheus_text
+
+    token = getattr(settings, "METRICS_AUTH_TOKEN", "")
+    if not token:
+        raise Http404()
+    if not constant_time_compare(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"):
+        return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+    return HttpResponse(render_prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 
 class HttpResponsePermanentRedirect308(HttpResponseRedirectBase):
     status_code = 308
@@ -67,6 +83,7 @@ urlpatterns = [
 
     #-----health-----#
     path("health/", health_root),
+    path("metrics/", metrics_root),
 
 
     # DEBUG helper
@@ -1,5 +1,8 @@
 from django.contrib import admin, messages
 from django.utils import timezone
+from propertylist_app.services.facet_index import note_rooms_changed
+from propertylist_app.services.saved_searches import schedule_saved_search_matching
+from propertylist_app.utils.cache import bump_room_audience_versions
 
 
 from propertylist_app.models import (
@@ -80,10 +83,15 @@ def restore_selected(modeladmin, request, queryset):
 
 @admin.action(description="Approve selected rooms (set status=active)")
 def approve_rooms(modeladmin, request, queryset):
+    # ids first: a status filter on the changelist no longer matches after the update
+    room_ids = list(queryset.values_list("id", flat=True))
     updated = queryset.update(status="active")
+    note_rooms_changed(*room_ids)
+    bump_room_audience_versions(room_ids)
+    schedule_saved_search_matching(*room_ids)
     # audit (best-effort)
     try:
-        for r_id in queryset.values_list("id", flat=True):
+        for r_id in room_ids:
             AuditLog.objects.create(
                 actor=request.user,
                 action="room.approve",
@@ -98,10 +106,13 @@ def approve_rooms(modeladmin, request, queryset):
 
 @admin.action(description="Hide selected rooms (set status=hidden)")
 def hide_rooms(modeladmin, request, queryset):
+    room_ids = list(queryset.values_list("id", flat=True))
     updated = queryset.update(status="hidden")
+    note_rooms_changed(*room_ids)
+    bump_room_audience_versions(room_ids)
     # audit (best-effort)
     try:
-        for r_id in queryset.values_list("id", flat=True):
+        for r_id in room_ids:
             AuditLog.objects.create(
                 actor=request.user,
                 action="room.hide",
@@ -264,12 +275,16 @@ class RoomAdmin(admin.ModelAdmin):
 
 @admin.action(description="Approve selected photos (set status=approved)")
 def approve_photos(modeladmin, request, queryset):
+    room_ids = set(queryset.values_list("room_id", flat=True))
     queryset.update(status="approved")
+    bump_room_audience_versions(room_ids)
 
 
 @admin.action(description="Reject selected photos (set status=rejected)")
 def reject_photos(modeladmin, request, queryset):
+    room_ids = set(queryset.values_list("room_id", flat=True))
     queryset.update(status="rejected")
+    bump_room_audience_versions(room_ids)
     
     
 
@@ -526,8 +541,9 @@ class PaymentAdmin(admin.ModelAdmin):
 # Stores provider webhook receipts and prevents duplicate event processing.
 @admin.register(WebhookReceipt)
 class WebhookReceiptAdmin(ReadOnlyAdmin):
-    list_display = ("source", "event_id", "received_at")
-    search_fields = ("event_id", "source")
+    list_display = ("source", "event_id", "object_key", "received_at", "processed", "attempts")
+    list_filter = ("source", "processed")
+    search_fields = ("event_id", "source", "object_key")
     readonly_fields = ("source", "event_id", "received_at")
 
 
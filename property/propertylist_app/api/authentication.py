@@ -0,0 +1,51 @@
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from propertylist_app.services.auth_cache import get_auth_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user (and profile) through
+    services.auth_cache instead of a User query on every request.
+
+    Same checks as simplejwt's get_user: unknown user, inactive user and
+    (when CHECK_REVOKE_TOKEN is on) changed password all fail authentication.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        if api_settings.USER_ID_FIELD != "id":
+            # cache is keyed by primary key
+            return super().get_user(validated_token)
+
+        user = get_auth_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # cached users carry the digest instead of the password hash
+            digest = getattr(user, "_password_digest", None) or get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Same `jwtAuth` bearer scheme in the OpenAPI schema as plain JWTAuthentication."""
+
+    target_class = "propertylist_app.api.authentication.CachedJWTAuthentication"
@@ -1,5 +1,14 @@
 # propertylist_app/api/pagination.py
+import base64
+import binascii
+import json
+from decimal import Decimal
+
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import (
     PageNumberPagination,
     LimitOffsetPagination,
@@ -36,14 +45,104 @@ class StandardLimitOffsetPagination(LimitOffsetPagination):
       - next/previous links always use canonical "offset"
       - we strip "start" from pagination links
       - we KEEP "offset=0" in previous links (your tests require it)
+
+    Keyset (cursor) mode, opt-in:
+      ?cursor=            first page
+      ?cursor=<token>     page after/before the row encoded in <token>
+      ?count=estimate     planner estimate instead of no count (exact on non-Postgres)
+      ?count=exact        real COUNT(*)
+
+    Cursor mode seeks on the queryset's own ordering (plus "id" as a tie-breaker),
+    so deep pages cost the same as the first one. By default it skips COUNT(*)
+    entirely and returns count=null. The response envelope is unchanged.
+
+    If the data is not a QuerySet (e.g. distance-ordered search results) or the
+    ordering can't be seeked on (annotations, nullable columns, expressions),
+    we quietly fall back to limit/offset.
     """
 
     limit_query_param = "limit"
     offset_query_param = "offset"
+    cursor_query_param = "cursor"
+    count_query_param = "count"
 
     default_limit = getattr(settings, "REST_FRAMEWORK", {}).get("PAGE_SIZE", 20)
     max_limit = 100
 
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = False
+        self.request = request
+
+        if self.cursor_query_param in request.query_params and isinstance(queryset, QuerySet):
+            ordering = _keyset_ordering(queryset)
+            if ordering is not None:
+                return self._paginate_keyset(queryset, request, ordering)
+
+        return super().paginate_queryset(queryset, request, view=view)
+
+    # --------------------
+    # keyset mode
+    # --------------------
+    def _paginate_keyset(self, queryset, request, ordering):
+        self.keyset = True
+        self.limit = self.get_limit(request)
+        self.ordering = ordering
+
+        token = request.query_params.get(self.cursor_query_param) or ""
+        self.has_cursor = bool(token)
+        self.reverse = False
+
+        count_mode = (request.query_params.get(self.count_query_param) or "").strip().lower()
+        self.count = _count_for_mode(queryset, count_mode)
+
+        if token:
+            values, self.reverse = self._decode_cursor(token, queryset.model, ordering)
+            queryset = queryset.filter(_seek_filter(ordering, values, self.reverse))
+
+        if self.reverse:
+            queryset = queryset.order_by(*_order_by_args(ordering, flip=True))
+        else:
+            queryset = queryset.order_by(*_order_by_args(ordering))
+
+        rows = list(queryset[: self.limit + 1])
+        self.has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if self.reverse:
+            rows.reverse()
+
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def _keyset_link(self, row, reverse):
+        token = _encode_cursor(
+            [_json_value(getattr(row, attname)) for attname, _desc in self.ordering],
+            reverse,
+        )
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        url = replace_query_param(url, self.cursor_query_param, token)
+        url = remove_query_param(url, self.offset_query_param)
+        return remove_query_param(url, "start")
+
+    def _decode_cursor(self, token, model, ordering):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+            raw_values = payload["v"]
+            reverse = bool(payload.get("r"))
+            if not isinstance(raw_values, list) or len(raw_values) != len(ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(attname).to_python(raw)
+                for (attname, _desc), raw in zip(ordering, raw_values)
+            ]
+        except (ValueError, KeyError, TypeError, UnicodeError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
     def get_offset(self, request):
         # canonical offset
         if "offset" in request.query_params:
@@ -56,6 +155,13 @@ class StandardLimitOffsetPagination(LimitOffsetPagination):
         return 0
 
     def get_next_link(self):
+        if getattr(self, "keyset", False):
+            if self.last_row is None:
+                return None
+            if self.has_more if not self.reverse else self.has_cursor:
+                return self._keyset_link(self.last_row, reverse=False)
+            return None
+
         if self.count is None:
             return None
 
@@ -76,6 +182,13 @@ class StandardLimitOffsetPagination(LimitOffsetPagination):
         return url
 
     def get_previous_link(self):
+        if getattr(self, "keyset", False):
+            if self.first_row is None:
+                return None
+            if self.has_more if self.reverse else self.has_cursor:
+                return self._keyset_link(self.first_row, reverse=True)
+            return None
+
         if self.count is None:
             return None
 
@@ -97,4 +210,133 @@ class StandardLimitOffsetPagination(LimitOffsetPagination):
 
         # strip legacy param from links
         url = remove_query_param(url, "start")
-        return url
\ No newline at end of file
+        return url
+
+    def get_schema_operation_parameters(self, view):
+        params = super().get_schema_operation_parameters(view)
+        params.extend(
+            [
+                {
+                    "name": self.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Opt into keyset pagination. Send it empty for the first page, then follow next/previous.",
+                    "schema": {"type": "string"},
+                },
+                {
+                    "name": self.count_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Cursor mode only: estimate or exact. Omit to skip counting (count is null).",
+                    "schema": {"type": "string"},
+                },
+            ]
+        )
+        return params
+
+
+# --------------------
+# keyset helpers
+# --------------------
+def _keyset_ordering(queryset):
+    """
+    Turn the queryset's ordering into [(attname, descending), ...] ending in the pk.
+    Returns None when we can't seek on it safely.
+    """
+    model = queryset.model
+    order_by = list(queryset.query.order_by) or list(model._meta.ordering or [])
+
+    ordering = []
+    for item in order_by:
+        if not isinstance(item, str) or "__" in item or item == "?":
+            return None
+
+        desc = item.startswith("-")
+        name = item.lstrip("-")
+        if name == "pk":
+            name = model._meta.pk.name
+
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        if not getattr(field, "concrete", False) or field.null or field.many_to_many:
+            return None
+        # "category" (not "category_id") would follow the related model's Meta.ordering
+        if field.is_relation and name != field.attname:
+            return None
+
+        ordering.append((field.attname, desc))
+        if field.primary_key:
+            return ordering
+
+    pk_desc = ordering[-1][1] if ordering else True
+    ordering.append((model._meta.pk.attname, pk_desc))
+    return ordering
+
+
+def _order_by_args(ordering, flip=False):
+    return [
+        ("-" if desc != flip else "") + attname
+        for attname, desc in ordering
+    ]
+
+
+def _seek_filter(ordering, values, reverse):
+    """
+    (a, b, id) > (va, vb, vid) spelled out as
+    a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND id > vid)
+    with > / < chosen per column direction.
+    """
+    q = Q()
+    for i, (attname, desc) in enumerate(ordering):
+        lookup = "lt" if desc != reverse else "gt"
+        term = Q(**{f"{attname}__{lookup}": values[i]})
+        for j, (prev_attname, _prev_desc) in enumerate(ordering[:i]):
+            term &= Q(**{prev_attname: values[j]})
+        q |= term
+    return q
+
+
+def _json_value(value):
+    if hasattr(value, "isoformat"):
+        # keep microseconds (DjangoJSONEncoder trims them, which breaks equality)
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_cursor(values, reverse):
+    raw = json.dumps({"v": values, "r": 1 if reverse else 0}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _count_for_mode(queryset, mode):
+    if mode == "exact":
+        return queryset.count()
+    if mode == "estimate":
+        return _estimated_count(queryset)
+    return None
+
+
+def _estimated_count(queryset):
+    """
+    Postgres: ask the planner how many rows it expects (no scan).
+    Anything else: a real count, the tables are small there anyway.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cur:
+            cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        return queryset.count()
@@ -1,4 +1,77 @@
+import json
+
+from django.utils.cache import patch_vary_headers
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.mediatypes import _MediaType
+
+from property.instrumentation import record_serialization
+
+
+ENVELOPE_HEADER = "X-Envelope"
+_PAGINATION_KEYS = ("count", "next", "previous")
+
+
+def wants_compact_envelope(request) -> bool:
+    """
+    Compact envelope is opt-in, either by header or by Accept parameter:
+      X-Envelope: compact
+      Accept: application/json; envelope=compact
+    """
+    if request is None:
+        return False
+    meta = getattr(request, "META", {})
+    if (meta.get("HTTP_X_ENVELOPE") or "").strip().lower() == "compact":
+        return True
+    accepted = getattr(request, "accepted_media_type", None) or ""
+    if accepted:
+        return _MediaType(accepted).params.get("envelope", "").lower() == "compact"
+    return False
+
+
+def compact_envelope(payload: dict) -> dict:
+    """
+    {"ok", "message", "data", "meta"} with the page list carried exactly once.
+
+    Covers the three success shapes we emit:
+    - ok_response(list, meta=...)          -> drops the results/count/next/previous aliases
+    - renderer-wrapped DRF pagination      -> data={count,...,results} becomes data=[...] + meta
+    - _wrap_response_success(...)          -> same as the first
+    """
+    data = payload.get("data")
+    meta = payload.get("meta")
+
+    if isinstance(data, dict) and "results" in data and set(data) <= {"results", *_PAGINATION_KEYS}:
+        meta = {**(meta or {}), **{k: data.get(k) for k in _PAGINATION_KEYS}}
+        data = data["results"]
+    elif meta is None and "count" in payload:
+        meta = {k: payload.get(k) for k in _PAGINATION_KEYS}
+
+    out = {"ok": payload.get("ok", True), "message": payload.get("message"), "data": data}
+    if meta is not None:
+        out["meta"] = meta
+    for key, value in payload.items():
+        if key not in out and key not in ("results", "meta", *_PAGINATION_KEYS):
+            out[key] = value
+    return out
+
+
+def envelope_payload(data):
+    """The success envelope for a 2xx response body (what EnvelopeJSONRenderer writes)."""
+    # No body (e.g. old 204 style)
+    if data is None:
+        data = {}
+
+    # Already enveloped
+    if isinstance(data, dict) and "ok" in data and "data" in data:
+        if "message" not in data:
+            data = {**data, "message": None}
+        return data
+
+    return {
+        "ok": True,
+        "message": None,
+        "data": data,
+    }
 
 
 class EnvelopeJSONRenderer(JSONRenderer):
@@ -11,11 +84,19 @@ class EnvelopeJSONRenderer(JSONRenderer):
         "data": ...
     }
 
+    Clients that negotiate the compact envelope (see wants_compact_envelope)
+    get the same thing without the duplicated results/count/next/previous keys.
+
     Non-2xx responses are left alone because they are handled by
     the custom exception handler.
     """
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
+        # counted as serialisation time in the request's Server-Timing
+        with record_serialization():
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type=None, renderer_context=None):
         renderer_context = renderer_context or {}
         response = renderer_context.get("response")
 
@@ -26,21 +107,44 @@ class EnvelopeJSONRenderer(JSONRenderer):
 
         # Only wrap successful responses
         if 200 <= status_code < 300:
-            # No body (e.g. old 204 style)
-            if data is None:
-                data = {}
-
-            # Already enveloped
-            if isinstance(data, dict) and "ok" in data and "data" in data:
-                if "message" not in data:
-                    data = {**data, "message": None}
-                return super().render(data, accepted_media_type, renderer_context)
-
-            wrapped = {
-                "ok": True,
-                "message": None,
-                "data": data,
-            }
-            return super().render(wrapped, accepted_media_type, renderer_context)
-
-        return super().render(data, accepted_media_type, renderer_context)
\ No newline at end of file
+            patch_vary_headers(response, ("Accept", ENVELOPE_HEADER))
+            payload = envelope_payload(data)
+            if wants_compact_envelope(renderer_context.get("request")):
+                payload = compact_envelope(payload)
+            return super().render(payload, accepted_media_type, renderer_context)
+
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def iter_render(self, payload, chunk_items: int = 100):
+        """
+        Yield an already-built envelope as JSON chunks, encoding the `data` list
+        `chunk_items` rows at a time (large pages never exist as one big string).
+        Output is byte-for-byte what render() produces for the same payload.
+        """
+        def dumps(value):
+            ret = json.dumps(
+                value,
+                cls=self.encoder_class,
+                ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict,
+                separators=(",", ":") if self.compact else (", ", ": "),
+            )
+            # same escaping as JSONRenderer.render
+            return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+        rows = payload.get("data")
+        if not isinstance(rows, list):
+            yield dumps(payload).encode("utf-8")
+            return
+
+        head = dict(payload)
+        head["data"] = []
+        # '{"ok":true,"message":null,"data":[]...}' split around the empty list
+        prefix, _, suffix = dumps(head).partition('"data":[]')
+        sep = "," if self.compact else ", "
+
+        yield (prefix + '"data":[').encode("utf-8")
+        for start in range(0, len(rows), chunk_items):
+            chunk = sep.join(dumps(row) for row in rows[start:start + chunk_items])
+            yield ((sep if start else "") + chunk).encode("utf-8")
+        yield ("]" + suffix).encode("utf-8")
@@ -0,0 +1,179 @@
+# propertylist_app/api/room_filters.py
+"""
+Query-string parsing for the equality / range filters of advanced room search.
+
+Shared by SearchRoomsView.get_queryset (applied as SQL) and the in-process
+facet index (services/facet_index.py), so both read the query string the
+same way and raise the same validation errors.
+"""
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from propertylist_app.models import Room
+
+
+# Choice filters: query param == Room field; the listed value means "any"
+ROOM_CHOICE_FILTERS = (
+    ("bathroom_type", "no_preference"),
+    ("shared_living_space", "no_preference"),
+    ("smoking_allowed_in_property", "no_preference"),
+    ("suitable_for", "no_preference"),
+    ("household_type", "no_preference"),
+    ("household_environment", "no_preference"),
+    ("pets_allowed", "no_preference"),
+    ("inclusive_household", "no_preference"),
+    ("accessible_entry", "no_preference"),
+    ("room_for", "any"),
+    ("room_size", "dont_mind"),
+)
+
+# Boolean filters: query param == Room field, true and false both filter
+ROOM_BOOL_FILTERS = (
+    "furnished",
+    "bills_included",
+    "parking_available",
+    "free_to_contact",
+)
+
+# Every Room field a facet filter can constrain to a set of values
+ROOM_TERM_FIELDS = (
+    "property_type",
+    "is_shared_room",
+    *ROOM_BOOL_FILTERS,
+    *(field for field, _any in ROOM_CHOICE_FILTERS),
+)
+
+# Room fields with a min/max range filter
+ROOM_RANGE_FIELDS = ("price_per_month", "number_of_bedrooms")
+
+# Query params read by parse_facet_filters()
+FACET_FILTER_PARAMS = frozenset({
+    "property_types",
+    "property_type",
+    "include_shared",
+    "min_price",
+    "max_price",
+    "rooms_min",
+    "rooms_max",
+    *ROOM_BOOL_FILTERS,
+    *(field for field, _any in ROOM_CHOICE_FILTERS),
+})
+
+
+def parse_bool(v):
+    if v is None:
+        return None
+    v = str(v).strip().lower()
+    if v in {"true", "1", "yes"}:
+        return True
+    if v in {"false", "0", "no"}:
+        return False
+    return None
+
+
+def _parse_int(params, name, *, blank_is_none):
+    raw = params.get(name)
+    if raw is None or (blank_is_none and str(raw).strip() == ""):
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Must be an integer."})
+
+
+def parse_facet_filters(params):
+    """
+    The equality / range part of a room search query string.
+
+    Returns {"terms": {field: [values]}, "ranges": {field: (min, max)}}:
+      terms  - the room's field must be one of the values (AND across fields)
+      ranges - inclusive bounds, None for an open end
+    """
+    terms = {}
+    ranges = {}
+
+    min_price = _parse_int(params, "min_price", blank_is_none=False)
+    max_price = _parse_int(params, "max_price", blank_is_none=False)
+    if min_price is not None or max_price is not None:
+        ranges["price_per_month"] = (min_price, max_price)
+
+    rooms_min = _parse_int(params, "rooms_min", blank_is_none=True)
+    rooms_max = _parse_int(params, "rooms_max", blank_is_none=True)
+    if rooms_min is not None and rooms_max is not None and rooms_min > rooms_max:
+        raise ValidationError({"rooms_min": "rooms_min cannot be greater than rooms_max."})
+    if rooms_min is not None or rooms_max is not None:
+        ranges["number_of_bedrooms"] = (rooms_min, rooms_max)
+
+    for field in ROOM_BOOL_FILTERS:
+        value = parse_bool(params.get(field))
+        if value is not None:
+            terms[field] = [value]
+
+    # Property types (advanced search chips)
+    property_types = params.getlist("property_types") or params.getlist("property_type")
+    if property_types:
+        terms["property_type"] = list(property_types)
+
+    for field, any_value in ROOM_CHOICE_FILTERS:
+        value = (params.get(field) or "").strip()
+        if value and value != any_value:
+            terms[field] = [value]
+
+    # “Rooms in existing shares”
+    if params.get("include_shared") in {"1", "true", "True", "yes"}:
+        terms["is_shared_room"] = [True]
+
+    return {"terms": terms, "ranges": ranges}
+
+
+def only_facet_params(params, allowed=()):
+    """True when every query param is a facet filter (or one of `allowed`)."""
+    return all(name in FACET_FILTER_PARAMS or name in allowed for name in params)
+
+
+def facet_filters_q(filters, exclude=None):
+    """
+    parse_facet_filters() output as a Q, optionally leaving out the filter on
+    one field (facet counts for a field ignore that field's own selection).
+    """
+    q = Q()
+    for field, values in filters["terms"].items():
+        if field == exclude:
+            continue
+        if len(values) == 1:
+            q &= Q(**{field: values[0]})
+        else:
+            q &= Q(**{f"{field}__in": values})
+
+    for field, (low, high) in filters["ranges"].items():
+        if field == exclude:
+            continue
+        if low is not None:
+            q &= Q(**{f"{field}__gte": low})
+        if high is not None:
+            q &= Q(**{f"{field}__lte": high})
+    return q
+
+
+def apply_facet_filters(qs, filters):
+    """Apply parse_facet_filters() output to a Room queryset."""
+    return qs.filter(facet_filters_q(filters))
+
+
+def facet_values():
+    """
+    {field: [values]} a facet filter can select, in display order:
+    the field's choices without its "any" value, True/False for booleans.
+    """
+    any_values = dict(ROOM_CHOICE_FILTERS)
+    out = {}
+    for field in ROOM_TERM_FIELDS:
+        if field == "is_shared_room":
+            # include_shared can only ask for shared rooms
+            out[field] = [True]
+        elif field in ROOM_BOOL_FILTERS:
+            out[field] = [True, False]
+        else:
+            choices = Room._meta.get_field(field).choices
+            out[field] = [value for value, _label in choices if value != any_values.get(field)]
+    return out
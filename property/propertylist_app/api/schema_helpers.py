@@ -1,4 +1,4 @@
-from drf_spectacular.utils import inline_serializer
+from drf_spectacular.utils import OpenApiParameter, inline_serializer
 from rest_framework import serializers
 
 
@@ -44,4 +44,13 @@ def standard_paginated_response_serializer(name: str, item_serializer):
             "message": serializers.CharField(),
             "data": paginated_data_serializer(f"{name}Data", item_serializer),
         },
-    )
\ No newline at end of file
+    )
+
+
+ROOM_CARD_VIEW_PARAMETER = OpenApiParameter(
+    name="view",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description="Send view=card for compact room cards (RoomCardSerializer) instead of full rooms.",
+)
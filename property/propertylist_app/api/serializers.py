@@ -7,7 +7,8 @@ from dateutil.relativedelta import relativedelta
 from datetime import date, datetime, time, timedelta
 from datetime import date as _date  # add if not already present
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, models as db_models, transaction
 
 
 from typing import Optional, Any, Dict, List
@@ -21,6 +22,7 @@ from propertylist_app.models import (
     SavedRoom, MessageThread, Message, Booking,
     AvailabilitySlot, Payment, Report, Notification, EmailOTP,
     MessageThreadState, ContactMessage,PhoneOTP,Tenancy,
+    SavedSearch,
 
 )
 from propertylist_app.validators import (
@@ -35,7 +37,10 @@ from propertylist_app.validators import (
     enforce_user_caps,
 )
 
+from propertylist_app.services.saved_rooms import saved_room_ids_for_request
+
 from django.utils import timezone
+from django.core.exceptions import ImproperlyConfigured
 from django.core import mail
 from django.utils.crypto import get_random_string
 import re
@@ -672,6 +677,38 @@ class UserReviewSummarySerializer(serializers.Serializer):
 # --------------------
 # Room Serializer
 # --------------------
+def _room_listing_state(obj) -> str:
+    """
+    Shared by RoomSerializer and RoomCardSerializer.
+    Returns one of: 'draft', 'active', 'expired', 'hidden'.
+    """
+    # If the queryset annotated a listing_state, reuse it.
+    state = getattr(obj, "listing_state", None)
+    if state:
+        return str(state)
+
+    today = date.today()
+
+    # 1) Explicit hidden + past paid_until = expired
+    if obj.status == "hidden" and obj.paid_until and obj.paid_until < today:
+        return "expired"
+
+    # 2) Hidden but not clearly expired
+    if obj.status == "hidden":
+        return "hidden"
+
+    # 3) No paid_until at all = draft (never paid / not live yet)
+    if obj.paid_until is None:
+        return "draft"
+
+    # 4) Paid until date in the past = expired
+    if obj.paid_until < today:
+        return "expired"
+
+    # 5) Otherwise treat as active
+    return "active"
+
+
 class RoomSerializer(serializers.ModelSerializer):
     category = serializers.CharField(source="category.name", read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
@@ -730,7 +767,8 @@ class RoomSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Room
-        fields = "__all__"
+        # map_cell is an internal clustering column (RoomMapView)
+        exclude = ["map_cell"]
 
     def validate_title(self, value):
         return validate_listing_title(value)
@@ -981,12 +1019,8 @@ class RoomSerializer(serializers.ModelSerializer):
         if annotated is not None:
             return bool(annotated)
 
-        request = self.context.get("request")
-        user = getattr(request, "user", None) if request is not None else None
-        if not user or not user.is_authenticated:
-            return False
-
-        return SavedRoom.objects.filter(user=user, room=obj).exists()
+        # one lookup per request (cached per user), not one query per room
+        return obj.id in saved_room_ids_for_request(self.context.get("request"))
 
     @extend_schema_field(OpenApiTypes.NUMBER)
     def get_distance_miles(self, obj) -> float | None:
@@ -1090,31 +1124,7 @@ class RoomSerializer(serializers.ModelSerializer):
         Returns one of: 'draft', 'active', 'expired', 'hidden'.
         Used by the 'My Listings' page to group into tabs.
         """
-        # If the queryset annotated a listing_state, reuse it.
-        state = getattr(obj, "listing_state", None)
-        if state:
-            return str(state)
-
-        today = date.today()
-
-        # 1) Explicit hidden + past paid_until = expired
-        if obj.status == "hidden" and obj.paid_until and obj.paid_until < today:
-            return "expired"
-
-        # 2) Hidden but not clearly expired
-        if obj.status == "hidden":
-            return "hidden"
-
-        # 3) No paid_until at all = draft (never paid / not live yet)
-        if obj.paid_until is None:
-            return "draft"
-
-        # 4) Paid until date in the past = expired
-        if obj.paid_until < today:
-            return "expired"
-
-        # 5) Otherwise treat as active
-        return "active"
+        return _room_listing_state(obj)
 
     # --- New helpers for 'View Available Days' ---
 
@@ -1157,6 +1167,212 @@ class RoomSerializer(serializers.ModelSerializer):
         return normalised
     
     
+# --------------------
+# Room Card Serializer (list views)
+# --------------------
+# Model columns a card needs. Views that serialise cards load these
+# (plus category / property_owner / property_owner__profile and the
+# prefetched_approved_images Prefetch) and nothing else.
+ROOM_CARD_FIELDS = (
+    "id",
+    "title",
+    "price_per_month",
+    "location",
+    "category_id",
+    "property_owner_id",
+    "property_type",
+    "number_of_bedrooms",
+    "number_of_bathrooms",
+    "furnished",
+    "bills_included",
+    "available_from",
+    "is_available",
+    "avg_rating",
+    "number_rating",
+    "latitude",
+    "longitude",
+    "image",
+    "status",
+    "paid_until",
+    "created_at",
+    "updated_at",
+)
+
+# ROOM_CARD_FIELDS plus the columns a card reads through the select_related
+# joins: the only() projection of card list queries (_with_room_card_preloads)
+ROOM_CARD_QUERY_FIELDS = (
+    *ROOM_CARD_FIELDS,
+    "category__name",
+    "property_owner__username",
+    "property_owner__first_name",
+    "property_owner__last_name",
+    "property_owner__profile__avatar",
+)
+
+
+def _block_card_queries(execute, sql, params, many, context):
+    raise AssertionError(
+        "RoomCardSerializer hit the database; preload this in the view instead: " + sql
+    )
+
+
+class RoomCardListSerializer(serializers.ListSerializer):
+    """
+    Cards must be fully preloaded by the view. With ROOM_CARD_QUERY_GUARD on
+    (test settings), any query fired while rendering the list fails loudly.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, db_models.manager.BaseManager) else data
+        rows = list(iterable)  # the list query itself is allowed
+
+        # the saved-room id set is per request, load it before the guard
+        saved_room_ids_for_request(self.context.get("request"))
+
+        if getattr(settings, "ROOM_CARD_QUERY_GUARD", False):
+            with connection.execute_wrapper(_block_card_queries):
+                return [self.child.to_representation(item) for item in rows]
+        return [self.child.to_representation(item) for item in rows]
+
+
+class RoomCardSerializer(serializers.Serializer):
+    """
+    Read-only compact room card for list views (search, nearby, home, saved, my listings).
+
+    Expects (no per-row queries):
+      - only(*ROOM_CARD_QUERY_FIELDS): reads nothing else, so no deferred loads
+      - select_related("category", "property_owner", "property_owner__profile")
+      - Prefetch approved images to_attr="prefetched_approved_images"
+      - is_saved comes from the per-request saved-room id set (or an _is_saved annotation)
+      - optional: distance_miles, photo_count, listing_state attributes
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    price_per_month = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
+    location = serializers.CharField(read_only=True)
+    category = serializers.CharField(read_only=True, allow_null=True)
+    property_owner = serializers.IntegerField(read_only=True)
+    property_type = serializers.CharField(read_only=True)
+    number_of_bedrooms = serializers.IntegerField(read_only=True)
+    number_of_bathrooms = serializers.IntegerField(read_only=True)
+    furnished = serializers.BooleanField(read_only=True)
+    bills_included = serializers.BooleanField(read_only=True)
+    available_from = serializers.DateField(read_only=True, allow_null=True)
+    is_available = serializers.BooleanField(read_only=True)
+    avg_rating = serializers.FloatField(read_only=True)
+    number_rating = serializers.IntegerField(read_only=True)
+    latitude = serializers.FloatField(read_only=True, allow_null=True)
+    longitude = serializers.FloatField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+    is_saved = serializers.BooleanField(read_only=True)
+    distance_miles = serializers.FloatField(read_only=True, allow_null=True)
+    owner_name = serializers.CharField(read_only=True)
+    owner_avatar = serializers.URLField(read_only=True, allow_null=True)
+    main_photo = serializers.URLField(read_only=True, allow_null=True)
+    photo_count = serializers.IntegerField(read_only=True)
+    listing_state = serializers.CharField(read_only=True)
+
+    class Meta:
+        list_serializer_class = RoomCardListSerializer
+
+    def _absolute(self, url):
+        """
+        build_absolute_uri() once per request, then plain string joins.
+        """
+        if not url or "://" in url:
+            return url
+
+        request = self.context.get("request")
+        if request is None:
+            return url
+
+        prefix = self.context.get("_absolute_url_prefix")
+        if prefix is None:
+            prefix = request.build_absolute_uri("/")[:-1]
+            self.context["_absolute_url_prefix"] = prefix
+
+        if url.startswith("/"):
+            return prefix + url
+        return request.build_absolute_uri(url)
+
+    def _is_saved(self, obj):
+        annotated = getattr(obj, "_is_saved", None)
+        if annotated is not None:
+            return bool(annotated)
+        return obj.id in saved_room_ids_for_request(self.context.get("request"))
+
+    def to_representation(self, obj):
+        fields = self.fields
+
+        category = obj.category
+        owner = obj.property_owner
+        profile = getattr(owner, "profile", None) if owner else None
+        avatar = getattr(profile, "avatar", None) if profile else None
+
+        approved_images = getattr(obj, "prefetched_approved_images", None)
+        if approved_images is None:
+            # a per-row query here is what this serializer exists to avoid
+            raise ImproperlyConfigured(
+                "RoomCardSerializer needs approved images prefetched to_attr="
+                "'prefetched_approved_images' (see _with_room_card_preloads in api/views/common.py)."
+            )
+
+        if approved_images and approved_images[0].image:
+            main_photo = approved_images[0].image.url
+        elif obj.image:
+            main_photo = obj.image.url
+        else:
+            main_photo = None
+
+        photo_count = getattr(obj, "photo_count", None)
+        if photo_count is None:
+            photo_count = len(approved_images) + (1 if obj.image else 0)
+
+        distance = getattr(obj, "distance_miles", None)
+        if distance is not None:
+            try:
+                distance = round(float(distance), 2)
+            except (TypeError, ValueError):
+                distance = None
+
+        available_from = obj.available_from
+        owner_name = ""
+        if owner:
+            owner_name = (owner.get_full_name() or "").strip() or owner.username
+
+        return {
+            "id": obj.id,
+            "title": obj.title,
+            "price_per_month": fields["price_per_month"].to_representation(obj.price_per_month),
+            "location": obj.location,
+            "category": category.name if category else None,
+            "property_owner": obj.property_owner_id,
+            "property_type": obj.property_type,
+            "number_of_bedrooms": obj.number_of_bedrooms,
+            "number_of_bathrooms": obj.number_of_bathrooms,
+            "furnished": obj.furnished,
+            "bills_included": obj.bills_included,
+            "available_from": available_from.isoformat() if available_from else None,
+            "is_available": obj.is_available,
+            "avg_rating": obj.avg_rating,
+            "number_rating": obj.number_rating,
+            "latitude": obj.latitude,
+            "longitude": obj.longitude,
+            "created_at": fields["created_at"].to_representation(obj.created_at),
+            "updated_at": fields["updated_at"].to_representation(obj.updated_at),
+            "is_saved": self._is_saved(obj),
+            "distance_miles": distance,
+            "owner_name": owner_name,
+            "owner_avatar": self._absolute(avatar.url) if avatar else None,
+            "main_photo": self._absolute(main_photo),
+            "photo_count": photo_count,
+            "listing_state": _room_listing_state(obj),
+        }
+    
+    
 # --------------------
 # Room Preview Serializer (Step 5/5)
 # --------------------
@@ -1380,6 +1596,20 @@ class SearchFiltersSerializer(serializers.Serializer):
         return attrs
 
 
+# --------------------
+# Saved searches (alerts)
+# --------------------
+class SavedSearchSerializer(serializers.ModelSerializer):
+    query_string = serializers.CharField(
+        write_only=True,
+        allow_blank=True,
+        help_text="Search query string as sent to /api/search/rooms/ (e.g. 'max_price=900&furnished=true').",
+    )
+
+    class Meta:
+        model = SavedSearch
+        fields = ["id", "name", "query", "query_string", "is_active", "created_at"]
+        read_only_fields = ["id", "query", "created_at"]
 
 
 class FindAddressSerializer(serializers.Serializer):
@@ -1415,6 +1645,14 @@ class HomeSummarySerializer(serializers.Serializer):
     app_links = serializers.DictField()
 
 
+class HomeSummaryCardSerializer(HomeSummarySerializer):
+    """
+    Same payload as HomeSummarySerializer, rooms rendered as compact cards (?view=card).
+    """
+    featured_rooms = RoomCardSerializer(many=True)
+    latest_rooms = RoomCardSerializer(many=True)
+
+
 # --------------------
 # User & Auth
 # --------------------
@@ -2123,7 +2361,11 @@ class MessageThreadSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(MessageSerializer(allow_null=True))
     def get_last_message(self, obj):
-        msg = obj.messages.order_by("-created").first()
+        # list views attach it in bulk (attach_thread_summaries); fallback is 1 query per thread
+        if hasattr(obj, "_last_message"):
+            msg = obj._last_message
+        else:
+            msg = obj.messages.select_related("sender").order_by("-created").first()
         return MessageSerializer(msg).data if msg else None
 
     @extend_schema_field(serializers.IntegerField())
@@ -2131,6 +2373,8 @@ class MessageThreadSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return 0
+        if hasattr(obj, "_unread_count"):
+            return obj._unread_count
         return obj.messages.exclude(sender=request.user).exclude(
             reads__user=request.user
         ).count()
@@ -2146,10 +2390,9 @@ class MessageThreadSerializer(serializers.ModelSerializer):
         if not user or not user.is_authenticated:
             return None
 
-        # If view pre-attached a state
-        st = getattr(obj, "_state_for_user", None)
-        if st is not None:
-            return st
+        # If view pre-attached a state (None = the user has no state row for this thread)
+        if hasattr(obj, "_state_for_user"):
+            return obj._state_for_user
 
         # Fallback: 1 query per thread
         return MessageThreadState.objects.filter(user=user, thread=obj).first()
@@ -2271,7 +2514,11 @@ class AvailabilitySlotSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_is_full(self, obj) -> bool:
-            return bool(obj.is_full)
+        # list views annotate active_bookings (see _with_active_booking_counts)
+        active = getattr(obj, "active_bookings", None)
+        if active is None:
+            active = obj.bookings.filter(canceled_at__isnull=True).count()
+        return active >= obj.max_bookings
 
 
 
@@ -2518,6 +2765,55 @@ class ReportSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ReportTargetSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    label = serializers.CharField()
+    status = serializers.CharField(allow_null=True)
+    owner_id = serializers.IntegerField(allow_null=True)
+    owner_username = serializers.CharField(allow_null=True)
+
+
+class ModerationReportSerializer(ReportSerializer):
+    """
+    ReportSerializer plus a summary of the reported object for the moderation queue.
+
+    Reads `report.target` and the target's owner/sender without querying: the
+    list view prefetches them per content type (moderation.with_report_targets).
+    `target` is null when the object has since been deleted.
+    """
+
+    target = serializers.SerializerMethodField()
+
+    class Meta(ReportSerializer.Meta):
+        fields = [*ReportSerializer.Meta.fields, "target"]
+
+    LABEL_LENGTH = 120
+
+    @extend_schema_field(ReportTargetSerializer(allow_null=True))
+    def get_target(self, obj) -> Optional[Dict[str, Any]]:
+        target = obj.target
+        if target is None:
+            return None
+
+        status = None
+        if isinstance(target, Room):
+            label, owner, status = target.title, target.property_owner, target.status
+        elif isinstance(target, Message):
+            label, owner = target.body, target.sender
+        elif isinstance(target, Review):
+            label, owner = target.notes or f"{target.overall_rating}/5", target.reviewer
+        else:
+            label, owner = target.get_username(), target
+
+        return {
+            "id": target.pk,
+            "label": (label or "")[: self.LABEL_LENGTH],
+            "status": status,
+            "owner_id": getattr(owner, "pk", None),
+            "owner_username": getattr(owner, "username", None),
+        }
+
+
 # --- GDPR ---
 class GDPRExportStartSerializer(serializers.Serializer):
     confirm = serializers.BooleanField(required=True)
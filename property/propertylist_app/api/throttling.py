@@ -1,16 +1,205 @@
 from rest_framework.throttling import UserRateThrottle
+from rest_framework.throttling import AnonRateThrottle
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.throttling import SimpleRateThrottle
 import logging
+from collections import Counter
+from django.conf import settings
 from django.core.cache import caches
 from rest_framework.settings import api_settings
 
+from propertylist_app.utils.cache import redis_client
 
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# Counter throttles
+#
+# DRF's SimpleRateThrottle keeps a pickled list of request timestamps per key
+# and does a get + set for every throttle class on every request.
+#
+# CounterRateThrottle keeps one integer per key and window instead. The first
+# counter throttle checked for a request evaluates *all* counter throttles of
+# the view at once (view.get_throttles()): one pipelined Redis round trip of
+# INCRBY + EXPIRE (current window) and GET (previous window) per key.
+# Throttled requests are given back with a DECRBY, so like DRF only allowed
+# requests count.
+#
+# THROTTLE_ALGORITHM:
+#   "sliding" (default) - previous window weighted by how much of it still
+#                         overlaps the sliding window, plus the current one
+#   "fixed"             - plain fixed window counter
+# ---------------------------------------------------------------------
+
+_BATCH_ATTR = "_counter_throttle_batch"
+
+
+def _incr_and_read(cache, incrs, reads):
+    """
+    incrs: [(key, amount, ttl)] -> counters after the increment
+    reads: [key]                -> current values (0 when missing)
+    """
+    client = redis_client(cache)
+    if client is not None:
+        pipe = client.pipeline(transaction=False)
+        for key, amount, ttl in incrs:
+            full = cache.make_and_validate_key(key)
+            pipe.incrby(full, amount)
+            pipe.expire(full, ttl)
+        for key in reads:
+            pipe.get(cache.make_and_validate_key(key))
+        out = pipe.execute()
+        counts = [int(v) for v in out[0:2 * len(incrs):2]]
+        values = [int(v or 0) for v in out[2 * len(incrs):]]
+        return counts, values
+
+    counts = []
+    for key, amount, ttl in incrs:
+        try:
+            counts.append(cache.incr(key, amount))
+        except ValueError:
+            if cache.add(key, amount, ttl):
+                counts.append(amount)
+            else:
+                counts.append(cache.incr(key, amount))
+    found = cache.get_many(reads) if reads else {}
+    return counts, [int(found.get(key) or 0) for key in reads]
+
+
+def _give_back(cache, amounts):
+    client = redis_client(cache)
+    if client is not None:
+        pipe = client.pipeline(transaction=False)
+        for key, amount in amounts:
+            pipe.decrby(cache.make_and_validate_key(key), amount)
+        pipe.execute()
+        return
+    for key, amount in amounts:
+        try:
+            cache.decr(key, amount)
+        except ValueError:
+            pass
+
+
+def evaluate_counter_throttles(throttles, now):
+    """
+    Check every prepared counter throttle in one round trip.
+    Returns {throttle.key: (allowed, wait_seconds)}.
+    """
+    algorithm = getattr(settings, "THROTTLE_ALGORITHM", "sliding")
+
+    # DRF records one history entry per throttle instance, so two throttles
+    # sharing a key count twice; keep that.
+    by_key = {}
+    amounts = Counter()
+    for t in throttles:
+        by_key.setdefault(t.key, t)
+        amounts[t.key] += 1
+
+    incrs, reads, meta = [], [], []
+    for key, t in by_key.items():
+        window = int(now // t.duration)
+        current_key = f"{key}:{window}"
+        incrs.append((current_key, amounts[key], 2 * t.duration))
+        reads.append(f"{key}:{window - 1}")
+        meta.append((key, t, current_key, (now % t.duration) / t.duration))
+
+    cache = next(iter(by_key.values())).cache
+    counts, previous = _incr_and_read(cache, incrs, reads)
+
+    results, give_back = {}, []
+    for (key, t, current_key, elapsed), count, prev in zip(meta, counts, previous):
+        weight = (1.0 - elapsed) if algorithm == "sliding" else 0.0
+        allowed = prev * weight + count <= t.num_requests
+        wait = None
+        if not allowed:
+            give_back.append((current_key, amounts[key]))
+            wait = _wait_seconds(t, count - amounts[key], prev * (algorithm == "sliding"), elapsed)
+        results[key] = (allowed, wait)
+
+    if give_back:
+        _give_back(cache, give_back)
+    return results
+
+
+def _wait_seconds(t, count, prev, elapsed):
+    remaining = t.duration * (1.0 - elapsed)
+    if prev and count + 1 <= t.num_requests:
+        # wait until the previous window's weight has dropped far enough
+        weight = (t.num_requests - count - 1) / prev
+        return max(0.0, min(remaining, t.duration * (1.0 - weight) - t.duration * elapsed))
+    return remaining
 
 
+class CounterRateThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle on atomic counters. Subclasses implement get_cache_key
+    exactly like for SimpleRateThrottle.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def prepare(self, request, view) -> bool:
+        """Resolve rate and key for this request; False when it does not apply."""
+        if self.rate is None:
+            return False
+        self.key = self.get_cache_key(request, view)
+        return self.key is not None
+
+    def allow_request(self, request, view):
+        if not self.prepare(request, view):
+            return True
+
+        batch = getattr(request, _BATCH_ATTR, None) or {}
+        if self.key not in batch:
+            batch = {**batch, **self._evaluate_view(request, view)}
+            setattr(request, _BATCH_ATTR, batch)
+
+        allowed, self._wait = batch.get(self.key, (True, None))
+        return allowed
+
+    def _evaluate_view(self, request, view):
+        throttles = [self]
+        for t in view.get_throttles():
+            if isinstance(t, CounterRateThrottle) and type(t) is not type(self) and t.prepare(request, view):
+                throttles.append(t)
+        try:
+            return evaluate_counter_throttles(throttles, self.timer())
+        except Exception:
+            # Fail open: a cache outage must not take the API down
+            logger.warning("throttle counters unavailable", exc_info=True)
+            return {t.key: (True, None) for t in throttles}
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class UserCounterThrottle(CounterRateThrottle, UserRateThrottle):
+    """UserRateThrottle (scope "user") on counters."""
 
 
-class RegisterAnonThrottle(SimpleRateThrottle):
+class AnonCounterThrottle(CounterRateThrottle, AnonRateThrottle):
+    """AnonRateThrottle (scope "anon") on counters."""
+
+
+class ScopedCounterThrottle(CounterRateThrottle, ScopedRateThrottle):
+    """ScopedRateThrottle (view.throttle_scope) on counters."""
+
+    def prepare(self, request, view) -> bool:
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return False
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().prepare(request, view)
+
+
+
+
+
+
+class RegisterAnonThrottle(CounterRateThrottle):
     """
     Anon (IP-based) throttle for registration. Blocks 3rd+ attempt in the time window.
     Scope name must exist in DEFAULT_THROTTLE_RATES.
@@ -30,7 +219,7 @@ class RegisterAnonThrottle(SimpleRateThrottle):
         return self.cache_format % {"scope": self.scope, "ident": ident}
 
 
-class MessageUserThrottle(SimpleRateThrottle):
+class MessageUserThrottle(CounterRateThrottle):
     """
     Per-user throttle for creating messages. Blocks 3rd+ attempt in the time window.
     Scope name must exist in DEFAULT_THROTTLE_RATES.
@@ -48,31 +237,29 @@ class MessageUserThrottle(SimpleRateThrottle):
         return self.cache_format % {"scope": self.scope, "ident": ident}
 
 
-class  ReviewCreateThrottle(UserRateThrottle):
+class  ReviewCreateThrottle(UserCounterThrottle):
   scope = 'review-create'
   
-class ReviewListThrottle(UserRateThrottle):
+class ReviewListThrottle(UserCounterThrottle):
   scope = 'review-list'  
   
 
-class LoginScopedThrottle(ScopedRateThrottle):
+class LoginScopedThrottle(ScopedCounterThrottle):
     scope = "login"
 
-class RegisterScopedThrottle(ScopedRateThrottle):
+class RegisterScopedThrottle(ScopedCounterThrottle):
     scope = "register"
 
-class PasswordResetScopedThrottle(ScopedRateThrottle):
+class PasswordResetScopedThrottle(ScopedCounterThrottle):
     scope = "password-reset"
 
-class PasswordResetConfirmScopedThrottle(ScopedRateThrottle):
+class PasswordResetConfirmScopedThrottle(ScopedCounterThrottle):
     scope = "password-reset-confirm"
 
 
 
 
-logger = logging.getLogger(__name__)
-
-class ReportCreateScopedThrottle(ScopedRateThrottle):
+class ReportCreateScopedThrottle(ScopedCounterThrottle):
     scope = "report-create"
 
     def get_rate(self):
@@ -82,7 +269,7 @@ class ReportCreateScopedThrottle(ScopedRateThrottle):
         return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
 
 
-class MessagingScopedThrottle(ScopedRateThrottle):
+class MessagingScopedThrottle(ScopedCounterThrottle):
     scope = "messaging"
   
   
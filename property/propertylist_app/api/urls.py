@@ -32,11 +32,14 @@ from propertylist_app.api.views import (
     TenancyReviewListView,
     
     # Search & Nearby
-    SearchRoomsView, NearbyRoomsView,
+    SearchRoomsView, SearchRoomFacetsView, NearbyRoomsView, RoomMapView,
 
     # Saved rooms
     RoomSaveView, RoomSaveToggleView, MySavedRoomsView,
 
+    # Saved searches
+    MySavedSearchesView, MySavedSearchDetailView,
+
     # Messaging
     MessageThreadListCreateView, MessageListCreateView, ThreadMarkReadView, StartThreadFromRoomView,ThreadMoveToBinView,ThreadRestoreFromBinView,ThreadSetLabelView,
     MessageThreadStateView,MessageStatsView,InboxListView,
@@ -106,7 +109,8 @@ urlpatterns = [
     path("rooms/<int:pk>/preview/",    RoomPreviewView.as_view(),   name="room-preview"), 
     
     # Cached alt list
-    path("rooms-alt/", cache_page(60)(RoomListAlt.as_view()), name="room-list-alt"),
+    # anonymous responses cached as rendered bytes + ETag by CachedAnonymousGETMixin
+    path("rooms-alt/", RoomListAlt.as_view(), name="room-list-alt"),
     
 
     # Room categories
@@ -141,7 +145,9 @@ urlpatterns = [
 
     # --- Search & discovery ---
     path("search/rooms/",  cache_page(60)(SearchRoomsView.as_view()),  name="search-rooms"),
+    path("search/rooms/facets/", SearchRoomFacetsView.as_view(),       name="search-room-facets"),
     path("rooms/nearby/",  NearbyRoomsView.as_view(),                  name="rooms-nearby"),
+    path("rooms/map/",     RoomMapView.as_view(),                      name="rooms-map"),
     path("search/find-address/", FindAddressView.as_view(),            name="search-find-address"),
 
     # --- Saved rooms ---
@@ -149,6 +155,10 @@ urlpatterns = [
     path("rooms/<int:pk>/save-toggle/",    RoomSaveToggleView.as_view(), name="room-save-toggle"),
     path("users/me/saved/rooms/",          MySavedRoomsView.as_view(),   name="my-saved-rooms"),
 
+    # --- Saved searches (alerts) ---
+    path("users/me/saved/searches/",          MySavedSearchesView.as_view(),     name="my-saved-searches"),
+    path("users/me/saved/searches/<int:pk>/", MySavedSearchDetailView.as_view(), name="my-saved-search-detail"),
+
     # --- Messaging ---
     path("messages/threads/",                              MessageThreadListCreateView.as_view(), name="message-threads"),
     path("messages/threads/<int:thread_id>/messages/",     MessageListCreateView.as_view(),       name="thread-messages"),
@@ -137,7 +137,11 @@ from .public import (
     HomePageView,
     CityListView,
     SearchRoomsView,
+    SearchRoomFacetsView,
+    MySavedSearchesView,
+    MySavedSearchDetailView,
     NearbyRoomsView,
+    RoomMapView,
     FindAddressView,
     EmailOTPVerifyView,
     EmailOTPResendView,
@@ -44,8 +44,10 @@ from drf_spectacular.utils import (
 
 #Project helpers/services
 from propertylist_app.services.captcha import verify_captcha
+from propertylist_app.services.auth_cache import invalidate_auth_user
 from propertylist_app.services.security import (
     clear_login_failures,
+    client_ip,
     is_locked_out,
     register_login_failure,
 )
@@ -93,7 +95,7 @@ logger_auth = logging.getLogger("rentout.auth")
 logger = logger_auth
 
 #DRF throttling
-from rest_framework.throttling import ScopedRateThrottle
+from propertylist_app.api.throttling import ScopedCounterThrottle
 
 
 
@@ -545,7 +547,7 @@ class LoginView(APIView):
     permission_classes = [AllowAny]
     throttle_scope = "login"
     versioning_class = None
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedCounterThrottle]
 
     @extend_schema(
         request=LoginSerializer,
@@ -596,7 +598,7 @@ class LoginView(APIView):
                     data["identifier"] = data.get("email")
 
             identifier_for_lock = (data.get("identifier") or "").strip()
-            ip = request.META.get("REMOTE_ADDR", "") or ""
+            ip = client_ip(request)
 
             logger.info("login_attempt ip=%s identifier=%s", ip, (identifier_for_lock or "-"))
 
@@ -670,9 +672,9 @@ class LoginView(APIView):
                 logger.info("login_success ip=%s user_id=%s", ip, user.id)
                 return ok_response(payload, status_code=status.HTTP_200_OK)
 
-            register_login_failure(ip, identifier_for_lock or identifier)
+            locked = register_login_failure(ip, identifier_for_lock or identifier)
 
-            if identifier_for_lock and is_locked_out(ip, identifier_for_lock):
+            if locked and identifier_for_lock:
                 logger.warning("login_lockout ip=%s identifier=%s", ip, identifier_for_lock)
                 return Response(
                     {"detail": "Too many failed attempts. Try again later."},
@@ -725,6 +727,9 @@ class LogoutView(APIView):
             # Reason: treat invalid/expired/already-blacklisted the same for security + consistency
             raise ValidationError({"refresh": "Invalid or expired refresh token."})
 
+        # Reason: next request re-reads the user instead of the cached auth user
+        invalidate_auth_user(request.user.pk)
+
         # Reason: A3/C1 consistent success envelope
         return ok_response({"detail": "Logged out."}, status_code=status.HTTP_200_OK)
     
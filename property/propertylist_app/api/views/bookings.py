@@ -13,7 +13,7 @@ from rest_framework.views import APIView
 from rest_framework import filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.throttling import UserRateThrottle
+from propertylist_app.api.throttling import UserCounterThrottle
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -126,7 +126,7 @@ class BookingListCreateView(generics.ListCreateAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardLimitOffsetPagination
-    throttle_classes = [UserRateThrottle]
+    throttle_classes = [UserCounterThrottle]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ["start", "end", "created_at", "id"]
     ordering = ["-created_at"]
@@ -1,9 +1,24 @@
 
 from datetime import date
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.pagination import LimitOffsetPagination
+from django.db.models import Prefetch
+
+from property.instrumentation import record_streamed_serialization
+from propertylist_app.models import RoomImage
+from propertylist_app.api.serializers import ROOM_CARD_QUERY_FIELDS
+from propertylist_app.api.renderers import (
+    ENVELOPE_HEADER,
+    EnvelopeJSONRenderer,
+    compact_envelope,
+    envelope_payload,
+    wants_compact_envelope,
+)
 
 
 
@@ -178,6 +193,39 @@ def _wrap_response_success(response):
     return response
 
 
+# For list views with potentially large pages (messages, reviews, transactions).
+# A GET 200 in the compact envelope whose page has at least STREAMING_JSON_MIN_ITEMS
+# rows is sent as a StreamingHttpResponse, encoded a chunk of rows at a time by
+# EnvelopeJSONRenderer.iter_render. The bytes are the same as the non-streamed
+# compact response. Everything else is untouched.
+# (No class docstring: drf-spectacular would use it as the description of every view.)
+class StreamingEnvelopeMixin:
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if request.method != "GET" or not isinstance(response, Response) or response.status_code != 200:
+            return response
+        renderer = getattr(response, "accepted_renderer", None)
+        if not isinstance(renderer, EnvelopeJSONRenderer) or not wants_compact_envelope(request):
+            return response
+
+        payload = compact_envelope(envelope_payload(response.data))
+        rows = payload.get("data")
+        if not isinstance(rows, list) or len(rows) < getattr(settings, "STREAMING_JSON_MIN_ITEMS", 50):
+            return response
+
+        streaming = StreamingHttpResponse(
+            record_streamed_serialization(renderer.iter_render(payload)),
+            content_type=f"{response.accepted_media_type}; charset={renderer.charset}",
+        )
+        for name, value in response.items():
+            if name.lower() != "content-type":
+                streaming[name] = value
+        patch_vary_headers(streaming, ("Accept", ENVELOPE_HEADER))
+        return streaming
+
+
 
 
 def _listing_state_for_room(room):
@@ -194,3 +242,41 @@ def _listing_state_for_room(room):
         return "expired"
 
     return "active"
+
+
+
+
+# --------------------
+# Room cards (lean list serialisation)
+# --------------------
+
+def _wants_room_cards(request):
+    """
+    ?view=card -> list endpoints return RoomCardSerializer instead of the full RoomSerializer.
+    """
+    if request is None:
+        return False
+    return (request.query_params.get("view") or "").strip().lower() == "card"
+
+
+def _with_room_card_preloads(qs, cards=False):
+    """
+    Everything RoomCardSerializer (and RoomSerializer) reads per row,
+    loaded up-front so serialisation does not query.
+    is_saved comes from services.saved_rooms (one cached id set per request).
+
+    cards=True (the view serialises RoomCardSerializer) also narrows the rows
+    to ROOM_CARD_QUERY_FIELDS; RoomSerializer needs the full row.
+    """
+    if cards:
+        qs = qs.only(*ROOM_CARD_QUERY_FIELDS)
+    qs = qs.select_related(
+        "category", "property_owner", "property_owner__profile"
+    ).prefetch_related(
+        Prefetch(
+            "roomimage_set",
+            queryset=RoomImage.objects.filter(status="approved").order_by("id"),
+            to_attr="prefetched_approved_images",
+        )
+    )
+    return qs
@@ -2,7 +2,7 @@ import json
 
 
 
-from django.db.models import Count, Exists, Max, OuterRef, Q, Subquery
+from django.db.models import Count, Exists, Max, OuterRef, Q, Subquery, Value
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -14,13 +14,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import filters
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.throttling import ScopedRateThrottle, UserRateThrottle
 from drf_spectacular.utils import extend_schema, OpenApiResponse,inline_serializer,OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 
 from urllib.parse import quote
-from urllib.request import Request, urlopen
+from urllib.error import HTTPError, URLError
 
 
 
@@ -37,7 +36,16 @@ from propertylist_app.models import (
     SavedRoom,
 )
 from propertylist_app.api.pagination import StandardLimitOffsetPagination
-from propertylist_app.api.throttling import MessageUserThrottle, MessagingScopedThrottle
+from propertylist_app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from propertylist_app.services.http import get_pooled_session
+from propertylist_app.utils.cache import bump_user_version
+from propertylist_app.utils.cached_views import CachedPerUserGETMixin
+from propertylist_app.api.throttling import (
+    MessageUserThrottle,
+    MessagingScopedThrottle,
+    ScopedCounterThrottle,
+    UserCounterThrottle,
+)
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
 from propertylist_app.api.schema_helpers import (
     standard_response_serializer,
@@ -56,7 +64,7 @@ from propertylist_app.api.serializers import (
     MessageCreateSerializer,
     DetailResponseSerializer,
     RoomSerializer,
-    
+    RoomCardSerializer,
 )
 from ..serializers import (
     ContactMessageSerializer,
@@ -64,7 +72,14 @@ from ..serializers import (
     ThreadSetLabelRequestSerializer,
     ThreadMarkReadRequestSerializer,
 )
-from .common import ok_response, _pagination_meta, _wrap_response_success
+from .common import (
+    StreamingEnvelopeMixin,
+    ok_response,
+    _pagination_meta,
+    _wrap_response_success,
+    _wants_room_cards,
+    _with_room_card_preloads,
+)
 
 
 
@@ -74,6 +89,44 @@ class EmptyDataSerializer(serializers.Serializer):
     pass
 
 
+def attach_thread_summaries(user, threads):
+    """
+    Attach t._last_message and t._unread_count to every thread, using two queries
+    for the whole list instead of two per thread (MessageThreadSerializer reads them).
+    """
+    threads = list(threads)
+    ids = [t.id for t in threads]
+    if not ids:
+        return threads
+
+    last_ids = dict(
+        MessageThread.objects.filter(id__in=ids)
+        .annotate(
+            last_msg_id=Subquery(
+                Message.objects.filter(thread=OuterRef("pk")).order_by("-created", "-id").values("id")[:1]
+            )
+        )
+        .values_list("id", "last_msg_id")
+    )
+    messages = Message.objects.select_related("sender").in_bulk(
+        [mid for mid in last_ids.values() if mid is not None]
+    )
+
+    unread = dict(
+        Message.objects.filter(thread_id__in=ids)
+        .exclude(sender=user)
+        .exclude(reads__user=user)
+        .values("thread_id")
+        .annotate(n=Count("id"))
+        .values_list("thread_id", "n")
+    )
+
+    for t in threads:
+        t._last_message = messages.get(last_ids.get(t.id))
+        t._unread_count = unread.get(t.id, 0)
+    return threads
+
+
 
 
 
@@ -89,7 +142,8 @@ class InboxListView(APIView):
     """
     permission_classes = [IsAuthenticated]
     pagination_class = StandardLimitOffsetPagination
-
+    # constant however many threads/notifications the user has (see attach_thread_summaries)
+    query_budget = 8
 
 
 
@@ -141,28 +195,18 @@ class InboxListView(APIView):
             .filter(participants=user)
             .annotate(last_msg_at=Max("messages__created"))   # FIX: created not created_at
             .order_by("-last_msg_at")
+            .prefetch_related("participants")
         )[:200]
 
         thread_items = []
-        for t in threads:
-            last_msg = (
-                t.messages.order_by("-created").first()       # FIX: created not created_at
-                if hasattr(t, "messages") else None
-            )
+        for t in attach_thread_summaries(user, threads):
+            last_msg = t._last_message
             if not last_msg:
                 continue
 
-            unread = (
-                t.messages
-                .exclude(sender=user)
-                .exclude(reads__user=user)
-                .count()
-            )
+            unread = t._unread_count
 
-            other_party = (
-                t.participants.exclude(id=user.id).first()
-                if hasattr(t, "participants") else None
-            )
+            other_party = next((p for p in t.participants.all() if p.id != user.id), None)
             title = getattr(other_party, "username", None) or "Message"
 
             thread_items.append(
@@ -197,6 +241,9 @@ class InboxListView(APIView):
 
 
 
+_ideal_postcodes_breaker = CircuitBreaker("ideal-postcodes", failure_threshold=5, reset_timeout=30)
+
+
 def _fetch_ideal_postcodes_suggestions(postcode: str):
     """
     Server-side postcode lookup via Ideal Postcodes API.
@@ -211,20 +258,38 @@ def _fetch_ideal_postcodes_suggestions(postcode: str):
         raise RuntimeError("IDEAL_POSTCODES_API_KEY is not configured.")
 
     encoded_postcode = quote(postcode)
-    url = f"https://api.ideal-postcodes.co.uk/v1/postcodes/{encoded_postcode}?api_key={quote(api_key)}"
+    url = f"https://api.ideal-postcodes.co.uk/v1/postcodes/{encoded_postcode}"
+
+    # Errors are raised as urllib HTTPError / URLError so FindAddressView's mapping stays the same.
+    try:
+        _ideal_postcodes_breaker.before_call()
+    except CircuitOpenError as exc:
+        raise URLError(str(exc))
+
+    try:
+        resp = get_pooled_session("ideal-postcodes").get(
+            url,
+            params={"api_key": api_key},
+            headers={
+                "Accept": "application/json",
+                "User-Agent": "RentOut/1.0 address-lookup",
+            },
+            timeout=(3, 10),
+        )
+    except Exception as exc:
+        _ideal_postcodes_breaker.record_failure()
+        raise URLError(str(exc))
 
-    req = Request(
-        url,
-        headers={
-            "Accept": "application/json",
-            "User-Agent": "RentOut/1.0 address-lookup",
-        },
-        method="GET",
-    )
+    if resp.status_code >= 500:
+        _ideal_postcodes_breaker.record_failure()
+    else:
+        # 4xx (404 unknown postcode, 429, ...) means the provider is up
+        _ideal_postcodes_breaker.record_success()
+
+    if resp.status_code >= 400:
+        raise HTTPError(url, resp.status_code, resp.reason or "", resp.headers, None)
 
-    with urlopen(req, timeout=10) as resp:
-        body = resp.read().decode("utf-8")
-        payload = json.loads(body)
+    payload = resp.json()
 
     results = payload.get("result", [])
     addresses = []
@@ -367,10 +432,12 @@ class RoomSaveToggleView(APIView):
 
 
 
-class MySavedRoomsView(generics.ListAPIView):
+class MySavedRoomsView(CachedPerUserGETMixin, generics.ListAPIView):
+    """Rooms saved by the current user (default ordering: most recently saved first)."""
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardLimitOffsetPagination
+    cache_prefix = "my-saved-rooms"
 
     def get_queryset(self):
         # drf-spectacular calls get_queryset without a real request/user context sometimes.
@@ -390,11 +457,11 @@ class MySavedRoomsView(generics.ListAPIView):
             .values("id")[:1]
         )
 
-        qs = (
+        qs = _with_room_card_preloads(
             Room.objects.alive()
             .filter(id__in=saved_qs.values_list("room_id", flat=True))
-            .annotate(saved_id=Subquery(latest_saved_id))
-            .select_related("category")
+            .annotate(saved_id=Subquery(latest_saved_id), _is_saved=Value(True)),
+            cards=_wants_room_cards(self.request),
         )
 
         ordering = (self.request.query_params.get("ordering") or "-saved_at").strip()
@@ -408,6 +475,11 @@ class MySavedRoomsView(generics.ListAPIView):
         }
         return qs.order_by(mapping.get(ordering, "-saved_id"))
 
+    def get_serializer_class(self):
+        if _wants_room_cards(self.request):
+            return RoomCardSerializer
+        return super().get_serializer_class()
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
@@ -420,7 +492,7 @@ class MySavedRoomsView(generics.ListAPIView):
 #---------------------
 # Messaging
 # --------------------
-class MessageThreadListCreateView(generics.ListCreateAPIView):
+class MessageThreadListCreateView(CachedPerUserGETMixin, generics.ListCreateAPIView):
 
     """
     GET /api/messages/threads/
@@ -434,7 +506,9 @@ class MessageThreadListCreateView(generics.ListCreateAPIView):
     serializer_class = MessageThreadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardLimitOffsetPagination
-    throttle_classes = [UserRateThrottle, MessagingScopedThrottle]  # keep off if tests expect no 429
+    throttle_classes = [UserCounterThrottle, MessagingScopedThrottle]  # keep off if tests expect no 429
+    query_budget = {"GET": 10}
+    cache_prefix = "message-threads"
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
@@ -615,10 +689,12 @@ class MessageThreadListCreateView(generics.ListCreateAPIView):
         page = self.paginate_queryset(queryset)
         if page is not None:
             self._attach_state_for_user(request.user, page)
+            attach_thread_summaries(request.user, page)
             serializer = self.get_serializer(page, many=True)
             meta = _pagination_meta(self.paginator)
             return ok_response(serializer.data, meta=meta, status_code=200)
 
+        queryset = attach_thread_summaries(request.user, queryset)
         self._attach_state_for_user(request.user, queryset)
         serializer = self.get_serializer(queryset, many=True)
         return ok_response(serializer.data, status_code=200)
@@ -828,12 +904,12 @@ class MessageStatsView(APIView):
 
 
 
-class MessageListCreateView(generics.ListCreateAPIView):
+class MessageListCreateView(StreamingEnvelopeMixin, generics.ListCreateAPIView):
 
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardLimitOffsetPagination
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedCounterThrottle]
     throttle_scope = "message_user"
 
     def get_throttles(self):
@@ -1014,6 +1090,8 @@ class ThreadMarkReadView(APIView):
             [MessageRead(message=m, user=request.user) for m in to_mark],
             ignore_conflicts=True,
         )
+        # bulk_create sends no post_save
+        bump_user_version(request.user.pk)
 
         return ok_response({"marked": to_mark.count()}, status_code=status.HTTP_200_OK) 
       
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.apps import apps
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from django.db.models import Avg, Count, Max, Q, Sum
 from django.conf import settings
 
@@ -18,13 +19,14 @@ from rest_framework.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema, OpenApiResponse, inline_serializer
 
 from propertylist_app.services.captcha import verify_captcha
-from propertylist_app.models import AuditLog, Report, Room, Booking, Payment, Message, MessageThread
+from propertylist_app.models import AuditLog, Report, Review, Room, Booking, Payment, Message, MessageThread
 from propertylist_app.api.permissions import IsModerationAdmin, IsOpsAdmin
 from propertylist_app.api.pagination import StandardLimitOffsetPagination
 from propertylist_app.api.throttling import ReportCreateScopedThrottle
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
 from propertylist_app.api.schema_helpers import standard_response_serializer
 from propertylist_app.api.serializers import (
+    ModerationReportSerializer,
     ReportSerializer,
     OpsStatsResponseSerializer,
 )
@@ -87,9 +89,30 @@ class ReportCreateView(generics.CreateAPIView):
 
 
 
+def with_report_targets(qs):
+    """
+    Prefetch `Report.target` for a page of reports.
+
+    GenericPrefetch groups the reports by content type and loads each target
+    model with one query (the owner/sender joined in), instead of one query per
+    report. Room.objects includes soft-deleted rows, so those targets still resolve.
+    """
+    return qs.prefetch_related(
+        GenericPrefetch(
+            "target",
+            [
+                Room.objects.select_related("property_owner"),
+                Message.objects.select_related("sender"),
+                Review.objects.select_related("reviewer"),
+                get_user_model().objects.all(),
+            ],
+        )
+    )
+
+
 class ModerationReportListView(generics.ListAPIView):
     """GET /api/moderation/reports/?status=open|in_review|resolved|rejected — staff only."""
-    serializer_class = ReportSerializer
+    serializer_class = ModerationReportSerializer
     permission_classes = [IsModerationAdmin]
     pagination_class = StandardLimitOffsetPagination
 
@@ -98,7 +121,7 @@ class ModerationReportListView(generics.ListAPIView):
         qs = Report.objects.all().order_by("-created_at")
         if status_q in {"open", "in_review", "resolved", "rejected"}:
             qs = qs.filter(status=status_q)
-        return qs
+        return with_report_targets(qs)
 
 
 
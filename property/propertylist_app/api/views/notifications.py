@@ -16,6 +16,9 @@ from propertylist_app.api.serializers import (
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
 from propertylist_app.api.schema_helpers import standard_response_serializer
 
+from propertylist_app.utils.cache import bump_user_version
+from propertylist_app.utils.cached_views import CachedPerUserGETMixin
+
 from .common import ok_response, _wrap_response_success
 
 
@@ -23,9 +26,10 @@ from .common import ok_response, _wrap_response_success
 
 
 
-class NotificationListView(APIView):
+class NotificationListView(CachedPerUserGETMixin, APIView):
     permission_classes = [IsAuthenticated]
     pagination_class = StandardLimitOffsetPagination
+    cache_prefix = "notifications"
 
     @extend_schema(
         responses={
@@ -42,6 +46,10 @@ class NotificationListView(APIView):
         description="List notifications for the current user. Returns ok_response envelope (not paginated).",
     )
     def get(self, request):
+        cached = self._cached_response(request)
+        if cached is not None:
+            return cached
+
         qs = Notification.objects.filter(user=request.user).order_by("is_read", "-created_at")
 
         paginator = self.pagination_class()
@@ -119,6 +127,8 @@ class NotificationMarkAllReadView(APIView):
             user=request.user,
             is_read=False
         ).update(is_read=True)
+        # queryset.update() sends no post_save
+        bump_user_version(request.user.pk)
 
         return ok_response(
             {"marked": updated_count},
@@ -145,7 +155,10 @@ class MyNotificationPreferencesView(APIView):
         description="Get current user's notification preferences.",
     )
     def get(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        # already loaded by CachedJWTAuthentication
+        profile = getattr(request.user, "profile", None)
+        if profile is None:
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
         ser = NotificationPreferencesSerializer(profile)
         return ok_response(ser.data)
 
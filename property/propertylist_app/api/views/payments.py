@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 import logging
 import stripe
+import hashlib
 import json
 import sys
 from django.db.models import Q
@@ -36,11 +37,13 @@ from drf_spectacular.utils import (
 
 
 #Project
-from propertylist_app.models import Payment, Room, WebhookReceipt, Notification, UserProfile
+from propertylist_app.models import Payment, Room, WebhookReceipt, UserProfile
 from propertylist_app.validators import (
     ensure_webhook_not_replayed,
     verify_webhook_signature,
 )
+from propertylist_app.services.stripe_webhooks import event_created_at, receipt_object_key
+from propertylist_app.tasks import task_process_stripe_webhooks
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
 from propertylist_app.api.schema_helpers import standard_response_serializer
 from propertylist_app.api.permissions import IsFinanceAdmin
@@ -64,7 +67,7 @@ from ..serializers import (
     ProviderWebhookRequestSerializer,
     ProviderWebhookResponseSerializer,
 )
-from .common import ok_response
+from .common import StreamingEnvelopeMixin, ok_response
 
 
 #Logger
@@ -122,9 +125,10 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
     ],
     auth=[],
     description=(
-        "Stripe webhook endpoint. Verifies the Stripe-Signature header and processes "
-        "Stripe event payloads. Currently handles checkout.session.completed and "
-        "checkout.session.expired. Other event types are acknowledged and ignored."
+        "Stripe webhook endpoint. Verifies the Stripe-Signature header, stores the event "
+        "and acknowledges it (detail \"accepted\", or \"already processed\" for a redelivery). "
+        "Events are applied asynchronously, in order per payment: checkout.session.completed "
+        "and checkout.session.expired. Other event types are acknowledged and ignored."
     ),
 )
 @csrf_exempt
@@ -166,29 +170,23 @@ def stripe_webhook(request):
 
     event_id = event.get("id") or ""
     evt_type = event.get("type")
-    evt_created = event.get("created")
-    evt_livemode = event.get("livemode")
-
     data_obj = ((event.get("data") or {}).get("object") or {})
-    obj_id = data_obj.get("id")
-    payment_intent = data_obj.get("payment_intent")
     metadata = data_obj.get("metadata") or {}
-
-    # Metadata is the source of truth for linking Stripe events
-    # back to our internal payment/user/room records.
     payment_id = metadata.get("payment_id")
-    room_id = metadata.get("room_id")
-    user_id = metadata.get("user_id")
+
+    if not event_id:
+        # real Stripe events always carry an id; fall back to the body so retries still dedupe
+        event_id = hashlib.sha256(payload or b"").hexdigest()
 
     try:
         payload_compact = {
             "id": event_id,
             "type": evt_type,
-            "created": evt_created,
-            "livemode": evt_livemode,
+            "created": event.get("created"),
+            "livemode": event.get("livemode"),
             "object": {
-                "id": obj_id,
-                "payment_intent": payment_intent,
+                "id": data_obj.get("id"),
+                "payment_intent": data_obj.get("payment_intent"),
                 "metadata": metadata,
             },
         }
@@ -196,206 +194,49 @@ def stripe_webhook(request):
     except Exception:
         payload_compact = {"id": event_id, "type": evt_type}
 
-
-    receipt = None
-    if event_id:
-        try:
-            with transaction.atomic():
-                receipt, created = WebhookReceipt.objects.get_or_create(
-                    source="stripe",
-                    event_id=event_id,
-                    defaults={
-                        "payload": payload_compact,
-                        "headers": {
-                            "Stripe-Signature": request.META.get("HTTP_STRIPE_SIGNATURE", ""),
-                            "User-Agent": request.META.get("HTTP_USER_AGENT", ""),
-                            "Content-Type": request.META.get("CONTENT_TYPE", ""),
-                        },
-                    },
-                ) 
-        except Exception:
-            receipt = None
-
-        if receipt and receipt.processed:
-            logger.info("stripe_webhook_already_processed event_id=%s", event_id)
-            return ok_response(
-                {
-                    "detail": "already processed",
-                    "event_id": event_id,
-                    "event_type": evt_type,
-                },
-                status_code=status.HTTP_200_OK,
-            )
-
-
-    if evt_type == "checkout.session.completed":
-        session = (event.get("data") or {}).get("object") or {}
-        metadata = session.get("metadata") or {}
-
-        payment_id = metadata.get("payment_id")
-        room_id = metadata.get("room_id")
-        user_id = metadata.get("user_id")
-        payment_intent = session.get("payment_intent")
-
-        if not payment_id:
-            logger.warning(
-                "stripe_webhook_missing_payment_metadata event_id=%s",
-                event_id,
-            )
-            return Response(
-                {
-                    "ok": False,
-                    "message": "Missing payment metadata.",
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        try:
-            payment = Payment.objects.select_related("room", "user").get(id=payment_id)
-        except Payment.DoesNotExist:
-            logger.warning(
-                "stripe_webhook_invalid_payment_id event_id=%s payment_id=%s",
-                event_id,
-                payment_id,
-            )
-            return Response(
-                {
-                    "ok": False,
-                    "message": "Invalid payment metadata.",
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Optional but important safety checks:
-        # ensure webhook metadata still matches the payment we are about to update.
-        if user_id and str(payment.user_id) != str(user_id):
-            logger.warning(
-                "stripe_webhook_user_mismatch event_id=%s payment_id=%s metadata_user_id=%s actual_user_id=%s",
-                event_id,
-                payment_id,
-                user_id,
-                payment.user_id,
-            )
-            return Response(
-                {
-                    "ok": False,
-                    "message": "Webhook metadata user mismatch.",
+    # Accept, then process: store the receipt and answer straight away.
+    # services/stripe_webhooks.py applies it (and the sweeper retries it).
+    queue_fields = {
+        "payload": payload_compact,
+        "object_key": receipt_object_key(event_id, data_obj),
+        "event_created": event_created_at(event.get("created")),
+    }
+    with transaction.atomic():
+        receipt, _ = WebhookReceipt.objects.get_or_create(
+            source="stripe",
+            event_id=event_id,
+            defaults={
+                **queue_fields,
+                "headers": {
+                    "Stripe-Signature": sig_header,
+                    "User-Agent": request.META.get("HTTP_USER_AGENT", ""),
+                    "Content-Type": request.META.get("CONTENT_TYPE", ""),
                 },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        if room_id:
-            actual_room_id = payment.room_id
-            if str(actual_room_id or "") != str(room_id):
-                logger.warning(
-                    "stripe_webhook_room_mismatch event_id=%s payment_id=%s metadata_room_id=%s actual_room_id=%s",
-                    event_id,
-                    payment_id,
-                    room_id,
-                    actual_room_id,
-                )
-                return Response(
-                    {
-                        "ok": False,
-                        "message": "Webhook metadata room mismatch.",
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-        try:
-            with transaction.atomic():
-                updated = (
-                    Payment.objects
-                    .filter(id=payment.id)
-                    .exclude(status="succeeded")
-                    .update(
-                        status="succeeded",
-                        stripe_payment_intent_id=str(payment_intent or ""),
-                    )
-                )
-
-                if updated == 1:
-                    logger.info(
-                        "stripe_webhook_payment_succeeded payment_id=%s payment_intent=%s",
-                        payment.id,
-                        (payment_intent or ""),
-                    )
-
-                    payment.refresh_from_db(fields=["status", "stripe_payment_intent_id"])
-                    room = payment.room
-
-                    if room:
-                        today = timezone.now().date()
-                        base = room.paid_until if (room.paid_until and room.paid_until > today) else today
-                        room.paid_until = base + timedelta(days=30)
-                        room.save(update_fields=["paid_until"])
-
-                    Notification.objects.create(
-                        user=payment.user,
-                        type="confirmation",
-                        title="Payment confirmed",
-                        body="Your listing payment was successful.",
-                        target_type="payment",
-                        target_id=payment.id,
-                    )
-        except Exception:
-            logger.exception("stripe_webhook_payment_success_failed")
-
-
-
-        if receipt:
-            receipt.processed = True
-            receipt.processed_at = timezone.now()
-            receipt.save(update_fields=["processed", "processed_at"])
-        return ok_response(
-            {
-                "detail": "checkout.session.completed processed",
-                "event_id": event_id,
-                "event_type": evt_type,
-                "payment_id": str(payment_id),
             },
-            status_code=status.HTTP_200_OK,
         )
+        if not receipt.processed and not receipt.object_key:
+            # stored before the processing queue existed: queue it now
+            for field, value in queue_fields.items():
+                setattr(receipt, field, value)
+            receipt.save(update_fields=list(queue_fields))
+
+    if receipt.processed:
+        logger.info("stripe_webhook_already_processed event_id=%s", event_id)
+        detail = "already processed"
+    else:
+        detail = "accepted"
+        try:
+            task_process_stripe_webhooks.delay(receipt.object_key)
+        except Exception:
+            # the receipt is stored; task_sweep_stripe_webhooks picks it up
+            logger.exception("stripe_webhook_enqueue_failed event_id=%s", event_id)
 
-    elif evt_type == "checkout.session.expired":
-        session = (event.get("data") or {}).get("object") or {}
-        metadata = session.get("metadata") or {}
-        payment_id = metadata.get("payment_id")
-
-        if payment_id:
-            updated = (
-                Payment.objects
-                .filter(id=payment_id, status="created")
-                .update(status="canceled")
-            )
-
-            if updated == 1:
-                logger.info(
-                    "stripe_webhook_session_expired payment_id=%s",
-                    payment_id,
-                )
-        
-        if receipt:
-            receipt.processed = True
-            receipt.processed_at = timezone.now()
-            receipt.save(update_fields=["processed", "processed_at"])
-                
-        
-        return ok_response(
-            {
-                "detail": "checkout.session.expired processed",
-                "event_id": event_id,
-                "event_type": evt_type,
-                "payment_id": str(payment_id) if payment_id else None,
-            },
-            status_code=status.HTTP_200_OK,
-        )
-    
     return ok_response(
         {
-            "detail": f"ignored event {evt_type}",
+            "detail": detail,
             "event_id": event_id,
             "event_type": evt_type,
+            "payment_id": str(payment_id) if payment_id else None,
         },
         status_code=status.HTTP_200_OK,
     )
@@ -782,7 +623,7 @@ class DetachSavedCardView(APIView):
         )
 
 
-class PaymentTransactionsListView(ListAPIView):
+class PaymentTransactionsListView(StreamingEnvelopeMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PaymentTransactionListSerializer
 
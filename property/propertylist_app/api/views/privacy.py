@@ -8,6 +8,8 @@ from drf_spectacular.utils import extend_schema, OpenApiResponse, inline_seriali
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
 from propertylist_app.api.schema_helpers import standard_response_serializer
 from propertylist_app.services.gdpr import build_export_zip, perform_erasure, preview_erasure
+from propertylist_app.services.facet_index import invalidate_room_facet_index
+from propertylist_app.utils.cache import bump_room_audience_versions
 from propertylist_app.models import AuditLog, DataExport, Room, UserProfile
 from propertylist_app.api.serializers import (
     GDPRDeleteConfirmSerializer,
@@ -243,7 +245,11 @@ class AccountDeleteConfirmView(APIView):
 
             # 2) Soft-hide rooms so they’re no longer publicly attributable
             try:
-                Room.objects.filter(property_owner=u).exclude(status="hidden").update(status="hidden")
+                rooms = Room.objects.filter(property_owner=u).exclude(status="hidden")
+                room_ids = list(rooms.values_list("id", flat=True))
+                rooms.update(status="hidden")
+                invalidate_room_facet_index()
+                bump_room_audience_versions(room_ids)
             except Exception:
                 pass
 
@@ -283,7 +289,10 @@ class MyPrivacyPreferencesView(APIView):
         description="Get the current user's privacy preferences.",
     )
     def get(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        # already loaded by CachedJWTAuthentication
+        profile = getattr(request.user, "profile", None)
+        if profile is None:
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
         return ok_response(PrivacyPreferencesSerializer(profile).data, status_code=status.HTTP_200_OK)
 
     @extend_schema(
@@ -39,6 +39,7 @@ from propertylist_app.api.serializers import (
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
 from propertylist_app.api.schema_helpers import standard_response_serializer
 from propertylist_app.validators import validate_avatar_image
+from propertylist_app.utils.cached_views import CachedPerUserGETMixin
 
 from .common import ok_response
 
@@ -137,8 +138,10 @@ class OnboardingCompleteView(APIView):
         
         
         
-class MyProfilePageView(APIView):
+class MyProfilePageView(CachedPerUserGETMixin, APIView):
+    """The current user's profile page: profile details plus revealed review summary."""
     permission_classes = [IsAuthenticated]
+    cache_prefix = "my-profile"
 
     @extend_schema(
         responses={
@@ -150,6 +153,10 @@ class MyProfilePageView(APIView):
         },
     )
     def get(self, request):
+        cached = self._cached_response(request)
+        if cached is not None:
+            return cached
+
         user = request.user
         profile, _ = UserProfile.objects.get_or_create(user=user)
 
@@ -19,8 +19,8 @@ from rest_framework import permissions, serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
-from rest_framework.throttling import ScopedRateThrottle
-from rest_framework.permissions import AllowAny
+from propertylist_app.api.throttling import ScopedCounterThrottle
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiParameter,
@@ -35,14 +35,38 @@ from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 from django.utils.crypto import get_random_string
-from django.db.models import Q, Exists, OuterRef, Prefetch, Count
+from django.db.models import Q, Exists, OuterRef, Prefetch, Count, Avg, Min
+from django.db.models.functions import Substr
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import QueryDict
  
  
 from propertylist_app.validators import validate_radius_miles, haversine_miles 
 from propertylist_app.services.captcha import verify_captcha
 from propertylist_app.services.geo import geocode_postcode_cached
+from propertylist_app.services.address_lookup import AddressLookupPending, cached_address_suggestions
+from propertylist_app.services.saved_searches import (
+    canonical_search_query,
+    index_saved_search,
+    search_signature,
+)
+from propertylist_app.services.facet_index import (
+    INDEX_ORDERINGS,
+    IndexedRooms,
+    get_room_facet_index,
+)
 from propertylist_app.api.schema_serializers import ErrorResponseSerializer
+from propertylist_app.api.room_filters import (
+    FACET_FILTER_PARAMS,
+    apply_facet_filters,
+    facet_filters_q,
+    facet_values,
+    only_facet_params,
+    parse_bool,
+    parse_facet_filters,
+)
 from propertylist_app.api.schema_helpers import (
+    ROOM_CARD_VIEW_PARAMETER,
     standard_response_serializer,
     standard_paginated_response_serializer,
 )
@@ -50,20 +74,36 @@ from propertylist_app.api.serializers import (
     CitySummarySerializer,
     FindAddressSerializer,
     HomeSummarySerializer,
+    HomeSummaryCardSerializer,
     PhoneOTPStartSerializer,
     PhoneOTPVerifySerializer,
     RoomSerializer,
+    RoomCardSerializer,
+    SavedSearchSerializer,
     EmailOTPVerifySerializer,
     DetailResponseSerializer,
     EmailOTPResendSerializer,
 )
-from propertylist_app.models import Room, UserProfile, PhoneOTP, EmailOTP,SavedRoom, RoomImage
-
-from .common import ok_response, error_response, _wrap_response_success
+from propertylist_app.models import Room, UserProfile, PhoneOTP, EmailOTP,SavedRoom, RoomImage, SavedSearch
+from propertylist_app.models import MAP_CELL_ZOOM
+
+from .common import (
+    ok_response,
+    error_response,
+    _wrap_response_success,
+    _wants_room_cards,
+    _with_room_card_preloads,
+)
 from .messaging import _fetch_ideal_postcodes_suggestions
 
 
 from propertylist_app.api.pagination import StandardLimitOffsetPagination
+from propertylist_app.utils.cache import (
+    _canonical_querydict,
+    get_cached_json,
+    make_cache_key,
+    set_cached_json,
+)
 
 
 
@@ -103,14 +143,14 @@ class HomePageView(APIView):
             Room.objects.alive()
             .filter(status="active")
             .filter(Q(paid_until__isnull=True) | Q(paid_until__gte=today))
-            .select_related("category", "property_owner")
         )
+        card_rooms = _with_room_card_preloads(base_rooms, cards=_wants_room_cards(request))
 
         # 1) Featured rooms – highest rating first
-        featured_rooms_qs = base_rooms.order_by("-avg_rating", "-number_rating", "-created_at")[:6]
+        featured_rooms_qs = card_rooms.order_by("-avg_rating", "-number_rating", "-created_at")[:6]
 
         # 2) Latest rooms – newest first
-        latest_rooms_qs = base_rooms.order_by("-created_at")[:6]
+        latest_rooms_qs = card_rooms.order_by("-created_at")[:6]
 
         # 3) Popular cities for the “Explore the Most Popular Shared Homes” strip
         city_rows = (
@@ -147,7 +187,8 @@ class HomePageView(APIView):
             "app_links": app_links,
         }
 
-        ser = HomeSummarySerializer(payload, context={"request": request})
+        summary_class = HomeSummaryCardSerializer if _wants_room_cards(request) else HomeSummarySerializer
+        ser = summary_class(payload, context={"request": request})
         return ok_response(ser.data, status_code=status.HTTP_200_OK)
 
 
@@ -275,7 +316,16 @@ class FindAddressView(APIView):
             )
 
         try:
-            addresses = _fetch_ideal_postcodes_suggestions(postcode)
+            # cached per postcode (404s too) and coalesced across workers
+            addresses = cached_address_suggestions(postcode, _fetch_ideal_postcodes_suggestions)
+        except AddressLookupPending:
+            response = error_response(
+                message="Address lookup in progress, please retry.",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                code="error",
+            )
+            response["Retry-After"] = "1"
+            return response
         except RuntimeError:
             return error_response(
                     message="Address lookup is not configured.",
@@ -342,6 +392,28 @@ class FindAddressView(APIView):
 
 
 
+# Map friendly front-end sort keys to real fields
+# Frontend options:
+#   default       -> lets backend decide
+#   newest        -> -created_at
+#   last_updated  -> -updated_at
+#   price_asc     -> price_per_month
+#   price_desc    -> -price_per_month
+SEARCH_UI_SORT_MAP = {
+    # Frontend "Default viewing order" → newest first
+    "default": "-created_at",
+    "newest": "-created_at",
+    "last_updated": "-updated_at",
+    "price_asc": "price_per_month",
+    "price_desc": "-price_per_month",
+    # optional: if FE ever sends this explicitly
+    "distance": "distance_miles",
+}
+
+# Query params that don't stop the facet index from answering a search alone
+_FACET_INDEX_PASSTHROUGH_PARAMS = frozenset({"limit", "offset", "start", "view", "ordering", "format"})
+
+
 class SearchRoomsView(generics.ListAPIView):
 
     """
@@ -368,23 +440,60 @@ class SearchRoomsView(generics.ListAPIView):
     _ordered_ids = None
     _distance_by_id = None
 
+    def get_serializer_class(self):
+        if _wants_room_cards(self.request):
+            return RoomCardSerializer
+        return super().get_serializer_class()
+
+    def _indexed_rooms(self, request):
+        """
+        IndexedRooms when every filter in the query is an equality / range
+        facet filter and the ordering is one the facet index keeps sorted,
+        otherwise None (the SQL path in get_queryset handles it).
+        """
+        params = request.query_params
+        if not only_facet_params(params, _FACET_INDEX_PASSTHROUGH_PARAMS):
+            return None
+
+        ordering = (params.get("ordering") or "").strip()
+        ordering = SEARCH_UI_SORT_MAP.get(ordering, ordering) or "-created_at"
+        if ordering not in INDEX_ORDERINGS:
+            return None
+
+        filters = parse_facet_filters(params)
+        index = get_room_facet_index()
+        if index is None:
+            return None
+
+        def fetch(ids):
+            today = timezone.now().date()
+            return _with_room_card_preloads(
+                Room.objects.alive()
+                .filter(id__in=ids)
+                .filter(Q(paid_until__isnull=True) | Q(paid_until__gte=today)),
+                cards=_wants_room_cards(request),
+            )
+
+        return IndexedRooms(index, index.match(filters), ordering, fetch)
+
     def get_queryset(self):
-        params = self.request.query_params
+        return self.search_queryset(self.request.query_params, cards=_wants_room_cards(self.request))
 
+    def search_queryset(self, params, base=None, cards=False):
+        """
+        All live rooms matching the search query string `params` (see class docstring),
+        optionally only among the rooms of `base` (a Room queryset).
+        cards=True loads only the room card columns (_with_room_card_preloads).
+        """
         # Enforce postcode when radius is used (raises DRF ValidationError)
         if params.get("radius_miles") is not None and not (params.get("postcode") or "").strip():
             raise ValidationError({"postcode": "Postcode is required when using radius search."})
 
         q_text = (params.get("q") or "").strip()
-        min_price = params.get("min_price")
-        max_price = params.get("max_price")
         postcode = (params.get("postcode") or "").strip()
         raw_radius = params.get("radius_miles", 10)
 
         # ===== Advanced filters from query =====
-        # “Rooms in existing shares”
-        include_shared = params.get("include_shared")
-
         # “Rooms suitable for ages”
         min_age = params.get("min_age")
         max_age = params.get("max_age")
@@ -393,23 +502,9 @@ class SearchRoomsView(generics.ListAPIView):
         min_stay = params.get("min_stay_months")
         max_stay = params.get("max_stay_months")
 
-        # “Rooms for” and “Room sizes”
-        room_for = (params.get("room_for") or "").strip()
-        room_size = (params.get("room_size") or "").strip()
-
        
 
-        qs = (
-            Room.objects.alive()
-            .select_related("category", "property_owner", "property_owner__profile")
-            .prefetch_related(
-                Prefetch(
-                    "roomimage_set",
-                    queryset=RoomImage.objects.filter(status="approved").order_by("id"),
-                    to_attr="prefetched_approved_images",
-                )
-            )
-        )
+        qs = _with_room_card_preloads((Room.objects if base is None else base).alive(), cards=cards)
 
         today = timezone.now().date()
         qs = qs.filter(status="active").filter(
@@ -436,51 +531,8 @@ class SearchRoomsView(generics.ListAPIView):
 
 
 
-        # ----- price filters -----
-        if min_price is not None:
-            try:
-                qs = qs.filter(price_per_month__gte=int(min_price))
-            except Exception:
-                raise ValidationError({"min_price": "Must be an integer."})
-
-        if max_price is not None:
-            try:
-                qs = qs.filter(price_per_month__lte=int(max_price))
-            except Exception:
-                raise ValidationError({"max_price": "Must be an integer."})
-
-
-
-                # ----- bedroom count filters -----
-        rooms_min_raw = params.get("rooms_min")
-        rooms_max_raw = params.get("rooms_max")
-
-        rooms_min_val = None
-        rooms_max_val = None
-
-        if rooms_min_raw is not None and str(rooms_min_raw).strip() != "":
-            try:
-                rooms_min_val = int(rooms_min_raw)
-            except ValueError:
-                raise ValidationError({"rooms_min": "Must be an integer."})
-
-        if rooms_max_raw is not None and str(rooms_max_raw).strip() != "":
-            try:
-                rooms_max_val = int(rooms_max_raw)
-            except ValueError:
-                raise ValidationError({"rooms_max": "Must be an integer."})
-
-        if rooms_min_val is not None and rooms_max_val is not None and rooms_min_val > rooms_max_val:
-            raise ValidationError({"rooms_min": "rooms_min cannot be greater than rooms_max."})
-
-        if rooms_min_val is not None:
-            qs = qs.filter(number_of_bedrooms__gte=rooms_min_val)
-
-        if rooms_max_val is not None:
-            qs = qs.filter(number_of_bedrooms__lte=rooms_max_val)
-        
-        
-        
+        # ----- equality / range filters (price, bedrooms, property preferences) -----
+        qs = apply_facet_filters(qs, parse_facet_filters(params))
 
         # ----- rating filters -----
         min_rating = params.get("min_rating")
@@ -510,47 +562,12 @@ class SearchRoomsView(generics.ListAPIView):
             qs = qs.filter(avg_rating__lte=max_rating_val)
 
         
-        user = getattr(self.request, "user", None)
-        if user and user.is_authenticated:
-            qs = qs.annotate(
-                _is_saved=Exists(
-                    SavedRoom.objects.filter(user=user, room_id=OuterRef("pk"))
-                )
-            )
+        # is_saved: serializers use the per-request saved-room id set (services.saved_rooms)
 
         
 
 
 
-        # Property preferences – boolean filters (support true and false)
-        def parse_bool(v):
-            if v is None:
-                return None
-            v = str(v).strip().lower()
-            if v in {"true", "1", "yes"}:
-                return True
-            if v in {"false", "0", "no"}:
-                return False
-            return None
-
-        furnished_b = parse_bool(params.get("furnished"))
-        if furnished_b is not None:
-            qs = qs.filter(furnished=furnished_b)
-
-        bills_b = parse_bool(params.get("bills_included"))
-        if bills_b is not None:
-            qs = qs.filter(bills_included=bills_b)
-
-        parking_b = parse_bool(params.get("parking_available"))
-        if parking_b is not None:
-            qs = qs.filter(parking_available=parking_b)
-
-
-        # Property types (advanced search chips)
-        property_types = params.getlist("property_types") or params.getlist("property_type")
-        if property_types:
-            qs = qs.filter(property_type__in=property_types)
-
         # ---- Advanced Search II (Option A) filters ----
         # move_in_date (UI) maps to Room.available_from:
         # seeker wants a room they can move into by selected date
@@ -561,23 +578,6 @@ class SearchRoomsView(generics.ListAPIView):
             except Exception:
                 raise ValidationError({"move_in_date": "Invalid date format. Use YYYY-MM-DD."})
 
-        bathroom_type = (params.get("bathroom_type") or "").strip()
-        if bathroom_type and bathroom_type != "no_preference":
-            qs = qs.filter(bathroom_type=bathroom_type)
-
-        shared_living_space = (params.get("shared_living_space") or "").strip()
-        if shared_living_space and shared_living_space != "no_preference":
-            qs = qs.filter(shared_living_space=shared_living_space)
-
-        smoking_allowed_in_property = (params.get("smoking_allowed_in_property") or "").strip()
-        if smoking_allowed_in_property and smoking_allowed_in_property != "no_preference":
-            qs = qs.filter(smoking_allowed_in_property=smoking_allowed_in_property)
-
-
-        suitable_for = (params.get("suitable_for") or "").strip()
-        if suitable_for and suitable_for != "no_preference":
-            qs = qs.filter(suitable_for=suitable_for)
-
         max_occupants = params.get("max_occupants")
         if max_occupants:
             try:
@@ -602,31 +602,6 @@ class SearchRoomsView(generics.ListAPIView):
                 raise ValidationError({"household_bedrooms_max": "Must be an integer."})
             qs = qs.filter(Q(household_bedrooms_max__isnull=True) | Q(household_bedrooms_max__lte=hb_max_int))
 
-        household_type = (params.get("household_type") or "").strip()
-        if household_type and household_type != "no_preference":
-            qs = qs.filter(household_type=household_type)
-
-        household_environment = (params.get("household_environment") or "").strip()
-        if household_environment and household_environment != "no_preference":
-            qs = qs.filter(household_environment=household_environment)
-
-        pets_allowed = (params.get("pets_allowed") or "").strip()
-        if pets_allowed and pets_allowed != "no_preference":
-            qs = qs.filter(pets_allowed=pets_allowed)
-
-        inclusive_household = (params.get("inclusive_household") or "").strip()
-        if inclusive_household and inclusive_household != "no_preference":
-            qs = qs.filter(inclusive_household=inclusive_household)
-
-        accessible_entry = (params.get("accessible_entry") or "").strip()
-        if accessible_entry and accessible_entry != "no_preference":
-            qs = qs.filter(accessible_entry=accessible_entry)
-
-        free_to_contact = parse_bool(params.get("free_to_contact"))
-        if free_to_contact is not None:
-            qs = qs.filter(free_to_contact=free_to_contact)
-        
-
         photos_only = parse_bool(params.get("photos_only"))
         if photos_only:
             approved_photo_exists = RoomImage.objects.filter(
@@ -663,10 +638,6 @@ class SearchRoomsView(generics.ListAPIView):
             
 
 
-        # ----- “Rooms in existing shares” -----
-        if include_shared in {"1", "true", "True", "yes"}:
-            qs = qs.filter(is_shared_room=True)
-
         # ----- “Rooms suitable for ages” -----
         # If user sends min_age, keep rooms whose max_age is blank OR >= min_age
         if min_age is not None and str(min_age).strip() != "":
@@ -699,15 +670,6 @@ class SearchRoomsView(generics.ListAPIView):
                 raise ValidationError({"max_stay_months": "Must be an integer."})
             qs = qs.filter(Q(min_stay_months__isnull=True) | Q(min_stay_months__lte=max_stay_val))
 
-        # ----- “Rooms for” -----
-        # Only filter when user picks a specific option (not 'any')
-        if room_for and room_for != "any":
-            qs = qs.filter(room_for=room_for)
-
-        # ----- “Room sizes” -----
-        if room_size and room_size != "dont_mind":
-            qs = qs.filter(room_size=room_size)
-
         # Reset any prior state for distance ordering
         self._ordered_ids = None
         self._distance_by_id = None
@@ -736,26 +698,8 @@ class SearchRoomsView(generics.ListAPIView):
             qs = qs.filter(id__in=ids_in_radius)
 
         ordering_param = (params.get("ordering") or "").strip()
-
-        # Map friendly front-end sort keys to real fields
-        # Frontend options:
-        #   default       -> lets backend decide
-        #   newest        -> -created_at
-        #   last_updated  -> -updated_at
-        #   price_asc     -> price_per_month
-        #   price_desc    -> -price_per_month
-        ui_sort_map = {
-            # Frontend "Default viewing order" → newest first
-            "default": "-created_at",
-            "newest": "-created_at",
-            "last_updated": "-updated_at",
-            "price_asc": "price_per_month",
-            "price_desc": "-price_per_month",
-            # optional: if FE ever sends this explicitly
-            "distance": "distance_miles",
-        }
-        if ordering_param in ui_sort_map:
-            ordering_param = ui_sort_map[ordering_param]
+        if ordering_param in SEARCH_UI_SORT_MAP:
+            ordering_param = SEARCH_UI_SORT_MAP[ordering_param]
 
         if not ordering_param:
             # Backend default when no ordering is provided:
@@ -1088,6 +1032,7 @@ class SearchRoomsView(generics.ListAPIView):
                 required=False,
                 description="Number of rooms to skip before starting the result set.",
             ),
+            ROOM_CARD_VIEW_PARAMETER,
         ],
         responses={
             200: standard_paginated_response_serializer(
@@ -1104,22 +1049,15 @@ class SearchRoomsView(generics.ListAPIView):
         and return wrapped success responses with backwards-compatible
         pagination keys: count, next, previous, results.
         """
-        queryset = self.get_queryset()
+        indexed = self._indexed_rooms(request)
+        queryset = indexed if indexed is not None else self.get_queryset()
 
         # Build ordered list if distance ordering is active
-        if self._ordered_ids is not None and self._distance_by_id is not None:
+        if indexed is None and self._ordered_ids is not None and self._distance_by_id is not None:
             room_by_id = {obj.id: obj for obj in queryset}
 
             ordering_raw = (request.query_params.get("ordering") or "").strip()
-            ui_sort_map = {
-                "default": "-created_at",
-                "newest": "-created_at",
-                "last_updated": "-updated_at",
-                "price_asc": "price_per_month",
-                "price_desc": "-price_per_month",
-                "distance": "distance_miles",
-            }
-            ordering = ui_sort_map.get(ordering_raw, ordering_raw)
+            ordering = SEARCH_UI_SORT_MAP.get(ordering_raw, ordering_raw)
 
             rid_list = self._ordered_ids
             if ordering == "-distance_miles":
@@ -1132,7 +1070,8 @@ class SearchRoomsView(generics.ListAPIView):
                     obj.distance_miles = self._distance_by_id.get(rid)
                     ordered_objs.append(obj)
         else:
-            ordered_objs = list(queryset)
+            # keep it a QuerySet (or IndexedRooms) so the paginator only loads one page
+            ordered_objs = queryset
 
         # DRF pagination
         page = self.paginate_queryset(ordered_objs)
@@ -1147,6 +1086,210 @@ class SearchRoomsView(generics.ListAPIView):
         return ok_response(serializer.data, status_code=status.HTTP_200_OK)
 
 
+def _canonical_facet_filters(filters):
+    return {
+        "terms": {field: sorted(values, key=str) for field, values in filters["terms"].items()},
+        "ranges": {field: list(bounds) for field, bounds in filters["ranges"].items()},
+    }
+
+
+class SearchRoomFacetsView(APIView):
+    """
+    GET /api/v1/search/rooms/facets/
+
+    Takes the same query string as search/rooms/ and returns, for that filter set:
+    - count           : rooms matching every filter
+    - facets          : per facet field, rooms per selectable value, counted
+                        with every filter except that field's own selection
+    - price_histogram : rooms per monthly price bucket (ROOM_FACET_PRICE_EDGES),
+                        counted with every filter except the price range
+
+    Answered from the room facet index when the query only has facet filters,
+    otherwise with a single aggregate query. Cached per filter set.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="property_types",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                many=True,
+                description="Property types filter. Every other search/rooms/ filter is accepted too.",
+            ),
+            OpenApiParameter(
+                name="min_price",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Minimum monthly price.",
+            ),
+            OpenApiParameter(
+                name="max_price",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Maximum monthly price.",
+            ),
+        ],
+        responses={
+            200: standard_response_serializer(
+                "SearchRoomFacetsResponse",
+                inline_serializer(
+                    name="SearchRoomFacetsData",
+                    fields={
+                        "count": serializers.IntegerField(),
+                        "facets": serializers.DictField(
+                            child=serializers.ListField(
+                                child=inline_serializer(
+                                    name="SearchRoomFacetValue",
+                                    fields={
+                                        "value": serializers.JSONField(),
+                                        "count": serializers.IntegerField(),
+                                    },
+                                )
+                            )
+                        ),
+                        "price_histogram": serializers.ListField(
+                            child=inline_serializer(
+                                name="SearchRoomPriceBucket",
+                                fields={
+                                    "min": serializers.IntegerField(),
+                                    "max": serializers.IntegerField(allow_null=True),
+                                    "count": serializers.IntegerField(),
+                                },
+                            )
+                        ),
+                    },
+                ),
+            ),
+            400: OpenApiResponse(response=ErrorResponseSerializer),
+        },
+        auth=[],
+        description="Facet counts and a price histogram for the advanced search panel.",
+    )
+    def get(self, request):
+        params = request.query_params
+        filters = parse_facet_filters(params)
+        facets = facet_values()
+        price_edges = list(getattr(settings, "ROOM_FACET_PRICE_EDGES", [0, 500, 750, 1000, 1250, 1500, 2000]))
+
+        index = get_room_facet_index() if only_facet_params(params) else None
+        other_params = params.copy()
+        for name in FACET_FILTER_PARAMS:
+            other_params.pop(name, None)
+
+        key = make_cache_key(
+            "room-facets",
+            request.path,
+            extra={
+                "filters": _canonical_facet_filters(filters),
+                "other": _canonical_querydict(other_params),
+                "edges": price_edges,
+                # index answers change with every room change it has applied
+                "generation": index.generation if index is not None else None,
+            },
+        )
+        payload = get_cached_json(key, name="room_facets")
+        if payload is None:
+            if index is not None:
+                count, counts, histogram = index.facet_counts(filters, facets, price_edges)
+            else:
+                count, counts, histogram = self._sql_facet_counts(other_params, filters, facets, price_edges)
+
+            payload = {
+                "count": count,
+                "facets": {
+                    field: [{"value": value, "count": n} for value, n in by_value.items()]
+                    for field, by_value in counts.items()
+                },
+                "price_histogram": [
+                    {"min": low, "max": high, "count": n}
+                    for (low, high), n in zip(zip(price_edges, [*price_edges[1:], None]), histogram)
+                ],
+            }
+            set_cached_json(key, payload, ttl=getattr(settings, "ROOM_FACETS_CACHE_TTL", 60))
+
+        return ok_response(payload, status_code=status.HTTP_200_OK)
+
+    def _sql_facet_counts(self, other_params, filters, facets, price_edges):
+        # one SELECT of filtered COUNTs over the rooms matching the non-facet filters
+        base = SearchRoomsView().search_queryset(other_params)
+        base = base.select_related(None).prefetch_related(None).order_by()
+
+        aggregates = {"total": Count("id", filter=facet_filters_q(filters))}
+        slots = []
+        for field, values in facets.items():
+            others = facet_filters_q(filters, exclude=field)
+            for value in values:
+                alias = f"c{len(slots)}"
+                aggregates[alias] = Count("id", filter=others & Q(**{field: value}))
+                slots.append((field, value, alias))
+
+        others = facet_filters_q(filters, exclude="price_per_month")
+        buckets = []
+        for low, high in zip(price_edges, [*price_edges[1:], None]):
+            bucket = Q(price_per_month__gte=low)
+            if high is not None:
+                bucket &= Q(price_per_month__lt=high)
+            alias = f"p{len(buckets)}"
+            aggregates[alias] = Count("id", filter=others & bucket)
+            buckets.append(alias)
+
+        row = base.aggregate(**aggregates)
+        counts = {field: {} for field in facets}
+        for field, value, alias in slots:
+            counts[field][value] = row[alias]
+        return row["total"], counts, [row[alias] for alias in buckets]
+
+
+class MySavedSearchesView(generics.ListCreateAPIView):
+    """
+    GET  /api/users/me/saved/searches/ : the current user's saved searches
+    POST /api/users/me/saved/searches/ : save a search ({"name", "query_string"})
+
+    Rooms that go live and match a saved search are alerted once
+    (services/saved_searches.py). The query string is validated like
+    /api/search/rooms/ and stored without paging/ordering params.
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardLimitOffsetPagination
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return SavedSearch.objects.none()
+        return SavedSearch.objects.filter(user=self.request.user).order_by("-created_at")
+
+    def perform_create(self, serializer):
+        params = QueryDict(serializer.validated_data.pop("query_string"))
+        try:
+            SearchRoomsView().search_queryset(params, base=Room.objects.none())
+        except DjangoValidationError as exc:
+            raise ValidationError({"query_string": exc.messages})
+
+        query = canonical_search_query(params)
+        if not query:
+            raise ValidationError({"query_string": "Add at least one search filter."})
+        signature = search_signature(query)
+        if SavedSearch.objects.filter(user=self.request.user, signature=signature).exists():
+            raise ValidationError({"query_string": "You have already saved this search."})
+
+        saved_search = serializer.save(user=self.request.user, query=query, signature=signature)
+        index_saved_search(saved_search)
+
+
+class MySavedSearchDetailView(generics.RetrieveDestroyAPIView):
+    """GET / DELETE /api/users/me/saved/searches/<id>/ (own saved searches only)."""
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return SavedSearch.objects.none()
+        return SavedSearch.objects.filter(user=self.request.user)
 
 
 class NearbyRoomsView(generics.ListAPIView):
@@ -1161,6 +1304,11 @@ class NearbyRoomsView(generics.ListAPIView):
     _ordered_ids = None
     _distance_by_id = None
 
+    def get_serializer_class(self):
+        if _wants_room_cards(self.request):
+            return RoomCardSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
             return Room.objects.none()
@@ -1184,7 +1332,10 @@ class NearbyRoomsView(generics.ListAPIView):
         self._ordered_ids = [rid for rid, _ in distances]
         self._distance_by_id = {rid: d for rid, d in distances}
 
-        return Room.objects.alive().filter(id__in=self._ordered_ids or [])
+        return _with_room_card_preloads(
+            Room.objects.alive().filter(id__in=self._ordered_ids or []),
+            cards=_wants_room_cards(self.request),
+        )
     
     
     
@@ -1219,6 +1370,7 @@ class NearbyRoomsView(generics.ListAPIView):
                     required=False,
                     description="Number of rooms to skip before starting the result set.",
                 ),
+                ROOM_CARD_VIEW_PARAMETER,
             ],
             responses={
                 200: inline_serializer(
@@ -1268,6 +1420,156 @@ class NearbyRoomsView(generics.ListAPIView):
         return ok_response(ser.data, status_code=status.HTTP_200_OK)
 
 
+# Query params of RoomMapView that are not room search filters
+_MAP_VIEW_PARAMS = frozenset({"bbox", "zoom", "limit", "offset", "start", "view", "ordering", "format"})
+
+_MAP_PRICE_FIELD = serializers.DecimalField(max_digits=8, decimal_places=2)
+
+
+def _parse_bbox(raw):
+    try:
+        west, south, east, north = (float(part) for part in (raw or "").split(","))
+    except ValueError:
+        raise ValidationError({"bbox": "Use west,south,east,north in degrees."})
+    if not (-180 <= west < east <= 180) or not (-90 <= south < north <= 90):
+        raise ValidationError({"bbox": "Invalid bounding box."})
+    return west, south, east, north
+
+
+class RoomMapView(APIView):
+    """
+    GET /api/v1/rooms/map/?bbox=<west,south,east,north>&zoom=<int>
+
+    Map markers for a viewport. Below MAP_PINS_MIN_ZOOM rooms are grouped into
+    grid cells (map tile quadkey prefixes of Room.map_cell, 2**MAP_CLUSTER_SUBDIVISION
+    cells per tile edge) with count, centroid and min price; from that zoom on
+    each room is a pin (id, position, price). Accepts the filters of /search/rooms/.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="bbox",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Viewport as west,south,east,north (degrees).",
+            ),
+            OpenApiParameter(
+                name="zoom",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Map zoom level (0-22).",
+            ),
+        ],
+        responses={
+            200: standard_response_serializer(
+                "RoomMapResponse",
+                inline_serializer(
+                    name="RoomMapData",
+                    fields={
+                        "mode": serializers.ChoiceField(choices=["clusters", "pins"]),
+                        "zoom": serializers.IntegerField(),
+                        "count": serializers.IntegerField(),
+                        "clusters": serializers.ListField(
+                            child=inline_serializer(
+                                name="RoomMapCluster",
+                                fields={
+                                    "cell": serializers.CharField(),
+                                    "count": serializers.IntegerField(),
+                                    "latitude": serializers.FloatField(),
+                                    "longitude": serializers.FloatField(),
+                                    "min_price": serializers.DecimalField(max_digits=8, decimal_places=2),
+                                },
+                            )
+                        ),
+                        "pins": serializers.ListField(
+                            child=inline_serializer(
+                                name="RoomMapPin",
+                                fields={
+                                    "id": serializers.IntegerField(),
+                                    "latitude": serializers.FloatField(),
+                                    "longitude": serializers.FloatField(),
+                                    "price_per_month": serializers.DecimalField(max_digits=8, decimal_places=2),
+                                },
+                            )
+                        ),
+                    },
+                ),
+            ),
+            400: OpenApiResponse(response=ErrorResponseSerializer),
+        },
+        auth=[],
+        description="Clustered room markers (or pins when zoomed in) for a map viewport.",
+    )
+    def get(self, request):
+        params = request.query_params
+        west, south, east, north = _parse_bbox(params.get("bbox"))
+        try:
+            zoom = int(params.get("zoom", ""))
+        except ValueError:
+            raise ValidationError({"zoom": "Must be an integer."})
+        if not 0 <= zoom <= 22:
+            raise ValidationError({"zoom": "Must be between 0 and 22."})
+
+        search_params = params.copy()
+        for name in _MAP_VIEW_PARAMS:
+            search_params.pop(name, None)
+        qs = (
+            SearchRoomsView().search_queryset(search_params)
+            .select_related(None)
+            .prefetch_related(None)
+            .order_by()
+            .filter(latitude__range=(south, north), longitude__range=(west, east))
+        )
+
+        payload = {"mode": "clusters", "zoom": zoom, "count": 0, "clusters": [], "pins": []}
+
+        if zoom >= getattr(settings, "MAP_PINS_MIN_ZOOM", 15):
+            max_pins = getattr(settings, "MAP_MAX_PINS", 500)
+            rows = list(qs.values_list("id", "latitude", "longitude", "price_per_month")[: max_pins + 1])
+            payload["mode"] = "pins"
+            payload["count"] = len(rows) if len(rows) <= max_pins else qs.count()
+            payload["pins"] = [
+                {
+                    "id": room_id,
+                    "latitude": lat,
+                    "longitude": lon,
+                    "price_per_month": _MAP_PRICE_FIELD.to_representation(price),
+                }
+                for room_id, lat, lon, price in rows[:max_pins]
+            ]
+            return ok_response(payload, status_code=status.HTTP_200_OK)
+
+        # one GROUP BY over the precomputed cell column: a tile at `zoom`
+        # is the first `zoom` digits of map_cell, each further digit splits it in four
+        depth = min(zoom + getattr(settings, "MAP_CLUSTER_SUBDIVISION", 3), MAP_CELL_ZOOM)
+        clusters = (
+            qs.annotate(cell=Substr("map_cell", 1, depth))
+            .values("cell")
+            .annotate(
+                n=Count("id"),
+                lat=Avg("latitude"),
+                lon=Avg("longitude"),
+                min_price=Min("price_per_month"),
+            )
+            .order_by("cell")
+        )
+        for row in clusters:
+            payload["count"] += row["n"]
+            payload["clusters"].append(
+                {
+                    "cell": row["cell"],
+                    "count": row["n"],
+                    "latitude": row["lat"],
+                    "longitude": row["lon"],
+                    "min_price": _MAP_PRICE_FIELD.to_representation(row["min_price"]),
+                }
+            )
+        return ok_response(payload, status_code=status.HTTP_200_OK)
+
 
 class HealthCheckView(APIView):
     permission_classes = [AllowAny]
@@ -1301,7 +1603,7 @@ class HealthCheckView(APIView):
 
 class EmailOTPVerifyView(APIView):
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedCounterThrottle]
     throttle_scope = "otp-verify"
     versioning_class = None
 
@@ -1397,7 +1699,7 @@ class EmailOTPVerifyView(APIView):
 
 class EmailOTPResendView(APIView):
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedCounterThrottle]
     throttle_scope = "otp-resend"
     versioning_class = None
 
@@ -20,7 +20,7 @@ from propertylist_app.api.serializers import (
     ReviewSerializer,
     ReviewCreateSerializer,
 )
-from .common import ok_response
+from .common import StreamingEnvelopeMixin, ok_response
 
 
 
@@ -109,7 +109,7 @@ class ReviewCreateView(generics.CreateAPIView):
     
 
 
-class ReviewListView(generics.ListAPIView):
+class ReviewListView(StreamingEnvelopeMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ReviewSerializer
 
@@ -7,7 +7,9 @@ from datetime import date, datetime
 from django.db.models import (
     Case,
     CharField,
+    Count,
     Exists,
+    F,
     OuterRef,
     Prefetch,
     Q,
@@ -29,7 +31,7 @@ from rest_framework.permissions import (
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
-from rest_framework.throttling import AnonRateThrottle
+from propertylist_app.api.throttling import AnonCounterThrottle
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework import filters
 
@@ -45,7 +47,7 @@ from drf_spectacular.types import OpenApiTypes
 #Project
 from propertylist_app.models import Room, RoomCategorie, RoomImage, SavedRoom, AvailabilitySlot, Booking
 from propertylist_app.services.image import should_auto_approve_upload
-from propertylist_app.utils.cached_views import CachedAnonymousGETMixin
+from propertylist_app.utils.cached_views import CachedAnonymousGETMixin, CachedPerUserGETMixin
 from propertylist_app.validators import (
     assert_no_duplicate_files,
     validate_listing_photos,
@@ -61,12 +63,20 @@ from propertylist_app.api.serializers import (
     RoomImageSerializer,
     RoomPreviewSerializer,
     RoomSerializer,
+    RoomCardSerializer,
     RoomPhotoUploadRequestSerializer,
     AvatarUploadRequestSerializer,
     AvatarUploadResponseSerializer,
     DetailResponseSerializer,
 )
-from .common import ok_response, _listing_state_for_room, _pagination_meta, _wrap_response_success
+from .common import (
+    ok_response,
+    _listing_state_for_room,
+    _pagination_meta,
+    _wrap_response_success,
+    _wants_room_cards,
+    _with_room_card_preloads,
+)
 
 class EmptyDataSerializer(serializers.Serializer):
     pass
@@ -76,7 +86,7 @@ class EmptyDataSerializer(serializers.Serializer):
 
 class RoomCategorieAV(APIView):
     permission_classes = [IsAdminOrReadOnly]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonCounterThrottle]
     pagination_class = StandardLimitOffsetPagination
 
     @extend_schema(
@@ -139,7 +149,7 @@ class RoomCategorieAV(APIView):
 
 class RoomCategorieDetailAV(APIView):
     permission_classes = [IsAdminOrReadOnly]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonCounterThrottle]
 
     @extend_schema(
         operation_id="api_v1_room_categories_retrieve",
@@ -216,7 +226,7 @@ class RoomListGV(CachedAnonymousGETMixin, generics.ListAPIView):
       
       
 class RoomAV(APIView):
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonCounterThrottle]
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
@@ -888,6 +898,13 @@ class RoomAvailabilityView(APIView):
         return Response({"available": not conflicts_qs.exists(), "conflicts": list(conflicts_qs)})      
       
       
+def _with_active_booking_counts(slots_qs):
+    """Annotate active_bookings (non-cancelled bookings per slot) for is_full / only_free."""
+    return slots_qs.annotate(
+        active_bookings=Count("bookings", filter=Q(bookings__canceled_at__isnull=True))
+    )
+
+
 class RoomAvailabilitySlotListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     serializer_class = AvailabilitySlotSerializer
@@ -901,7 +918,7 @@ class RoomAvailabilitySlotListCreateView(generics.ListCreateAPIView):
         if getattr(self, "swagger_fake_view", False):
             return AvailabilitySlot.objects.none()
         room = get_object_or_404(Room.objects.alive(), pk=self.kwargs["pk"])
-        return room.availability_slots.order_by("start")
+        return _with_active_booking_counts(room.availability_slots.order_by("start"))
 
     def perform_create(self, serializer):
         room = self._get_room()
@@ -934,12 +951,13 @@ class RoomAvailabilitySlotDeleteView(generics.DestroyAPIView):
 class RoomAvailabilityPublicView(generics.ListAPIView):
     permission_classes = [AllowAny]
     serializer_class = AvailabilitySlotSerializer
+    query_budget = 4
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
             return AvailabilitySlot.objects.none()
         room = get_object_or_404(Room.objects.alive(), pk=self.kwargs["pk"])
-        qs = room.availability_slots.order_by("start")
+        qs = _with_active_booking_counts(room.availability_slots.order_by("start"))
         f = self.request.query_params.get("from")
         t = self.request.query_params.get("to")
         only_free = self.request.query_params.get("only_free") in {"1", "true", "True"}
@@ -953,10 +971,7 @@ class RoomAvailabilityPublicView(generics.ListAPIView):
             qs = qs.filter(start__lt=end, end__gt=start)
 
         if only_free:
-            available_ids = [
-                s.id for s in qs if Booking.objects.filter(slot=s, canceled_at__isnull=True).count() < s.max_bookings
-            ]
-            qs = qs.filter(id__in=available_ids)
+            qs = qs.filter(active_bookings__lt=F("max_bookings"))
 
         return qs
            
@@ -1039,7 +1054,7 @@ class RoomListAlt(CachedAnonymousGETMixin, generics.ListAPIView):
         )
 
 
-class MyListingsView(generics.ListAPIView):
+class MyListingsView(CachedPerUserGETMixin, generics.ListAPIView):
     """
     Returns the current user's rooms grouped by logical listing_state.
     Front-end will call:
@@ -1052,6 +1067,7 @@ class MyListingsView(generics.ListAPIView):
     serializer_class = RoomSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = None
+    cache_prefix = "my-listings"
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
@@ -1060,7 +1076,10 @@ class MyListingsView(generics.ListAPIView):
         today = date.today()
 
         # Start from all rooms belonging to this user and not soft-deleted
-        qs = Room.objects.filter(property_owner=user, is_deleted=False)
+        qs = _with_room_card_preloads(
+            Room.objects.filter(property_owner=user, is_deleted=False),
+            cards=_wants_room_cards(self.request),
+        )
 
         state = self.request.query_params.get("state")
 
@@ -1088,6 +1107,11 @@ class MyListingsView(generics.ListAPIView):
 
         return qs.order_by("-created_at")
 
+    def get_serializer_class(self):
+        if _wants_room_cards(self.request):
+            return RoomCardSerializer
+        return super().get_serializer_class()
+
 
 
       
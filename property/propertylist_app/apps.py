@@ -7,3 +7,8 @@ class PropertylistAppConfig(AppConfig):
     def ready(self):
         # import signals so receivers are registered
         from . import signals  # noqa: F401
+        # Celery task timing receivers
+        import property.metrics  # noqa: F401
+        # serializer.data counts towards the request's serialize time
+        from property.instrumentation import instrument_serializers
+        instrument_serializers()
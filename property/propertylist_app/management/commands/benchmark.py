@@ -0,0 +1,490 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import NotificationTemplate, OutboundNotification
+from propertylist_app.models import (
+    MAP_CELL_ZOOM,
+    Message,
+    MessageThread,
+    Notification,
+    PostcodeCentroid,
+    Room,
+    RoomCategorie,
+    RoomImage,
+    UserProfile,
+)
+from propertylist_app.validators import map_tile_quadkey
+
+
+# Everything the seeder creates hangs off users with this prefix, so --reset can find it.
+BENCH_PREFIX = "bench_"
+BENCH_TEMPLATE_KEY = "bench_dispatch"
+
+# (city, postcode, lat, lon) - rooms are scattered around these
+CITIES = [
+    ("London", "SW1A 1AA", 51.501009, -0.141588),
+    ("Manchester", "M1 1AE", 53.481066, -2.237039),
+    ("Birmingham", "B1 1AA", 52.478627, -1.907930),
+    ("Leeds", "LS1 1BA", 53.796587, -1.545290),
+    ("Bristol", "BS1 4DJ", 51.452549, -2.594811),
+    ("Glasgow", "G1 1AA", 55.860916, -4.250259),
+    ("Liverpool", "L1 8JQ", 53.401557, -2.981541),
+    ("Nottingham", "NG1 1AA", 52.953000, -1.149000),
+]
+
+ADJECTIVES = ["Bright", "Spacious", "Cosy", "Modern", "Quiet", "Sunny", "Large", "Newly refurbished"]
+KINDS = ["double room", "single room", "studio", "ensuite room", "room in flat share"]
+
+DESCRIPTION = (
+    "A well presented room with plenty of natural light, modern furnishings, good storage "
+    "space and excellent transport links nearby. Bills can be included on request."
+)
+
+SCENARIOS = (
+    "search_keyword",
+    "search_radius",
+    "search_filters",
+    "nearby",
+    "home",
+    "inbox",
+    "threads",
+    "notification_dispatch",
+)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large benchmark dataset and/or measure hot endpoints "
+        "(latency percentiles, query counts, peak memory) against a stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", action="store_true", help="Generate the benchmark dataset first.")
+        parser.add_argument("--reset", action="store_true", help="Delete previously seeded benchmark data.")
+        parser.add_argument("--rooms", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=50_000)
+        parser.add_argument("--messages", type=int, default=1_000_000)
+        parser.add_argument("--messages-per-thread", type=int, default=20)
+        parser.add_argument("--photos-per-room", type=int, default=3)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--random-seed", type=int, default=1234)
+
+        parser.add_argument("--skip-run", action="store_true", help="Only seed; don't run the scenarios.")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated subset to run.")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--dispatch-batch", type=int, default=200)
+
+        parser.add_argument("--baseline", default=None, help="Baseline JSON file to compare against.")
+        parser.add_argument("--save-baseline", action="store_true", help="Write this run's results to --baseline.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed relative slowdown of p95 / peak memory before it counts as a regression.",
+        )
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        scenarios = [s.strip() for s in options["scenarios"].split(",") if s.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+        if options["save_baseline"] and not options["baseline"]:
+            raise CommandError("--save-baseline needs --baseline <path>.")
+
+        self.rng = random.Random(options["random_seed"])
+
+        if options["reset"]:
+            self._reset()
+        if options["seed"]:
+            self._seed(options)
+        if options["skip_run"]:
+            return
+
+        actor = User.objects.filter(username=f"{BENCH_PREFIX}user_0").first()
+        if actor is None:
+            raise CommandError("No benchmark data found; run with --seed first.")
+
+        results = self._run(actor, scenarios, options)
+        self._report(results, options)
+
+    # ------------------------------------------------------------------
+    # Dataset
+    # ------------------------------------------------------------------
+    def _reset(self):
+        bench_users = User.objects.filter(username__startswith=BENCH_PREFIX)
+        # RoomImage.room is PROTECT, so photos go first
+        RoomImage.objects.filter(room__property_owner__in=bench_users).delete()
+        MessageThread.objects.filter(participants__in=bench_users).delete()
+        deleted, _ = bench_users.delete()
+        self.stdout.write(f"Removed previous benchmark data ({deleted} rows).")
+
+    def _seed(self, options):
+        if User.objects.filter(username__startswith=BENCH_PREFIX).exists():
+            raise CommandError("Benchmark data already exists; add --reset to regenerate it.")
+
+        batch = max(options["batch_size"], 1)
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            user_ids = self._seed_users(options["users"], batch)
+            room_ids = self._seed_rooms(user_ids, options["rooms"], batch)
+            self._seed_photos(room_ids, options["photos_per_room"], batch)
+            threads, messages = self._seed_messages(
+                user_ids, options["messages"], options["messages_per_thread"], batch
+            )
+            self._seed_notifications(user_ids[0], batch)
+            self._seed_postcodes()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(user_ids)} users, {len(room_ids)} rooms, {threads} threads, "
+                f"{messages} messages in {time.perf_counter() - started:.1f}s"
+            )
+        )
+
+    def _bulk(self, model, rows, batch):
+        """bulk_create a generator in slices so huge datasets don't sit in memory."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= batch:
+                model.objects.bulk_create(chunk, batch_size=batch)
+                chunk = []
+        if chunk:
+            model.objects.bulk_create(chunk, batch_size=batch)
+
+    def _seed_users(self, count, batch):
+        count = max(count, 2)
+        password = make_password("bench-pass-123")
+        self._bulk(
+            User,
+            (
+                User(
+                    username=f"{BENCH_PREFIX}user_{i}",
+                    email=f"{BENCH_PREFIX}user_{i}@example.com",
+                    password=password,
+                )
+                for i in range(count)
+            ),
+            batch,
+        )
+        by_name = dict(
+            User.objects.filter(username__startswith=BENCH_PREFIX).values_list("username", "id")
+        )
+        user_ids = [by_name[f"{BENCH_PREFIX}user_{i}"] for i in range(count)]
+        self._bulk(UserProfile, (UserProfile(user_id=uid) for uid in user_ids), batch)
+        return user_ids
+
+    def _seed_rooms(self, user_ids, count, batch):
+        category, _ = RoomCategorie.objects.get_or_create(name="Room")
+        rng = self.rng
+        # roughly one landlord per 10 users, like production
+        landlords = user_ids[: max(len(user_ids) // 10, 1)]
+
+        def rows():
+            for i in range(count):
+                city, postcode, lat, lon = CITIES[i % len(CITIES)]
+                kind = rng.choice(KINDS)
+                room = Room(
+                    title=f"{rng.choice(ADJECTIVES)} {kind} in {city}",
+                    description=DESCRIPTION,
+                    price_per_month=Decimal(rng.randrange(400, 2000, 25)),
+                    location=f"{city} {postcode}",
+                    category=category,
+                    property_owner_id=landlords[i % len(landlords)],
+                    furnished=rng.random() < 0.6,
+                    bills_included=rng.random() < 0.4,
+                    number_of_bedrooms=rng.randint(1, 5),
+                    number_of_bathrooms=rng.randint(1, 3),
+                    property_type=rng.choice(["flat", "house", "studio"]),
+                    room_size=rng.choice(["single", "double", "dont_mind"]),
+                    avg_rating=round(rng.uniform(0, 5), 1),
+                    latitude=lat + rng.uniform(-0.15, 0.15),
+                    longitude=lon + rng.uniform(-0.15, 0.15),
+                    status="active" if rng.random() < 0.95 else "hidden",
+                )
+                # bulk_create skips Room.save()
+                room.map_cell = map_tile_quadkey(room.latitude, room.longitude, MAP_CELL_ZOOM)
+                yield room
+
+        self._bulk(Room, rows(), batch)
+        return list(
+            Room.objects.filter(property_owner_id__in=landlords).order_by("id").values_list("id", flat=True)
+        )
+
+    def _seed_photos(self, room_ids, per_room, batch):
+        self._bulk(
+            RoomImage,
+            (
+                RoomImage(room_id=rid, image=f"room_images/bench/{(rid + n) % 50}.jpg", status="approved")
+                for rid in room_ids
+                for n in range(per_room)
+            ),
+            batch,
+        )
+
+    def _seed_messages(self, user_ids, total, per_thread, batch):
+        per_thread = max(per_thread, 1)
+        thread_count = max(total // per_thread, 1)
+        rng = self.rng
+        actor = user_ids[0]
+
+        MessageThread.objects.bulk_create(
+            [MessageThread() for _ in range(thread_count)], batch_size=batch
+        )
+        thread_ids = list(MessageThread.objects.order_by("-id").values_list("id", flat=True)[:thread_count])
+
+        # the acting user gets a busy inbox (first 200 threads); the rest are random pairs
+        pairs = []
+        for n, tid in enumerate(thread_ids):
+            a = actor if n < 200 else rng.choice(user_ids)
+            b = rng.choice(user_ids)
+            while b == a:
+                b = rng.choice(user_ids)
+            pairs.append((tid, a, b))
+
+        Through = MessageThread.participants.through
+        self._bulk(
+            Through,
+            (
+                Through(messagethread_id=tid, user_id=uid)
+                for tid, a, b in pairs
+                for uid in (a, b)
+            ),
+            batch,
+        )
+
+        self._bulk(
+            Message,
+            (
+                Message(thread_id=tid, sender_id=(a if m % 2 == 0 else b), body=f"Benchmark message {m + 1}")
+                for tid, a, b in pairs
+                for m in range(per_thread)
+            ),
+            batch,
+        )
+        return thread_count, thread_count * per_thread
+
+    def _seed_notifications(self, user_id, batch):
+        self._bulk(
+            Notification,
+            (
+                Notification(user_id=user_id, title=f"Notification {i}", body="Benchmark", is_read=i % 3 == 0)
+                for i in range(500)
+            ),
+            batch,
+        )
+        NotificationTemplate.objects.get_or_create(
+            key=BENCH_TEMPLATE_KEY,
+            defaults={"subject": "Benchmark", "body": "Hello {{ user.username }}"},
+        )
+
+    def _seed_postcodes(self):
+        # radius/nearby searches geocode from the local table, never the network
+        PostcodeCentroid.objects.bulk_create(
+            [PostcodeCentroid(postcode=pc, latitude=lat, longitude=lon) for _c, pc, lat, lon in CITIES],
+            ignore_conflicts=True,
+        )
+
+    # ------------------------------------------------------------------
+    # Scenarios
+    # ------------------------------------------------------------------
+    def _run(self, actor, scenarios, options):
+        client = APIClient()
+        client.force_authenticate(user=actor)
+        rest = dict(settings.REST_FRAMEWORK)
+        rest["DEFAULT_THROTTLE_RATES"] = {
+            scope: "1000000/min" for scope in rest.get("DEFAULT_THROTTLE_RATES", {})
+        }
+
+        results = {}
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            REST_FRAMEWORK=rest,
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+        ):
+            for name in scenarios:
+                if name == "notification_dispatch":
+                    if self._has_foreign_due_notifications():
+                        self.stdout.write(self.style.WARNING(
+                            "  notification_dispatch: skipped, non-benchmark notifications are due in this database"
+                        ))
+                        continue
+                    run = self._dispatch_runner(actor, options)
+                else:
+                    run = self._http_runner(client, name)
+                results[name] = self._measure(run, options["iterations"], options["warmup"])
+                self.stdout.write(f"  {name}: done")
+        return results
+
+    def _http_runner(self, client, name):
+        city, postcode, _lat, _lon = CITIES[0]
+        requests = {
+            "search_keyword": ("v1:search-rooms", {"q": "double"}),
+            "search_radius": ("v1:search-rooms", {"postcode": postcode, "radius_miles": 5}),
+            "search_filters": (
+                "v1:search-rooms",
+                {"min_price": 500, "max_price": 1200, "rooms_min": 2, "room_size": "double", "city": city},
+            ),
+            "nearby": ("v1:rooms-nearby", {"postcode": postcode, "radius_miles": 5}),
+            "home": ("v1:api-home", {}),
+            "inbox": ("v1:inbox-list", {}),
+            "threads": ("v1:message-threads", {}),
+        }
+        url_name, params = requests[name]
+        url = reverse(url_name)
+
+        def run(i):
+            # unique param per call: measure the view itself, not cache_page
+            response = client.get(url, {**params, "_bench": i})
+            return 200 <= response.status_code < 300
+
+        return run
+
+    def _has_foreign_due_notifications(self):
+        # send_due_notifications() drains everything that is due, not just our rows
+        return (
+            OutboundNotification.objects.filter(scheduled_for__lte=timezone.now())
+            .exclude(status__in=[OutboundNotification.STATUS_SENT, OutboundNotification.STATUS_SKIPPED])
+            .exclude(user__username__startswith=BENCH_PREFIX)
+            .exists()
+        )
+
+    def _dispatch_runner(self, actor, options):
+        from notifications.tasks import send_due_notifications
+
+        size = max(options["dispatch_batch"], 1)
+
+        def run(i):
+            now = timezone.now() - timedelta(seconds=1)
+            OutboundNotification.objects.bulk_create(
+                [
+                    OutboundNotification(user=actor, template_key=BENCH_TEMPLATE_KEY, scheduled_for=now)
+                    for _ in range(size)
+                ]
+            )
+            result = send_due_notifications()
+            return bool(result)
+
+        return run
+
+    def _measure(self, run, iterations, warmup):
+        iterations = max(iterations, 1)
+        for i in range(warmup):
+            run(-1 - i)
+
+        timings = []
+        queries = []
+        errors = 0
+        for i in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                ok = run(i)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(ctx.captured_queries))
+            errors += 0 if ok else 1
+
+        # memory is traced on a separate call: tracemalloc would distort the timings
+        tracemalloc.start()
+        try:
+            run(iterations)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            "iterations": iterations,
+            "p50_ms": round(_percentile(timings, 50), 2),
+            "p95_ms": round(_percentile(timings, 95), 2),
+            "p99_ms": round(_percentile(timings, 99), 2),
+            "max_ms": round(timings[-1], 2),
+            "queries": int(statistics.median(queries)),
+            "max_queries": max(queries),
+            "peak_kb": round(peak / 1024, 1),
+            "errors": errors,
+        }
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def _load_baseline(self, path):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh).get("scenarios", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read baseline {path}: {exc}")
+
+    def _regressions(self, name, result, base, tolerance):
+        found = []
+        if result["p95_ms"] > base.get("p95_ms", float("inf")) * (1 + tolerance):
+            found.append(f"p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["queries"] > base.get("queries", float("inf")):
+            found.append(f"queries {base['queries']} -> {result['queries']}")
+        if result["peak_kb"] > base.get("peak_kb", float("inf")) * (1 + tolerance):
+            found.append(f"peak {base['peak_kb']}KB -> {result['peak_kb']}KB")
+        if result["errors"]:
+            found.append(f"{result['errors']} failed call(s)")
+        return [f"{name}: {r}" for r in found]
+
+    def _report(self, results, options):
+        baseline = self._load_baseline(options["baseline"]) if options["baseline"] else {}
+
+        header = f"{'scenario':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'queries':>9}{'peak KB':>10}  vs baseline"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        regressions = []
+        for name, r in results.items():
+            base = baseline.get(name)
+            if base:
+                delta = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base.get("p95_ms") else 0.0
+                versus = f"p95 {delta:+.0f}%, queries {r['queries'] - base.get('queries', 0):+d}"
+                regressions.extend(self._regressions(name, r, base, options["tolerance"]))
+            else:
+                versus = "-"
+            self.stdout.write(
+                f"{name:<24}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['max_ms']:>9}"
+                f"{r['queries']:>9}{r['peak_kb']:>10}  {versus}"
+            )
+
+        if options["save_baseline"]:
+            merged = {**baseline, **results}
+            with open(options["baseline"], "w", encoding="utf-8") as fh:
+                json.dump({"scenarios": merged}, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['baseline']}")
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(f"REGRESSION {line}"))
+            if options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regression(s) against baseline.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Benchmark finished."))
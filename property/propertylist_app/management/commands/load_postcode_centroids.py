@@ -0,0 +1,123 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from propertylist_app.models import PostcodeCentroid
+from propertylist_app.validators import normalize_uk_postcode
+
+
+# Header names used by the usual bulk files (ONS Postcode Directory, Code-Point style exports)
+POSTCODE_COLUMNS = ("pcds", "postcode", "pcd", "pcd2")
+LAT_COLUMNS = ("lat", "latitude")
+LON_COLUMNS = ("long", "lon", "lng", "longitude")
+
+# ONSPD uses 99.999999 / 0.000000 for postcodes with no grid reference
+NO_GRID_LAT = 99.999999
+
+
+def _pick_column(header, wanted, override):
+    if override:
+        if override not in header:
+            raise CommandError(f"Column '{override}' not found in CSV header.")
+        return override
+    lowered = {h.lower(): h for h in header}
+    for name in wanted:
+        if name in lowered:
+            return lowered[name]
+    raise CommandError(f"Could not find any of {', '.join(wanted)} in CSV header.")
+
+
+class Command(BaseCommand):
+    help = "Load UK postcode centroids from a bulk CSV into PostcodeCentroid (offline geocoding)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="Path to the postcode CSV (e.g. ONSPD).")
+        parser.add_argument("--postcode-column", default=None)
+        parser.add_argument("--lat-column", default=None)
+        parser.add_argument("--lon-column", default=None)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--truncate",
+            action="store_true",
+            help="Delete all existing centroids before loading.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(int(options["batch_size"]), 1)
+
+        try:
+            fh = open(options["csv_path"], newline="", encoding="utf-8-sig")
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        loaded = 0
+        skipped = 0
+        # outward code -> [sum_lat, sum_lon, count]
+        outward_sums = {}
+
+        with fh, transaction.atomic():
+            reader = csv.DictReader(fh)
+            header = reader.fieldnames or []
+            pc_col = _pick_column(header, POSTCODE_COLUMNS, options["postcode_column"])
+            lat_col = _pick_column(header, LAT_COLUMNS, options["lat_column"])
+            lon_col = _pick_column(header, LON_COLUMNS, options["lon_column"])
+
+            if options["truncate"]:
+                PostcodeCentroid.objects.all().delete()
+
+            batch = []
+            for row in reader:
+                try:
+                    postcode = normalize_uk_postcode(row.get(pc_col) or "")
+                    lat = float(row.get(lat_col) or "")
+                    lon = float(row.get(lon_col) or "")
+                except (ValidationError, ValueError):
+                    skipped += 1
+                    continue
+
+                if lat == NO_GRID_LAT or (lat == 0 and lon == 0):
+                    skipped += 1
+                    continue
+
+                batch.append(PostcodeCentroid(postcode=postcode, latitude=lat, longitude=lon))
+
+                sums = outward_sums.setdefault(postcode.split(" ")[0], [0.0, 0.0, 0])
+                sums[0] += lat
+                sums[1] += lon
+                sums[2] += 1
+
+                if len(batch) >= batch_size:
+                    loaded += self._upsert(batch, batch_size)
+                    batch = []
+
+            if batch:
+                loaded += self._upsert(batch, batch_size)
+
+            outward_rows = [
+                PostcodeCentroid(
+                    postcode=code,
+                    latitude=s_lat / n,
+                    longitude=s_lon / n,
+                    is_outward=True,
+                )
+                for code, (s_lat, s_lon, n) in outward_sums.items()
+            ]
+            self._upsert(outward_rows, batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {loaded} postcodes and {len(outward_sums)} outward codes. Skipped: {skipped}"
+            )
+        )
+
+    def _upsert(self, rows, batch_size):
+        PostcodeCentroid.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["postcode"],
+            update_fields=["latitude", "longitude", "is_outward"],
+        )
+        return len(rows)
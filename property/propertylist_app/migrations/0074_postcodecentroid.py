@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertylist_app', '0073_remove_review_uq_review_once_per_booking_role_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostcodeCentroid',
+            fields=[
+                ('postcode', models.CharField(max_length=8, primary_key=True, serialize=False)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('is_outward', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
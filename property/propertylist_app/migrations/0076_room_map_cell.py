@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+from propertylist_app.validators.geo import map_tile_quadkey
+
+
+# Room.MAP_CELL_ZOOM at the time of this migration
+MAP_CELL_ZOOM = 20
+
+
+def fill_map_cells(apps, schema_editor):
+    Room = apps.get_model("propertylist_app", "Room")
+    rooms = Room.objects.filter(latitude__isnull=False, longitude__isnull=False).only("id", "latitude", "longitude")
+    batch = []
+    for room in rooms.iterator(chunk_size=2000):
+        room.map_cell = map_tile_quadkey(room.latitude, room.longitude, MAP_CELL_ZOOM)
+        batch.append(room)
+        if len(batch) >= 2000:
+            Room.objects.bulk_update(batch, ["map_cell"])
+            batch = []
+    if batch:
+        Room.objects.bulk_update(batch, ["map_cell"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertylist_app', '0075_saved_searches'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='map_cell',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['latitude', 'longitude'], name='room_lat_lon_idx'),
+        ),
+        migrations.RunPython(fill_map_cells, migrations.RunPython.noop),
+    ]
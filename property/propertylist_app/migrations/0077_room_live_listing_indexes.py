@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 23:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertylist_app', '0076_room_map_cell'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'active')), fields=['-created_at'], include=('paid_until',), name='room_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'active')), fields=['price_per_month'], include=('paid_until',), name='room_live_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'active')), fields=['-avg_rating'], include=('paid_until',), name='room_live_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'active')), fields=['-updated_at'], include=('paid_until',), name='room_live_updated_idx'),
+        ),
+    ]
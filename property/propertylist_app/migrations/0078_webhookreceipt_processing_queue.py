@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propertylist_app', '0077_room_live_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookreceipt',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='webhookreceipt',
+            name='event_created',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhookreceipt',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='webhookreceipt',
+            name='object_key',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='webhookreceipt',
+            index=models.Index(condition=models.Q(('processed', False)), fields=['object_key', 'event_created', 'id'], name='webhook_receipt_pending_idx'),
+        ),
+    ]
@@ -16,6 +16,8 @@ from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib.auth.hashers import check_password, make_password
 
+from propertylist_app.validators.geo import map_tile_quadkey
+
 
 # ---------------------------
 # Soft-delete base + queryset
@@ -97,6 +99,13 @@ class RoomCategorie(models.Model):
 # ----
 # Room
 # ----
+# zoom level of Room.map_cell (~40 m tiles); coarser cells are its prefixes
+MAP_CELL_ZOOM = 20
+
+# predicate of the partial "live listing" indexes on Room
+LIVE_ROOM_INDEX_CONDITION = Q(is_deleted=False, status="active")
+
+
 class Room(SoftDeleteModel):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -254,6 +263,9 @@ class Room(SoftDeleteModel):
     number_rating = models.IntegerField(default=0)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    # map tile quadkey of (latitude, longitude) at MAP_CELL_ZOOM, kept in sync by save();
+    # its prefixes are the clustering cells of RoomMapView
+    map_cell = models.CharField(max_length=MAP_CELL_ZOOM, blank=True, default="", editable=False)
     paid_until = models.DateField(null=True, blank=True)
 
     STATUS_CHOICES = (
@@ -525,6 +537,15 @@ class Room(SoftDeleteModel):
         if self.category_id is None:
             raise ValidationError({"category": "category is required."})
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"latitude", "longitude"} & set(update_fields):
+            if self.latitude is not None and self.longitude is not None:
+                self.map_cell = map_tile_quadkey(self.latitude, self.longitude, MAP_CELL_ZOOM)
+            else:
+                self.map_cell = ""
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "map_cell"}
+
         super().save(*args, **kwargs)
 
     class Meta:
@@ -535,6 +556,28 @@ class Room(SoftDeleteModel):
                 name="uq_room_title_lower_alive",
             ),
         ]
+        indexes = [
+            # viewport (bounding box) queries of RoomMapView
+            models.Index(fields=["latitude", "longitude"], name="room_lat_lon_idx"),
+            # Live listings (Room.objects.alive(), status="active") in each public
+            # ordering. paid_until >= today can't be part of an index predicate
+            # (not immutable), so it is carried in the index (INCLUDE on Postgres)
+            # and filtered there without visiting the table.
+            *(
+                models.Index(
+                    fields=[ordering],
+                    include=["paid_until"],
+                    condition=LIVE_ROOM_INDEX_CONDITION,
+                    name=f"room_live_{suffix}_idx",
+                )
+                for ordering, suffix in (
+                    ("-created_at", "created"),
+                    ("price_per_month", "price"),
+                    ("-avg_rating", "rating"),
+                    ("-updated_at", "updated"),
+                )
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -1091,6 +1134,9 @@ class Review(models.Model):
 # WebhookReceipt is the canonical store for webhook idempotency.
 # We use unique event_id values here to prevent duplicate processing
 # of the same provider webhook event, including Stripe retries.
+#
+# Stripe receipts are also the work queue: stripe_webhook only stores them,
+# and services/stripe_webhooks.py applies them in order per object_key.
 
 class WebhookReceipt(models.Model):
     source = models.CharField(max_length=50, db_index=True)
@@ -1101,6 +1147,41 @@ class WebhookReceipt(models.Model):
     processed = models.BooleanField(default=False)
     processed_at = models.DateTimeField(null=True, blank=True)
 
+    # "payment:<id>" / "object:<stripe id>": events for one object are applied in order
+    object_key = models.CharField(max_length=255, blank=True, default="")
+    event_created = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["object_key", "event_created", "id"],
+                condition=Q(processed=False),
+                name="webhook_receipt_pending_idx",
+            ),
+        ]
+
+
+# ---------
+# PostcodeCentroid (offline geocoding)
+# ---------
+class PostcodeCentroid(models.Model):
+    """
+    Local UK postcode -> (lat, lon), loaded by `manage.py load_postcode_centroids`.
+
+    Full postcodes are stored normalised ("SW1A 1AA"). Each outward code
+    ("SW1A") also gets its own row holding the average of its postcodes,
+    used for partial postcodes and as a fallback for unknown full ones.
+    """
+    postcode = models.CharField(max_length=8, primary_key=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    is_outward = models.BooleanField(default=False)
+
+    def __str__(self):
+        return self.postcode
+
 
 # ---------
 # SavedRoom
@@ -1121,6 +1202,57 @@ class SavedRoom(models.Model):
         return f"{getattr(self.user, 'username', 'user')} → {getattr(self, 'room_id', '∅')}"
 
 
+# -------------
+# SavedSearch
+# -------------
+class SavedSearch(models.Model):
+    """
+    A room search the user wants alerts for.
+    `query` is the canonical search query string (_canonical_querydict, paging
+    params dropped); `signature` is its hash, so the same search is saved once.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="saved_searches")
+    name = models.CharField(max_length=120, blank=True, default="")
+    query = models.JSONField(default=dict, blank=True)
+    signature = models.CharField(max_length=64)
+    # number of inverted-index dimensions the search constrains (see SavedSearchKey)
+    dimension_count = models.PositiveSmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "signature"], name="uq_saved_search_user_signature"),
+        ]
+        indexes = [models.Index(fields=["is_active", "dimension_count"])]
+
+    def __str__(self):
+        return f"{getattr(self.user, 'username', 'user')} → {self.name or self.signature[:12]}"
+
+
+class SavedSearchKey(models.Model):
+    """
+    Inverted index over saved searches: one row per value a saved search accepts
+    on a dimension it constrains ("cell", "band" or a facet field).
+    """
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name="keys")
+    dimension = models.CharField(max_length=40)
+    value = models.CharField(max_length=64)
+
+    class Meta:
+        indexes = [models.Index(fields=["dimension", "value"])]
+
+
+class SavedSearchMatch(models.Model):
+    """A room already alerted for a saved search (alerts go out once)."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name="matches")
+    room = models.ForeignKey("Room", on_delete=models.CASCADE, related_name="saved_search_matches")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("saved_search", "room")
+
+
 # -------------
 # MessageThread
 # -------------
@@ -148,47 +148,95 @@ def notify_listing_expiring(days_ahead: int = 3) -> None:
             )
 
 
+@shared_task(bind=True, name="notifications.tasks.dispatch_notification", max_retries=None)
+def dispatch_notification(self, notification_id: int) -> str | None:
+    """
+    Delay-queue consumer: runs at the notification's scheduled_for (Celery eta,
+    registered by NotificationService.schedule) and delivers it.
+    """
+    from notifications.services import NotificationService, eta_horizon
+
+    notification = NotificationService.deliver_pending(notification_id)
+    if notification is not None:
+        return notification.status
+
+    notification = OutboundNotification.objects.filter(
+        pk=notification_id, status=OutboundNotification.STATUS_QUEUED
+    ).first()
+    if notification is None or self.request.is_eager:
+        return None
+    if notification.scheduled_for - timezone.now() <= timedelta(seconds=eta_horizon()):
+        # woke early (clock skew, or it was rescheduled): sleep until it is due
+        raise self.retry(eta=notification.scheduled_for)
+    # further out than the horizon: send_due_notifications registers it later
+    return None
+
+
 @shared_task(name="notifications.tasks.send_due_notifications")
 def send_due_notifications() -> dict:
     """
-    Deliver all due notifications using the single NotificationService pipeline.
+    Reconciliation for the delay queue (dispatch_notification), run every 5 minutes:
+    - delivers due notifications that were never registered (created without
+      NotificationService.queue), lost their registration, or are more than
+      NOTIFICATION_DISPATCH_GRACE_SECONDS overdue; failed ones are retried
+    - registers queued notifications that have come within the ETA horizon
+      and are not registered yet
+
+    One query for both, and one get_many for their registrations.
     """
-    from notifications.services import NotificationService
+    from notifications.services import (
+        NotificationService,
+        dispatch_grace,
+        eta_horizon,
+        registered_notification_ids,
+    )
 
     now = timezone.now()
 
-    qs = (
-        OutboundNotification.objects.select_related("user")
-        .filter(scheduled_for__lte=now, channel=NotificationTemplate.CHANNEL_EMAIL)
+    pending = list(
+        OutboundNotification.objects
+        .filter(
+            channel=NotificationTemplate.CHANNEL_EMAIL,
+            scheduled_for__lte=now + timedelta(seconds=eta_horizon()),
+        )
         .exclude(
             status__in=[
                 OutboundNotification.STATUS_SENT,
                 OutboundNotification.STATUS_SKIPPED,
             ]
         )
+        .only("id", "channel", "status", "scheduled_for")
     )
+    owned = registered_notification_ids((n.pk, n.scheduled_for) for n in pending)
+
+    overdue = now - timedelta(seconds=dispatch_grace())
+    to_deliver = [
+        n.pk for n in pending
+        if n.scheduled_for <= now and (n.pk not in owned or n.scheduled_for <= overdue)
+    ]
+    unregistered = [
+        n for n in pending
+        if n.scheduled_for > now and n.status == OutboundNotification.STATUS_QUEUED and n.pk not in owned
+    ]
+
+    counts = {
+        OutboundNotification.STATUS_SENT: 0,
+        OutboundNotification.STATUS_FAILED: 0,
+        OutboundNotification.STATUS_SKIPPED: 0,
+    }
+    for pk in to_deliver:
+        notif = NotificationService.deliver_pending(pk, retry_failed=True)
+        if notif is not None and notif.status in counts:
+            counts[notif.status] += 1
 
-    found = qs.count()
-    sent_count = 0
-    failed_count = 0
-    skipped_count = 0
-
-    for notif in qs:
-        NotificationService.deliver(notif)
-        notif.refresh_from_db()
-
-        if notif.status == OutboundNotification.STATUS_SENT:
-            sent_count += 1
-        elif notif.status == OutboundNotification.STATUS_SKIPPED:
-            skipped_count += 1
-        elif notif.status == OutboundNotification.STATUS_FAILED:
-            failed_count += 1
+    scheduled = sum(1 for notif in unregistered if NotificationService.schedule(notif))
 
     return {
-        "sent": sent_count,
-        "failed": failed_count,
-        "skipped": skipped_count,
-        "found": found,
+        "sent": counts[OutboundNotification.STATUS_SENT],
+        "failed": counts[OutboundNotification.STATUS_FAILED],
+        "skipped": counts[OutboundNotification.STATUS_SKIPPED],
+        "found": len(to_deliver),
+        "scheduled": scheduled,
     }
     
     
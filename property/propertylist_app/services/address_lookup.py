@@ -0,0 +1,110 @@
+# propertylist_app/services/address_lookup.py
+import time
+from urllib.error import HTTPError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from property.instrumentation import record_cache_lookup
+
+from propertylist_app.validators import normalize_uk_postcode
+
+
+CACHE_PREFIX = "address:postcode:"
+LOCK_PREFIX = "address:lock:"
+
+# stored for postcodes the provider says don't exist (404)
+_NOT_FOUND = "__not_found__"
+
+# outlives the provider call (3s connect + 10s read); released as soon as it returns
+_LOCK_TIMEOUT = 15
+
+
+class AddressLookupPending(Exception):
+    """Another worker is fetching this postcode and its answer did not land in time."""
+
+
+def normalise_lookup_postcode(raw: str) -> str:
+    """
+    "sw1a1aa" / " SW1A 1AA " -> "SW1A 1AA".
+    Anything that doesn't validate is still passed upstream (uppercased, single spaces),
+    the provider is the one that decides.
+    """
+    try:
+        return normalize_uk_postcode(raw)
+    except ValidationError:
+        return " ".join(str(raw or "").upper().split())
+
+
+def _cache_get(key):
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def _cache_set(key, value, timeout):
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception:
+        return
+
+
+def cached_address_suggestions(postcode_raw: str, fetch):
+    """
+    Address suggestions for a postcode, cached per normalised postcode.
+
+    - hits:     cached list (ADDRESS_LOOKUP_CACHE_TTL)
+    - 404s:     cached separately as "not found" (ADDRESS_LOOKUP_NEGATIVE_TTL) -> []
+    - coalesce: only one worker calls the provider for a postcode at a time;
+                the others wait briefly (ADDRESS_LOOKUP_COALESCE_WAIT_SECONDS) for
+                its answer to land in the cache, then raise AddressLookupPending
+                rather than calling the provider too.
+
+    `fetch(postcode)` does the upstream call; any error other than 404 is re-raised
+    so the view can map it to a response.
+    """
+    postcode = normalise_lookup_postcode(postcode_raw)
+    key = f"{CACHE_PREFIX}{postcode}"
+
+    hit = _cache_get(key)
+    record_cache_lookup("address", hit is not None)
+    if hit is not None:
+        return [] if hit == _NOT_FOUND else hit
+
+    lock_key = f"{LOCK_PREFIX}{postcode}"
+    wait_seconds = float(getattr(settings, "ADDRESS_LOOKUP_COALESCE_WAIT_SECONDS", 0.5))
+
+    try:
+        is_leader = cache.add(lock_key, 1, timeout=_LOCK_TIMEOUT)
+    except Exception:
+        is_leader = True
+
+    if not is_leader:
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            hit = _cache_get(key)
+            if hit is not None:
+                return [] if hit == _NOT_FOUND else hit
+        # leader is still waiting on the provider: don't pile on upstream
+        raise AddressLookupPending(postcode)
+
+    try:
+        try:
+            addresses = fetch(postcode)
+        except HTTPError as exc:
+            if exc.code != 404:
+                raise
+            _cache_set(key, _NOT_FOUND, getattr(settings, "ADDRESS_LOOKUP_NEGATIVE_TTL", 60 * 60))
+            return []
+
+        _cache_set(key, addresses, getattr(settings, "ADDRESS_LOOKUP_CACHE_TTL", 60 * 60 * 24))
+        return addresses
+    finally:
+        if is_leader:
+            try:
+                cache.delete(lock_key)
+            except Exception:
+                pass
@@ -0,0 +1,146 @@
+# propertylist_app/services/auth_cache.py
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from property.instrumentation import record_cache_lookup
+
+
+# never cached; the rebuilt user loads it from the database if anything reads it
+_UNCACHED_USER_FIELDS = ("password",)
+
+
+def _version_key(user_id) -> str:
+    return f"auth:user:{user_id}:version"
+
+
+def _entry_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def _field_values(instance, exclude=()) -> dict:
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.name not in exclude
+    }
+
+
+def _to_entry(user, version) -> dict:
+    profile = user._state.fields_cache.get("profile")
+    entry = {
+        "version": version,
+        "user": _field_values(user, exclude=_UNCACHED_USER_FIELDS),
+        "profile": None if profile is None else _field_values(profile),
+    }
+    if jwt_settings.CHECK_REVOKE_TOKEN:
+        # the same digest every token already carries in its revoke claim
+        entry["password_digest"] = get_md5_hash_password(user.password)
+    return entry
+
+
+def _from_entry(entry):
+    User = get_user_model()
+    db = router.db_for_read(User)
+    user = User.from_db(db, list(entry["user"]), list(entry["user"].values()))
+
+    profile = None
+    if entry["profile"] is not None:
+        Profile = User._meta.get_field("profile").related_model
+        profile = Profile.from_db(db, list(entry["profile"]), list(entry["profile"].values()))
+        profile._state.fields_cache["user"] = user
+    user._state.fields_cache["profile"] = profile
+
+    if "password_digest" in entry:
+        user._password_digest = entry["password_digest"]
+    return user
+
+
+def get_auth_user(user_id):
+    """
+    The User (with .profile already loaded, or None if there is no profile)
+    for an authenticated request, or None if the user does not exist.
+
+    Cached per user for AUTH_USER_CACHE_TTL seconds as plain field values
+    (no password hash: a user served from the cache loads it on access).
+    The entry is only served while it carries the user's current auth
+    version, which invalidate_auth_user() bumps (user/profile saves via
+    signals.py, logout). Counter and entry come back in one get_many().
+    """
+    version_key, entry_key = _version_key(user_id), _entry_key(user_id)
+    try:
+        found = cache.get_many([version_key, entry_key])
+    except Exception:
+        found = {}
+
+    version = found.get(version_key)
+    entry = found.get(entry_key)
+    hit = entry is not None and version is not None and entry.get("version") == version
+    record_cache_lookup("auth_user", hit)
+    if hit:
+        return _from_entry(entry)
+
+    if version is None:
+        # start from the clock (not 1) so an evicted counter never matches an old entry
+        version = time.time_ns() // 1000
+        try:
+            if not cache.add(version_key, version, None):
+                version = cache.get(version_key, version)
+        except Exception:
+            pass
+
+    # reverse one-to-one: one query for user + profile, and user.profile is cached
+    # on the instance (as None when missing) so later reads don't query again
+    user = get_user_model().objects.select_related("profile").filter(pk=user_id).first()
+    if user is None:
+        return None
+    if "profile" not in user._state.fields_cache:
+        user._state.fields_cache["profile"] = None
+
+    try:
+        cache.set(
+            entry_key,
+            _to_entry(user, version),
+            timeout=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+        )
+    except Exception:
+        # Fail open: the user is still correct for this request
+        pass
+    return user
+
+
+def _bump_auth_versions(user_ids) -> None:
+    for user_id in user_ids:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            # no counter -> no entry can match it
+            pass
+        except Exception:
+            # could not bump: drop the entry instead
+            try:
+                cache.delete(_entry_key(user_id))
+            except Exception:
+                pass
+
+
+def invalidate_auth_user(*user_ids) -> None:
+    """
+    Stop serving cached auth users for these ids (deactivation, password change,
+    logout, profile edits).
+
+    Bumped now and again when the surrounding transaction commits: a request
+    that reloads the user between the two would otherwise cache the
+    pre-commit row under the new version.
+    """
+    user_ids = {u for u in user_ids if u}
+    if not user_ids:
+        return
+    _bump_auth_versions(user_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_auth_versions(user_ids))
@@ -0,0 +1,84 @@
+# propertylist_app/services/circuit_breaker.py
+import time
+
+from django.core.cache import cache
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Small cache-backed circuit breaker, shared by all workers.
+
+    - `failure_threshold` consecutive failures open the circuit for `reset_timeout` seconds.
+    - After that one call is let through (half-open); success closes it, failure re-opens it.
+    - Cache errors fail open: the breaker never blocks calls because Redis is down.
+
+    Usage:
+        breaker = CircuitBreaker("ideal-postcodes")
+        breaker.before_call()           # raises CircuitOpenError when open
+        ... call upstream ...
+        breaker.record_success() / breaker.record_failure()
+    """
+
+    def __init__(self, name: str, *, failure_threshold: int = 5, reset_timeout: int = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    @property
+    def _failures_key(self) -> str:
+        return f"circuit:{self.name}:failures"
+
+    @property
+    def _open_until_key(self) -> str:
+        return f"circuit:{self.name}:open_until"
+
+    @property
+    def _probe_key(self) -> str:
+        return f"circuit:{self.name}:probe"
+
+    def is_open(self) -> bool:
+        try:
+            open_until = cache.get(self._open_until_key)
+        except Exception:
+            return False
+        if not open_until:
+            return False
+        if time.time() < float(open_until):
+            return True
+        # half-open: exactly one caller gets to probe the upstream
+        try:
+            return not cache.add(self._probe_key, 1, timeout=self.reset_timeout)
+        except Exception:
+            return False
+
+    def before_call(self) -> None:
+        if self.is_open():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open.")
+
+    def record_success(self) -> None:
+        try:
+            cache.delete_many([self._failures_key, self._open_until_key, self._probe_key])
+        except Exception:
+            return
+
+    def record_failure(self) -> None:
+        try:
+            cache.add(self._failures_key, 0, timeout=self.reset_timeout * 10)
+            failures = cache.incr(self._failures_key)
+        except Exception:
+            return
+
+        if failures >= self.failure_threshold:
+            try:
+                cache.set(
+                    self._open_until_key,
+                    time.time() + self.reset_timeout,
+                    timeout=self.reset_timeout * 10,
+                )
+                cache.delete(self._probe_key)
+            except Exception:
+                return
@@ -0,0 +1,396 @@
+# propertylist_app/services/facet_index.py
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from propertylist_app.api.room_filters import ROOM_RANGE_FIELDS, ROOM_TERM_FIELDS
+from propertylist_app.models import Room
+
+
+# ---------------------------------------------------------------------
+# Room facet index
+#
+# An in-process bitmap index over live rooms for advanced search. Bitsets are
+# Python ints with bit N set for room id N:
+#   - one bitset per (field, value) of every equality filter
+#   - sorted (value, id) arrays for the range filters and orderings
+# so any filter combination is a few bitwise ANDs/ORs, independent of which
+# filters are combined; only the page itself is then fetched from SQL.
+#
+# Keeping it fresh across processes:
+#   room_facet_index:generation   counter bumped on every room change
+#   room_facet_index:change:<n>   id of the room behind change n
+# A process whose index is behind replays the missing changes (one get_many
+# plus one query for those rooms). A missing counter, a gap in the change
+# log, too many changes or ROOM_FACET_INDEX_MAX_AGE_SECONDS trigger a full
+# rebuild. queryset.update() sends no signals; those call sites notify
+# explicitly (note_rooms_changed / invalidate_room_facet_index).
+#
+# A full rebuild reads every live room, so it runs in a background thread
+# (ROOM_FACET_INDEX_BACKGROUND_REBUILD) and searches use SQL until it is done;
+# it builds each bitset once from collected ids and sorts each array once.
+# ---------------------------------------------------------------------
+
+_GENERATION_KEY = "room_facet_index:generation"
+_CHANGE_TTL = 60 * 60
+_MAX_REPLAY = 500
+# range bitsets kept between queries (dropped whenever the index changes)
+_MAX_CACHED_BITSETS = 256
+
+# Orderings the index can serve: SearchRoomsView ordering -> sorted array
+INDEX_ORDERINGS = {
+    "-created_at": ("created_at", True),
+    "created_at": ("created_at", False),
+    "price_per_month": ("price_per_month", False),
+    "-price_per_month": ("price_per_month", True),
+}
+
+_SORTED_FIELDS = (*ROOM_RANGE_FIELDS, "created_at")
+_ROW_FIELDS = ("id", "paid_until", *ROOM_TERM_FIELDS, *_SORTED_FIELDS)
+
+
+def _change_key(generation) -> str:
+    return f"room_facet_index:change:{generation}"
+
+
+def _bits(ids) -> int:
+    # one pass over a bytearray instead of OR-ing ever larger ints
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for room_id in ids:
+        buf[room_id >> 3] |= 1 << (room_id & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _members(bits: int) -> bytes:
+    # bit N of the bitset is bit (N & 7) of byte N >> 3: an O(1) lookup per id,
+    # where (bits >> N) & 1 copies the whole bitset every time
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def _live_rooms():
+    today = timezone.now().date()
+    return Room.objects.alive().filter(Q(paid_until__isnull=True) | Q(paid_until__gte=today))
+
+
+class RoomFacetIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rebuilding = False
+        self._clear()
+
+    def _clear(self):
+        self.generation = None
+        self.built_at = 0.0
+        self.rows = {}
+        self.term_bits = {}
+        self.all_bits = 0
+        self.sorted = {field: [] for field in _SORTED_FIELDS}
+        # only rooms that can still expire; checked against today per query
+        self.paid_until = []
+        self._slice_bits_cache = {}
+
+    # --------------------
+    # maintenance
+    # --------------------
+    def _add(self, row):
+        room_id = row["id"]
+        bit = 1 << room_id
+        self.rows[room_id] = row
+        self.all_bits |= bit
+        for field in ROOM_TERM_FIELDS:
+            key = (field, row[field])
+            self.term_bits[key] = self.term_bits.get(key, 0) | bit
+        for field in _SORTED_FIELDS:
+            insort(self.sorted[field], (row[field], room_id))
+        if row["paid_until"] is not None:
+            insort(self.paid_until, (row["paid_until"], room_id))
+
+    def _remove(self, room_id):
+        row = self.rows.pop(room_id, None)
+        if row is None:
+            return
+        mask = ~(1 << room_id)
+        self.all_bits &= mask
+        for field in ROOM_TERM_FIELDS:
+            key = (field, row[field])
+            self.term_bits[key] &= mask
+        for field in _SORTED_FIELDS:
+            _discard(self.sorted[field], (row[field], room_id))
+        if row["paid_until"] is not None:
+            _discard(self.paid_until, (row["paid_until"], room_id))
+
+    def rebuild(self, generation):
+        # built outside the lock; queries keep the old index until the swap
+        rows, term_ids, paid_until = {}, {}, []
+        sorted_values = {field: [] for field in _SORTED_FIELDS}
+        for row in _live_rooms().values(*_ROW_FIELDS).iterator(chunk_size=2000):
+            room_id = row["id"]
+            rows[room_id] = row
+            for field in ROOM_TERM_FIELDS:
+                term_ids.setdefault((field, row[field]), []).append(room_id)
+            for field in _SORTED_FIELDS:
+                sorted_values[field].append((row[field], room_id))
+            if row["paid_until"] is not None:
+                paid_until.append((row["paid_until"], room_id))
+
+        for values in (*sorted_values.values(), paid_until):
+            values.sort()
+        term_bits = {key: _bits(ids) for key, ids in term_ids.items()}
+        all_bits = _bits(rows)
+
+        with self._lock:
+            self._clear()
+            self.rows = rows
+            self.term_bits = term_bits
+            self.all_bits = all_bits
+            self.sorted = sorted_values
+            self.paid_until = paid_until
+            self.generation = generation
+            self.built_at = time.monotonic()
+
+    def _rebuild_in_background(self, generation):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild(generation)
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        _start_thread(run)
+
+    def apply_changes(self, room_ids, generation):
+        self._slice_bits_cache = {}
+        room_ids = set(room_ids)
+        for room_id in room_ids:
+            self._remove(room_id)
+        for row in _live_rooms().filter(id__in=room_ids).values(*_ROW_FIELDS):
+            self._add(row)
+        self.generation = generation
+
+    def sync(self) -> bool:
+        """
+        Bring the index up to date with the shared change log (see module comment).
+        False while a full rebuild is still running in the background.
+        """
+        current = cache.get(_GENERATION_KEY)
+        with self._lock:
+            max_age = getattr(settings, "ROOM_FACET_INDEX_MAX_AGE_SECONDS", 300)
+            if (
+                current is not None
+                and self.generation is not None
+                and time.monotonic() - self.built_at < max_age
+            ):
+                if current == self.generation:
+                    return True
+                behind = current - self.generation
+                if 0 < behind <= _MAX_REPLAY:
+                    keys = [_change_key(g) for g in range(self.generation + 1, current + 1)]
+                    found = cache.get_many(keys)
+                    if len(found) == len(keys):
+                        self.apply_changes(found.values(), current)
+                        return True
+
+            if current is None:
+                # start from the clock so a re-created counter never matches an old index
+                cache.add(_GENERATION_KEY, time.time_ns() // 1000, None)
+                current = cache.get(_GENERATION_KEY)
+
+        if getattr(settings, "ROOM_FACET_INDEX_BACKGROUND_REBUILD", True):
+            self._rebuild_in_background(current)
+            return False
+        self.rebuild(current)
+        return True
+
+    # --------------------
+    # queries
+    # --------------------
+    def _slice_bits(self, name, values, start, stop):
+        """Bitset of the ids in values[start:stop], reused until the index changes."""
+        key = (name, start, stop)
+        bits = self._slice_bits_cache.get(key)
+        if bits is None:
+            if len(self._slice_bits_cache) >= _MAX_CACHED_BITSETS:
+                self._slice_bits_cache.clear()
+            bits = _bits(room_id for _value, room_id in values[start:stop])
+            self._slice_bits_cache[key] = bits
+        return bits
+
+    def _range_bits(self, field, low, high):
+        values = self.sorted[field]
+        start = 0 if low is None else bisect_left(values, (low, -1))
+        stop = len(values) if high is None else bisect_right(values, (high, float("inf")))
+        return self._slice_bits(field, values, start, stop)
+
+    def _expired_bits(self):
+        today = timezone.now().date()
+        stop = bisect_left(self.paid_until, (today, -1))
+        return self._slice_bits("paid_until", self.paid_until, 0, stop)
+
+    def _matching(self, live, filters, exclude=None):
+        bits = live
+        for field, values in filters["terms"].items():
+            if field == exclude:
+                continue
+            any_of = 0
+            for value in values:
+                any_of |= self.term_bits.get((field, value), 0)
+            bits &= any_of
+        for field, (low, high) in filters["ranges"].items():
+            if field != exclude and bits:
+                bits &= self._range_bits(field, low, high)
+        return bits
+
+    def match(self, filters) -> int:
+        """Bitset of live room ids matching parse_facet_filters() output."""
+        with self._lock:
+            return self._matching(self.all_bits & ~self._expired_bits(), filters)
+
+    def facet_counts(self, filters, facets, price_edges):
+        """
+        Same payload as the SQL path of SearchRoomFacetsView: total matches,
+        per-value counts for each facet field (ignoring that field's own filter)
+        and room counts per price bucket (ignoring the price filter).
+        """
+        with self._lock:
+            live = self.all_bits & ~self._expired_bits()
+            counts = {}
+            for field, values in facets.items():
+                base = self._matching(live, filters, exclude=field)
+                counts[field] = {
+                    value: (base & self.term_bits.get((field, value), 0)).bit_count()
+                    for value in values
+                }
+
+            base = self._matching(live, filters, exclude="price_per_month")
+            prices = self.sorted["price_per_month"]
+            histogram = []
+            for low, high in zip(price_edges, [*price_edges[1:], None]):
+                start = bisect_left(prices, (low, -1))
+                stop = len(prices) if high is None else bisect_left(prices, (high, -1))
+                ids = self._slice_bits("price_per_month", prices, start, stop)
+                histogram.append((base & ids).bit_count())
+
+            return self._matching(live, filters).bit_count(), counts, histogram
+
+    def ordered_ids(self, bits, ordering, start, stop):
+        """Ids of the matching rooms at positions [start, stop) in the given ordering."""
+        field, descending = INDEX_ORDERINGS[ordering]
+        if stop <= start:
+            return []
+        members = _members(bits)
+        size = len(members)
+        with self._lock:
+            values = self.sorted[field]
+            entries = reversed(values) if descending else iter(values)
+            out, seen = [], 0
+            for _value, room_id in entries:
+                byte = room_id >> 3
+                if byte >= size or not (members[byte] >> (room_id & 7)) & 1:
+                    continue
+                if seen >= start:
+                    out.append(room_id)
+                    if len(out) >= stop - start:
+                        break
+                seen += 1
+            return out
+
+
+def _start_thread(target):
+    def run():
+        try:
+            target()
+        finally:
+            # the thread's own connection, never the request's
+            connections.close_all()
+
+    threading.Thread(target=run, name="room-facet-index-rebuild", daemon=True).start()
+
+
+def _discard(values, entry):
+    i = bisect_left(values, entry)
+    if i < len(values) and values[i] == entry:
+        del values[i]
+
+
+room_facet_index = RoomFacetIndex()
+
+
+def get_room_facet_index():
+    """
+    The process-wide index, synced with room changes first.
+    None when disabled, while it is being rebuilt or when the cache is
+    unavailable (callers use SQL).
+    """
+    if not getattr(settings, "ROOM_FACET_INDEX_ENABLED", True):
+        return None
+    try:
+        if not room_facet_index.sync():
+            return None
+    except Exception:
+        return None
+    return room_facet_index
+
+
+def note_rooms_changed(*room_ids) -> None:
+    """Record room changes in the shared log so every process re-reads those rooms."""
+    for room_id in {r for r in room_ids if r}:
+        try:
+            generation = cache.incr(_GENERATION_KEY)
+        except ValueError:
+            # no counter -> every index rebuilds on its next sync anyway
+            return
+        except Exception:
+            return
+        try:
+            cache.set(_change_key(generation), room_id, _CHANGE_TTL)
+        except Exception:
+            # a gap in the log makes readers rebuild
+            pass
+
+
+def invalidate_room_facet_index() -> None:
+    """Force a full rebuild everywhere (bulk updates)."""
+    try:
+        cache.delete(_GENERATION_KEY)
+    except Exception:
+        pass
+
+
+class IndexedRooms:
+    """
+    Sequence over the rooms matching `bits` in `ordering`, for the paginator:
+    len() is a popcount and slicing fetches only that page from SQL.
+    """
+
+    def __init__(self, index, bits, ordering, fetch):
+        self.index = index
+        self.bits = bits
+        self.ordering = ordering
+        self.fetch = fetch
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step not in (None, 1):
+            raise TypeError("IndexedRooms only supports contiguous slices")
+        start = item.start or 0
+        stop = len(self) if item.stop is None else item.stop
+        ids = self.index.ordered_ids(self.bits, self.ordering, start, stop)
+        by_id = {room.id: room for room in self.fetch(ids)}
+        # a room that stopped being live since the last sync is simply skipped
+        return [by_id[room_id] for room_id in ids if room_id in by_id]
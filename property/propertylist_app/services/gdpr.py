@@ -12,6 +12,7 @@ from propertylist_app.models import (
     Room, Review, RoomImage, SavedRoom, MessageThread, Message, MessageRead,
     Booking, AvailabilitySlot, Payment, Report, AuditLog, DataExport, GDPRTombstone
 )
+from propertylist_app.utils.cache import bump_room_audience_versions, bump_user_version
 
 def _safe_media_read(path: str) -> bytes:
     try:
@@ -108,6 +109,23 @@ def perform_erasure(user):
             profile.avatar = None
         profile.save()
 
+    # Per-user cached pages that show this user's rooms, reviews and messages;
+    # collected before the links are dropped, bumped once the erasure commits
+    room_ids = list(Room.objects.filter(property_owner=user).values_list("id", flat=True))
+    other_user_ids = [
+        *Review.objects.filter(reviewer=user).values_list("reviewee_id", flat=True),
+        *Review.objects.filter(reviewee=user).values_list("reviewer_id", flat=True),
+        *MessageThread.participants.through.objects.filter(
+            messagethread__participants=user
+        ).values_list("user_id", flat=True),
+    ]
+
+    def bump_affected_users():
+        bump_room_audience_versions(room_ids)
+        bump_user_version(user.pk, *other_user_ids)
+
+    transaction.on_commit(bump_affected_users)
+
     # Content → anonymise (keep useful marketplace data)
     Room.objects.filter(property_owner=user).update(property_owner=None)
     Review.objects.filter(reviewer=user).update(reviewer=None)
@@ -1,12 +1,21 @@
-
 from __future__ import annotations
 
+import math
+
 from typing import Tuple, Optional
 from django.core.cache import cache
 from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from property.instrumentation import record_cache_lookup
 
 # Reuse your existing helpers from validators (normalizer + raw geocoder + distance)
-from propertylist_app.validators import normalize_uk_postcode, geocode_postcode as _raw_geocode
+from propertylist_app.validators import (
+    normalize_uk_postcode,
+    normalize_uk_outward_code,
+    geocode_postcode as _raw_geocode,
+)
+from propertylist_app.models import PostcodeCentroid
 
 
 CACHE_PREFIX = "geo:postcode:"
@@ -14,24 +23,98 @@ CACHE_PREFIX = "geo:postcode:"
 CACHE_TTL = getattr(settings, "GEO_CACHE_TTL_SECONDS", 60 * 60 * 24 * 7)
 
 
+def lookup_local_centroid(key: str) -> Optional[Tuple[float, float]]:
+    """
+    Offline lookup in PostcodeCentroid (primary key, so one index probe).
+    `key` is a normalised full postcode ("SW1A 1AA") or an outward code ("SW1A").
+    Returns None when the table doesn't have it (or isn't loaded).
+    """
+    row = (
+        PostcodeCentroid.objects.filter(postcode=key)
+        .values_list("latitude", "longitude")
+        .first()
+    )
+    if row is None:
+        return None
+    return float(row[0]), float(row[1])
+
+
 def geocode_postcode_cached(postcode_raw: str) -> Tuple[float, float]:
     """
-    Normalize the UK postcode, then return (lat, lon) using cache.
-    Falls back to your existing validators.geocode_postcode for the actual lookup.
+    Normalize the UK postcode, then return (lat, lon).
+
+    Order:
+      1) cache
+      2) local PostcodeCentroid table (full postcode)
+      3) remote validators.geocode_postcode
+
+    Partial postcodes ("SW1A") are answered from the outward-code centroid.
+    A full postcode the table lacks only falls back to its outward centroid
+    when the remote geocoder is unavailable (never when it says the postcode
+    does not exist), and that approximation is not cached.
     """
     if not postcode_raw:
         raise ValueError("Postcode required")
 
-    normal = normalize_uk_postcode(postcode_raw)
+    try:
+        normal = normalize_uk_postcode(postcode_raw)
+    except ValidationError:
+        # Not a full postcode - maybe just the outward part ("M1", "SW1A")
+        outward = normalize_uk_outward_code(postcode_raw)
+        coords = lookup_local_centroid(outward)
+        if coords is None:
+            raise ValidationError("Postcode not found.")
+        return coords
+
     key = f"{CACHE_PREFIX}{normal}"
 
     cached = cache.get(key)
-    if cached and isinstance(cached, (list, tuple)) and len(cached) == 2:
+    hit = bool(cached) and isinstance(cached, (list, tuple)) and len(cached) == 2
+    record_cache_lookup("geo", hit)
+    if hit:
         return float(cached[0]), float(cached[1])
 
-    # Call the existing function that does the real API hit (kept in validators)
-    lat, lon = _raw_geocode(normal)
+    coords = lookup_local_centroid(normal)
+
+    if coords is None:
+        # Call the existing function that does the real API hit (kept in validators)
+        try:
+            coords = _raw_geocode(normal)
+        except ValidationError as e:
+            if e.code != "geocode_unavailable":
+                raise
+            coords = lookup_local_centroid(normal.split(" ")[0])
+            if coords is None:
+                raise
+            # district centre for now; the full postcode is looked up again next time
+            return coords
+
+    lat, lon = coords
 
     # Cache result
     cache.set(key, (lat, lon), timeout=CACHE_TTL)
     return lat, lon
+
+
+# -----------------------------
+# Grid cells
+# -----------------------------
+def _cell_degrees() -> float:
+    return float(getattr(settings, "GEO_GRID_CELL_DEGREES", 0.1))
+
+
+def grid_cell(lat: float, lon: float) -> str:
+    """Id of the GEO_GRID_CELL_DEGREES lat/lon square containing the point ("row:col")."""
+    size = _cell_degrees()
+    return f"{math.floor(lat / size)}:{math.floor(lon / size)}"
+
+
+def grid_cells_within(lat: float, lon: float, radius_miles: float) -> list[str]:
+    """Every grid cell overlapping the bounding box of a radius around the point."""
+    size = _cell_degrees()
+    dlat = radius_miles / 69.0
+    dlon = radius_miles / max(69.0 * math.cos(math.radians(lat)), 1e-6)
+    rows = range(math.floor((lat - dlat) / size), math.floor((lat + dlat) / size) + 1)
+    cols = range(math.floor((lon - dlon) / size), math.floor((lon + dlon) / size) + 1)
+    return [f"{row}:{col}" for row in rows for col in cols]
+
@@ -0,0 +1,46 @@
+# propertylist_app/services/http.py
+import threading
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:
+    requests = None
+    HTTPAdapter = None
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_pooled_session(name: str, *, pool_maxsize: int = 10):
+    """
+    One keep-alive requests.Session per upstream per process.
+    Reusing it keeps TCP/TLS connections open between calls instead of
+    paying a fresh handshake on every request.
+    """
+    if requests is None:
+        raise RuntimeError("The 'requests' package is required for outbound HTTP")
+
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+    return session
+
+
+def close_pooled_sessions() -> None:
+    """Close and forget every pooled session (their keep-alive connections go with them)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
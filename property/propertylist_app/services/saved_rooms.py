@@ -0,0 +1,71 @@
+# propertylist_app/services/saved_rooms.py
+from django.conf import settings
+from django.core.cache import cache
+
+from property.instrumentation import record_cache_lookup
+
+from propertylist_app.models import SavedRoom
+
+
+_REQUEST_ATTR = "_saved_room_ids"
+
+
+def _saved_ids_key(user_id) -> str:
+    return f"saved_rooms:ids:{user_id}"
+
+
+def get_saved_room_ids(user) -> frozenset:
+    """
+    All room ids the user has saved.
+    Cached per user; save/unsave signals drop the entry (see signals.py).
+    """
+    if not user or not getattr(user, "is_authenticated", False):
+        return frozenset()
+
+    key = _saved_ids_key(user.pk)
+    try:
+        cached = cache.get(key)
+    except Exception:
+        cached = None
+
+    record_cache_lookup("saved_rooms", cached is not None)
+    if cached is not None:
+        return frozenset(cached)
+
+    ids = frozenset(
+        SavedRoom.objects.filter(user_id=user.pk).values_list("room_id", flat=True)
+    )
+
+    ttl = getattr(settings, "SAVED_ROOM_IDS_CACHE_TTL", 300)
+    try:
+        cache.set(key, list(ids), timeout=ttl)
+    except Exception:
+        # Fail open: the set is still correct for this request
+        pass
+
+    return ids
+
+
+def saved_room_ids_for_request(request) -> frozenset:
+    """
+    Same as get_saved_room_ids() but memoised on the request,
+    so every serializer in one request shares a single lookup.
+    """
+    if request is None:
+        return frozenset()
+
+    # DRF Request proxies reads to the Django request; store on the Django one
+    # so views, nested serializers and middleware all see the same set.
+    target = getattr(request, "_request", request)
+    ids = getattr(target, _REQUEST_ATTR, None)
+    if ids is None:
+        ids = get_saved_room_ids(getattr(request, "user", None))
+        setattr(target, _REQUEST_ATTR, ids)
+    return ids
+
+
+def invalidate_saved_room_ids(user_id) -> None:
+    try:
+        cache.delete(_saved_ids_key(user_id))
+    except Exception:
+        return
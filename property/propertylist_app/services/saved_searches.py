@@ -0,0 +1,248 @@
+# propertylist_app/services/saved_searches.py
+import hashlib
+import json
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.http import QueryDict
+
+from notifications.models import NotificationTemplate
+from propertylist_app.api.room_filters import ROOM_TERM_FIELDS, parse_facet_filters
+from propertylist_app.models import Room, SavedSearch, SavedSearchKey, SavedSearchMatch
+from propertylist_app.services.geo import geocode_postcode_cached, grid_cell, grid_cells_within
+from propertylist_app.utils.cache import _canonical_querydict
+from propertylist_app.validators import validate_radius_miles
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# Saved-search alerts
+#
+# When a room goes live it is matched against saved searches through an
+# inverted index (SavedSearchKey). Each saved search stores, for every
+# dimension it constrains, the values it accepts:
+#   cell     - grid cells covered by its postcode radius (services.geo)
+#   band     - SAVED_SEARCH_PRICE_BAND wide price bands its range overlaps
+#   <field>  - accepted values of each facet filter (api/room_filters)
+# A room produces one key per dimension, so a search is a candidate when the
+# number of its keys hit equals its dimension_count. Candidates are then
+# checked exactly with the real search (SearchRoomsView.search_queryset), so
+# the index only has to be a superset.
+# ---------------------------------------------------------------------
+
+MATCH_TEMPLATE_KEY = "saved_search.match"
+
+# query params that change presentation, not which rooms match
+_PAGING_PARAMS = frozenset({"limit", "offset", "start", "cursor", "count", "view", "ordering", "format"})
+
+# a radius covering more cells than this is left unconstrained in the index
+_MAX_CELLS = 400
+
+
+def canonical_search_query(querydict) -> dict:
+    """_canonical_querydict() of a search query string, without paging/presentation params."""
+    return {
+        key: value
+        for key, value in _canonical_querydict(querydict).items()
+        if key not in _PAGING_PARAMS
+    }
+
+
+def search_signature(query: dict) -> str:
+    raw = json.dumps(query, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def query_to_querydict(query: dict) -> QueryDict:
+    qd = QueryDict(mutable=True)
+    for key, value in query.items():
+        qd.setlist(key, value if isinstance(value, list) else [value])
+    return qd
+
+
+def _band_width() -> int:
+    return int(getattr(settings, "SAVED_SEARCH_PRICE_BAND", 100))
+
+
+def _max_band() -> int:
+    return int(getattr(settings, "SAVED_SEARCH_MAX_PRICE", 5000)) // _band_width()
+
+
+def _band(price) -> int:
+    return min(int(Decimal(str(price))) // _band_width(), _max_band())
+
+
+def _key_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _search_dimensions(query: dict) -> dict:
+    """{dimension: {accepted values}} for the dimensions this search constrains."""
+    params = query_to_querydict(query)
+    filters = parse_facet_filters(params)
+    dimensions = {}
+
+    for field, values in filters["terms"].items():
+        dimensions[field] = {_key_value(v) for v in values}
+
+    low, high = filters["ranges"].get("price_per_month", (None, None))
+    if low is not None or high is not None:
+        first = 0 if low is None else _band(max(low, 0))
+        last = _max_band() if high is None else _band(max(high, 0))
+        dimensions["band"] = {str(b) for b in range(first, last + 1)}
+
+    postcode = (params.get("postcode") or "").strip()
+    if postcode:
+        try:
+            radius = validate_radius_miles(params.get("radius_miles", 10), max_miles=500)
+        except Exception:
+            radius = 10
+        try:
+            lat, lon = geocode_postcode_cached(postcode)
+        except Exception:
+            # can't place it: leave location to the exact check
+            lat = lon = None
+        if lat is not None:
+            cells = grid_cells_within(lat, lon, radius)
+            if len(cells) <= _MAX_CELLS:
+                dimensions["cell"] = set(cells)
+
+    return dimensions
+
+
+def room_keys(room) -> list[tuple[str, str]]:
+    """The room's single value on every dimension a saved search can constrain."""
+    keys = [("band", str(_band(room.price_per_month)))]
+    if room.latitude is not None and room.longitude is not None:
+        keys.append(("cell", grid_cell(room.latitude, room.longitude)))
+    for field in ROOM_TERM_FIELDS:
+        keys.append((field, _key_value(getattr(room, field))))
+    return keys
+
+
+def index_saved_search(saved_search: SavedSearch) -> None:
+    """(Re)write the saved search's inverted-index rows."""
+    dimensions = _search_dimensions(saved_search.query)
+    with transaction.atomic():
+        SavedSearchKey.objects.filter(saved_search=saved_search).delete()
+        SavedSearchKey.objects.bulk_create(
+            SavedSearchKey(saved_search=saved_search, dimension=dimension, value=value)
+            for dimension, values in dimensions.items()
+            for value in values
+        )
+        saved_search.dimension_count = len(dimensions)
+        saved_search.save(update_fields=["dimension_count"])
+
+
+def candidate_saved_searches(room):
+    """Active saved searches whose every indexed constraint accepts the room."""
+    hit_filter = Q()
+    for dimension, value in room_keys(room):
+        hit_filter |= Q(dimension=dimension, value=value)
+
+    hits = (
+        SavedSearchKey.objects.filter(hit_filter)
+        .values("saved_search_id", "saved_search__dimension_count")
+        .annotate(hits=Count("id"))
+    )
+    ids = [row["saved_search_id"] for row in hits if row["hits"] == row["saved_search__dimension_count"]]
+
+    return (
+        SavedSearch.objects.filter(is_active=True)
+        .filter(Q(dimension_count=0) | Q(pk__in=ids))
+        .exclude(user_id=room.property_owner_id)
+        .select_related("user", "user__profile")
+    )
+
+
+def _matches_exactly(saved_search, room) -> bool:
+    # imported here: api.views imports this module's callers
+    from propertylist_app.api.views.public import SearchRoomsView
+
+    try:
+        qs = SearchRoomsView().search_queryset(
+            query_to_querydict(saved_search.query),
+            base=Room.objects.filter(pk=room.pk),
+        )
+        return qs.exists()
+    except Exception:
+        logger.warning("saved search %s could not be evaluated", saved_search.pk, exc_info=True)
+        return False
+
+
+def notify_saved_search_matches(room_id: int) -> int:
+    """
+    Match a room that just went live against saved searches and queue one
+    OutboundNotification per user with a (new) match. Returns users notified.
+
+    A match is only alerted by the call whose insert created its
+    SavedSearchMatch row, so concurrent runs for one room never alert twice.
+    Nothing is recorded while the alert template is inactive.
+    """
+    # imported here: notifications.services is heavier and only needed now
+    from notifications.services import NotificationService
+
+    room = Room.objects.alive().filter(pk=room_id).first()
+    if room is None:
+        return 0
+
+    template_active = NotificationTemplate.objects.filter(
+        key=MATCH_TEMPLATE_KEY,
+        channel=NotificationTemplate.CHANNEL_EMAIL,
+        is_active=True,
+    ).exists()
+    if not template_active:
+        # left unrecorded, so the room is alerted once the template is back
+        return 0
+
+    candidates = list(candidate_saved_searches(room))
+    already = set(
+        SavedSearchMatch.objects.filter(room=room, saved_search__in=candidates).values_list(
+            "saved_search_id", flat=True
+        )
+    )
+    matched = [s for s in candidates if s.pk not in already and _matches_exactly(s, room)]
+
+    notified = 0
+    seen_users = set()
+    for saved_search in matched:
+        user = saved_search.user
+        with transaction.atomic():
+            # the unique (saved_search, room) row decides who alerts: a concurrent
+            # run that inserted it first owns the notification
+            _match, created = SavedSearchMatch.objects.get_or_create(saved_search=saved_search, room=room)
+            if not created or user.pk in seen_users:
+                continue
+            seen_users.add(user.pk)
+
+            profile = getattr(user, "profile", None)
+            if profile is not None and not getattr(profile, "notify_rentout_updates", True):
+                continue
+
+            NotificationService.queue(
+                user,
+                MATCH_TEMPLATE_KEY,
+                {
+                    "saved_search_id": saved_search.pk,
+                    "saved_search_name": saved_search.name,
+                    "room_id": room.pk,
+                    "room_title": room.title,
+                    "next_path": f"/rooms/{room.pk}",
+                },
+            )
+        notified += 1
+    return notified
+
+
+def schedule_saved_search_matching(*room_ids) -> None:
+    """Run the matcher for rooms that went live, once the transaction commits."""
+    from propertylist_app.tasks import task_match_saved_searches
+
+    for room_id in {r for r in room_ids if r}:
+        transaction.on_commit(lambda room_id=room_id: task_match_saved_searches.delay(room_id))
@@ -1,59 +1,147 @@
 # propertylist_app/services/security.py
-from datetime import timedelta
+import hashlib
 
 from django.conf import settings
 from django.core.cache import cache
-from django.utils import timezone
 
-
-def _login_key(ip: str | None, username: str | None) -> str:
-    base = username or ip or "unknown"
-    return f"login_fail::{base.lower()}"
+from propertylist_app.utils.cache import redis_client
+
+
+# ---------------------------------------------------------------------
+# Login lockout
+#
+# One integer counter per username and one per IP, bumped with an atomic
+# INCR (never read-modify-write of a dict), so concurrent failures cannot
+# lose counts. Every failure refreshes the counter's TTL, so a lockout lasts
+# LOGIN_LOCKOUT_SECONDS after the last failure, and idle counters expire.
+#
+# Keys have a fixed size whatever the client sends (usernames are hashed),
+# so memory is bounded by the number of identities seen in one lockout window.
+#
+# Lockout starts AFTER exceeding the limit:
+#   username counter > LOGIN_FAIL_LIMIT
+#   IP counter       > LOGIN_IP_FAIL_LIMIT (credential stuffing across usernames)
+#
+# The IP counter is opt-in (LOGIN_IP_FAIL_LIMIT = 0 turns it off): it locks
+# every username tried from that address, so a shared NAT or office can be
+# locked out as a whole. Addresses come from client_ip(), never from a raw
+# REMOTE_ADDR that behind the TLS proxy is the proxy's own address.
+# ---------------------------------------------------------------------
+
+
+def client_ip(request) -> str:
+    """
+    The address the request came from, as seen by the outermost trusted proxy.
+
+    With TRUSTED_PROXY_COUNT = N, the N-th X-Forwarded-For entry from the
+    right is the one our own proxy appended; anything left of it is client
+    controlled and ignored. Without trusted proxies, REMOTE_ADDR is used.
+    """
+    remote = request.META.get("REMOTE_ADDR", "") or ""
+    proxies = int(getattr(settings, "TRUSTED_PROXY_COUNT", 0) or 0)
+    if proxies <= 0:
+        return remote
+
+    forwarded = [part.strip() for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")]
+    forwarded = [part for part in forwarded if part]
+    if len(forwarded) < proxies:
+        return remote
+    return forwarded[-proxies]
+
+
+def _user_key(username: str) -> str:
+    digest = hashlib.sha256(username.strip().lower().encode("utf-8")).hexdigest()[:32]
+    return f"login_fail:user:{digest}"
+
+
+def _ip_key(ip: str) -> str:
+    return f"login_fail:ip:{ip.strip()[:64]}"
+
+
+def _limits(ip: str | None, username: str | None) -> list[tuple[str, int]]:
+    fail_limit = getattr(settings, "LOGIN_FAIL_LIMIT", 5)
+    ip_fail_limit = getattr(settings, "LOGIN_IP_FAIL_LIMIT", 0)
+
+    limits = []
+    if username:
+        limits.append((_user_key(username), fail_limit))
+    if ip and ip_fail_limit > 0:
+        limits.append((_ip_key(ip), ip_fail_limit))
+    if not limits:
+        limits.append((_user_key("unknown"), fail_limit))
+    return limits
+
+
+def _incr_with_ttl(keys: list[str], ttl: int) -> list[int]:
+    client = redis_client(cache)
+    if client is not None:
+        # one round trip for all keys: INCR + EXPIRE each
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            full = cache.make_and_validate_key(key)
+            pipe.incr(full)
+            pipe.expire(full, ttl)
+        return [int(v) for v in pipe.execute()[0::2]]
+
+    counts = []
+    for key in keys:
+        while True:
+            try:
+                count = cache.incr(key)
+            except ValueError:
+                if cache.add(key, 1, ttl):
+                    count = 1
+                    break
+                # another failure created the counter first: count on top of it
+                continue
+            cache.touch(key, ttl)
+            break
+        counts.append(count)
+    return counts
 
 
 def is_locked_out(ip: str | None, username: str | None) -> bool:
-    key = _login_key(ip, username)
+    """True while the username or the IP is over its failure limit (one get_many)."""
+    limits = _limits(ip, username)
     try:
-        info = cache.get(key)
+        found = cache.get_many([key for key, _ in limits])
     except Exception:
         # Fail open: if cache is down, do not block login
         return False
 
-    if not info:
-        return False
+    return any(int(found.get(key) or 0) > limit for key, limit in limits)
 
-    until = info.get("until")
-    return bool(until and timezone.now() < until)
 
+def register_login_failure(ip: str | None, username: str | None) -> bool:
+    """
+    Count a failed login against the username and the IP.
 
-def register_login_failure(ip: str | None, username: str | None) -> None:
-    key = _login_key(ip, username)
+    Returns True when this failure put either of them over its limit, so the
+    caller does not need a second is_locked_out() round trip.
+    """
+    limits = _limits(ip, username)
+    lockout_seconds = getattr(settings, "LOGIN_LOCKOUT_SECONDS", 900)
 
     try:
-        info = cache.get(key) or {"count": 0, "until": None}
+        counts = _incr_with_ttl([key for key, _ in limits], lockout_seconds)
     except Exception:
         # Fail open: if cache is down, do not crash login
-        return
+        return False
 
-    info["count"] = int(info.get("count", 0)) + 1
+    return any(count > limit for count, (_, limit) in zip(counts, limits))
 
-    fail_limit = getattr(settings, "LOGIN_FAIL_LIMIT", 5)
-    lockout_seconds = getattr(settings, "LOGIN_LOCKOUT_SECONDS", 900)
 
-    # Lockout starts AFTER exceeding the limit
-    if info["count"] > fail_limit:
-        info["until"] = timezone.now() + timedelta(seconds=lockout_seconds)
+def clear_login_failures(ip: str | None, username: str | None) -> None:
+    """
+    Forget the username's failures after a successful login.
 
-    try:
-        cache.set(key, info, timeout=lockout_seconds)
-    except Exception:
-        # Fail open: if cache is down, do not crash login
+    The IP counter is left to expire, so one valid account cannot be used to
+    reset the budget for guessing others from the same address.
+    """
+    if not username:
         return
-
-
-def clear_login_failures(ip: str | None, username: str | None) -> None:
     try:
-        cache.delete(_login_key(ip, username))
+        cache.delete(_user_key(username))
     except Exception:
         # Fail open: if cache is down, do not crash login
         return
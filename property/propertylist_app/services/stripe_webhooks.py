@@ -0,0 +1,227 @@
+# propertylist_app/services/stripe_webhooks.py
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from propertylist_app.models import Notification, Payment, WebhookReceipt
+
+logger = logging.getLogger("rentout.webhooks")
+
+
+# ---------------------------------------------------------------------
+# Stripe webhook consumer
+#
+# stripe_webhook (api/views/payments.py) verifies the signature, stores a
+# WebhookReceipt and answers 200 straight away. The receipts are applied here,
+# by task_process_stripe_webhooks, one object_key at a time:
+#   - oldest event first (event_created, then arrival)
+#   - the receipt is marked processed in the same transaction as its effects
+#   - a failing receipt stops its object's queue (later events wait for it);
+#     task_sweep_stripe_webhooks retries it up to STRIPE_WEBHOOK_MAX_ATTEMPTS,
+#     then it is dead-lettered (marked processed, last_error says so, logged
+#     as an error) and the object's later events go ahead
+#   - events that can never apply (bad metadata) are marked processed with
+#     last_error set, so they don't block the queue
+# ---------------------------------------------------------------------
+
+
+class StripeEventRejected(Exception):
+    """The event can never be applied (missing or mismatched metadata)."""
+
+
+def receipt_object_key(event_id: str, data_obj: dict) -> str:
+    """Events touching the same payment (or Stripe object) share a key and are applied in order."""
+    payment_id = (data_obj.get("metadata") or {}).get("payment_id")
+    if payment_id:
+        return f"payment:{payment_id}"
+    if data_obj.get("id"):
+        return f"object:{data_obj['id']}"
+    return f"event:{event_id}"
+
+
+def event_created_at(created):
+    try:
+        return datetime.fromtimestamp(int(created), tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _checkout_completed(event_id: str, session: dict) -> None:
+    metadata = session.get("metadata") or {}
+    payment_id = metadata.get("payment_id")
+    room_id = metadata.get("room_id")
+    user_id = metadata.get("user_id")
+    payment_intent = session.get("payment_intent")
+
+    if not payment_id:
+        raise StripeEventRejected("Missing payment metadata.")
+
+    try:
+        payment = Payment.objects.select_related("room", "user").get(id=payment_id)
+    except (Payment.DoesNotExist, ValueError):
+        raise StripeEventRejected("Invalid payment metadata.")
+
+    # ensure webhook metadata still matches the payment we are about to update
+    if user_id and str(payment.user_id) != str(user_id):
+        raise StripeEventRejected(
+            f"Webhook metadata user mismatch (metadata {user_id}, payment {payment.user_id})."
+        )
+    if room_id and str(payment.room_id or "") != str(room_id):
+        raise StripeEventRejected(
+            f"Webhook metadata room mismatch (metadata {room_id}, payment {payment.room_id})."
+        )
+
+    updated = (
+        Payment.objects
+        .filter(id=payment.id)
+        .exclude(status="succeeded")
+        .update(
+            status="succeeded",
+            stripe_payment_intent_id=str(payment_intent or ""),
+        )
+    )
+    if updated != 1:
+        return
+
+    logger.info(
+        "stripe_webhook_payment_succeeded event_id=%s payment_id=%s payment_intent=%s",
+        event_id,
+        payment.id,
+        (payment_intent or ""),
+    )
+
+    room = payment.room
+    if room:
+        today = timezone.now().date()
+        base = room.paid_until if (room.paid_until and room.paid_until > today) else today
+        room.paid_until = base + timedelta(days=30)
+        room.save(update_fields=["paid_until"])
+
+    Notification.objects.create(
+        user=payment.user,
+        type="confirmation",
+        title="Payment confirmed",
+        body="Your listing payment was successful.",
+        target_type="payment",
+        target_id=payment.id,
+    )
+
+
+def _checkout_expired(event_id: str, session: dict) -> None:
+    payment_id = (session.get("metadata") or {}).get("payment_id")
+    if not payment_id:
+        return
+
+    updated = Payment.objects.filter(id=payment_id, status="created").update(status="canceled")
+    if updated == 1:
+        logger.info("stripe_webhook_session_expired event_id=%s payment_id=%s", event_id, payment_id)
+
+
+_HANDLERS = {
+    "checkout.session.completed": _checkout_completed,
+    "checkout.session.expired": _checkout_expired,
+}
+
+
+def apply_stripe_receipt(receipt: WebhookReceipt) -> None:
+    """Apply one stored event. Unhandled event types are acknowledged and ignored."""
+    payload = receipt.payload or {}
+    handler = _HANDLERS.get(payload.get("type"))
+    if handler is not None:
+        handler(receipt.event_id, payload.get("object") or {})
+
+
+def _pending(object_key: str):
+    return WebhookReceipt.objects.filter(source="stripe", object_key=object_key, processed=False)
+
+
+def _max_attempts() -> int:
+    return int(getattr(settings, "STRIPE_WEBHOOK_MAX_ATTEMPTS", 8))
+
+
+def _dead_letter(receipt: WebhookReceipt) -> None:
+    logger.error(
+        "stripe_webhook_dead_lettered event_id=%s attempts=%s last_error=%s",
+        receipt.event_id,
+        receipt.attempts,
+        receipt.last_error,
+    )
+    receipt.last_error = f"dead-lettered after {receipt.attempts} attempts: {receipt.last_error}"[:2000]
+    receipt.processed = True
+    receipt.processed_at = timezone.now()
+    receipt.save(update_fields=["processed", "processed_at", "attempts", "last_error"])
+
+
+def process_stripe_receipts(object_key: str) -> int:
+    """
+    Apply the object's unprocessed receipts in order; returns how many were applied.
+
+    The pending rows are locked (SELECT ... FOR UPDATE) for the whole run, so two
+    consumers for the same object serialise and never apply an event twice.
+    """
+    applied = 0
+    if not object_key:
+        return applied
+
+    max_attempts = _max_attempts()
+    with transaction.atomic():
+        receipts = list(
+            _pending(object_key)
+            .select_for_update()
+            .order_by(F("event_created").asc(nulls_last=True), "id")
+        )
+        for receipt in receipts:
+            if receipt.attempts >= max_attempts:
+                # exhausted before this run (e.g. the limit was lowered)
+                _dead_letter(receipt)
+                continue
+            receipt.attempts += 1
+            try:
+                with transaction.atomic():
+                    apply_stripe_receipt(receipt)
+            except StripeEventRejected as exc:
+                logger.warning("stripe_webhook_rejected event_id=%s reason=%s", receipt.event_id, exc)
+                receipt.last_error = str(exc)
+            except Exception as exc:
+                logger.exception("stripe_webhook_processing_failed event_id=%s", receipt.event_id)
+                receipt.last_error = repr(exc)[:2000]
+                if receipt.attempts >= max_attempts:
+                    _dead_letter(receipt)
+                    continue
+                receipt.save(update_fields=["attempts", "last_error"])
+                # later events for this object wait until this one applies
+                break
+
+            receipt.processed = True
+            receipt.processed_at = timezone.now()
+            receipt.save(update_fields=["processed", "processed_at", "attempts", "last_error"])
+            applied += 1
+    return applied
+
+
+def stuck_stripe_object_keys() -> list[str]:
+    """
+    Objects with a receipt left unprocessed for STRIPE_WEBHOOK_STUCK_SECONDS
+    (worker lost, broker down, or an earlier failure) that still has attempts left.
+    Receipts without an object_key predate this queue and are not picked up.
+
+    A receipt reaching STRIPE_WEBHOOK_MAX_ATTEMPTS is dead-lettered by the
+    consumer, so an exhausted head never stays in front of its object's
+    queue; an object whose only pending receipts are exhausted is not swept.
+    """
+    cutoff = timezone.now() - timedelta(seconds=int(getattr(settings, "STRIPE_WEBHOOK_STUCK_SECONDS", 300)))
+    return list(
+        WebhookReceipt.objects.filter(
+            source="stripe",
+            processed=False,
+            received_at__lt=cutoff,
+            attempts__lt=_max_attempts(),
+        )
+        .exclude(object_key="")
+        .values_list("object_key", flat=True)
+        .distinct()
+    )
@@ -0,0 +1,276 @@
+# propertylist_app/services/webhooks.py
+import hashlib
+import json
+import logging
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+
+from propertylist_app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from propertylist_app.services.http import get_pooled_session
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# Outbound webhooks
+#
+# Everything is keyed by destination (scheme://host:port of the URL):
+#   - one pooled keep-alive session per destination (services.http), so
+#     repeat deliveries skip the TCP/TLS handshake
+#   - at most WEBHOOK_MAX_IN_FLIGHT concurrent requests per destination,
+#     across all workers; a busy destination defers instead of tying up
+#     more workers on a slow receiver
+#   - a circuit breaker per destination (services.circuit_breaker); while
+#     it is open deliveries are deferred without touching the network
+#   - optional batching: events enqueued with batch=True within
+#     WEBHOOK_BATCH_WINDOW_SECONDS are posted together as {"events": [...]}
+# Celery tasks (retries, backoff) live in propertylist_app/tasks_webhooks.py.
+# ---------------------------------------------------------------------
+
+
+class WebhookDeliveryError(Exception):
+    """A delivery attempt failed. `retryable` is False for receiver 4xx responses."""
+
+    def __init__(self, message: str, *, retryable: bool = True, retry_after: int | None = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class WebhookDeferred(WebhookDeliveryError):
+    """Not attempted (circuit open or destination busy); try again after `retry_after` seconds."""
+
+
+# receiver statuses that mean "try again later" rather than "this request is wrong"
+_RETRYABLE_STATUSES = frozenset({408, 425, 429})
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def destination_for(url: str) -> str:
+    parts = urlsplit(url)
+    scheme = (parts.scheme or "https").lower()
+    port = parts.port or (443 if scheme == "https" else 80)
+    return f"{scheme}://{(parts.hostname or '').lower()}:{port}"
+
+
+def _max_in_flight() -> int:
+    return max(1, int(_setting("WEBHOOK_MAX_IN_FLIGHT", 4)))
+
+
+def _timeout(read_timeout=None) -> tuple[float, float]:
+    return (
+        float(_setting("WEBHOOK_CONNECT_TIMEOUT", 3)),
+        float(read_timeout or _setting("WEBHOOK_READ_TIMEOUT", 10)),
+    )
+
+
+def destination_breaker(destination: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        f"webhook:{destination}",
+        failure_threshold=int(_setting("WEBHOOK_BREAKER_FAILURES", 5)),
+        reset_timeout=int(_setting("WEBHOOK_BREAKER_RESET_SECONDS", 60)),
+    )
+
+
+@contextmanager
+def _in_flight_slot(destination: str, hold_seconds: int):
+    """
+    Claim one of the destination's WEBHOOK_MAX_IN_FLIGHT slots for the request.
+
+    Slots are cache keys with a TTL just over the request timeout, so a worker
+    killed mid-request cannot leak one. Cache errors do not block delivery.
+    """
+    key = None
+    try:
+        for i in range(_max_in_flight()):
+            if cache.add(f"webhook:{destination}:slot:{i}", 1, timeout=hold_seconds):
+                key = f"webhook:{destination}:slot:{i}"
+                break
+        busy = key is None
+    except Exception:
+        busy = False
+    if busy:
+        raise WebhookDeferred(f"Webhook destination {destination} is busy.", retry_after=5)
+
+    try:
+        yield
+    finally:
+        if key is not None:
+            try:
+                cache.delete(key)
+            except Exception:
+                pass
+
+
+def post_webhook(url: str, body, headers: dict | None = None, *, timeout=None) -> int:
+    """
+    POST one JSON body to a receiver and return the response status.
+    Raises WebhookDeferred / WebhookDeliveryError (see module notes).
+    """
+    destination = destination_for(url)
+    breaker = destination_breaker(destination)
+    try:
+        breaker.before_call()
+    except CircuitOpenError as exc:
+        raise WebhookDeferred(str(exc), retry_after=breaker.reset_timeout)
+
+    hdrs = {"Content-Type": "application/json"}
+    if headers:
+        hdrs.update(headers)
+
+    connect_timeout, read_timeout = _timeout(timeout)
+    session = get_pooled_session(f"webhook:{destination}", pool_maxsize=_max_in_flight())
+
+    with _in_flight_slot(destination, hold_seconds=int(connect_timeout + read_timeout) + 5):
+        try:
+            resp = session.post(
+                url,
+                data=json.dumps(body or {}),
+                headers=hdrs,
+                timeout=(connect_timeout, read_timeout),
+            )
+        except Exception as exc:
+            breaker.record_failure()
+            raise WebhookDeliveryError(f"Webhook to {destination} failed: {exc}") from exc
+
+    status = resp.status_code
+    if status >= 500 or status in _RETRYABLE_STATUSES:
+        breaker.record_failure()
+        retry_after = resp.headers.get("Retry-After", "")
+        raise WebhookDeliveryError(
+            f"Receiver {status}",
+            retry_after=int(retry_after) if retry_after.isdigit() else None,
+        )
+
+    # any other answer, including 4xx, means the receiver is up
+    breaker.record_success()
+    if status >= 400:
+        raise WebhookDeliveryError(f"Receiver {status}: {resp.text[:200]}", retryable=False)
+    return status
+
+
+# ---------------------------------------------------------------------
+# Batching
+#
+# Buffered events live in the cache under a per-(url, headers) key:
+#   <key>:seq      last event number taken (cache.incr, so writers never collide)
+#   <key>:flushed  last event number handed to a delivery
+#   <key>:event:N  the event payloads
+# The first event of a window schedules one flush_webhook_batch task.
+#
+# A writer takes its number before it writes the payload, so a flush can see
+# seq=N without event:N. flushed only moves over events that were read; a
+# missing one is left for the next flush (its writer schedules one), and only
+# given up as lost when a later flush still finds it missing.
+# ---------------------------------------------------------------------
+
+
+def _batch_window() -> int:
+    return int(_setting("WEBHOOK_BATCH_WINDOW_SECONDS", 2))
+
+
+def batch_max_events() -> int:
+    return max(1, int(_setting("WEBHOOK_BATCH_MAX_EVENTS", 100)))
+
+
+def _batch_key(url: str, headers: dict | None) -> str:
+    raw = json.dumps([url, headers or {}], separators=(",", ":"), sort_keys=True)
+    return "webhook:batch:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _batch_ttl() -> int:
+    # outlive a worker backlog; the counters are reset if they ever expire
+    return max(_batch_window() * 10, 3600)
+
+
+def enqueue_webhook(url: str, payload: dict, headers: dict | None = None, *, batch: bool = False) -> None:
+    """
+    Queue an outbound webhook.
+
+    With batch=True (and WEBHOOK_BATCH_WINDOW_SECONDS > 0) the event is buffered
+    and sent with the other events for the same url/headers that arrive within
+    the window, as one {"events": [...]} request.
+    """
+    # imported here: tasks_webhooks imports this module
+    from propertylist_app.tasks_webhooks import deliver_webhook, flush_webhook_batch
+
+    window = _batch_window()
+    if not batch or window <= 0:
+        deliver_webhook.delay(url, payload, headers)
+        return
+
+    key = _batch_key(url, headers)
+    ttl = _batch_ttl()
+    try:
+        cache.add(f"{key}:seq", 0, timeout=ttl)
+        seq = cache.incr(f"{key}:seq")
+        cache.set(f"{key}:event:{seq}", payload, timeout=ttl)
+        first_in_window = cache.add(f"{key}:scheduled", 1, timeout=window * 5)
+    except Exception:
+        logger.warning("webhook batch buffer unavailable; sending %s unbatched", url, exc_info=True)
+        deliver_webhook.delay(url, payload, headers)
+        return
+
+    if first_in_window:
+        flush_webhook_batch.apply_async(args=[url, headers], countdown=window)
+
+
+def take_webhook_batch(url: str, headers: dict | None = None) -> list | None:
+    """
+    Remove and return up to WEBHOOK_BATCH_MAX_EVENTS buffered events, oldest
+    first. Returns None when another worker is flushing the same buffer.
+    """
+    key = _batch_key(url, headers)
+    ttl = _batch_ttl()
+    if not cache.add(f"{key}:flushing", 1, timeout=60):
+        return None
+
+    try:
+        # re-arm scheduling before reading, so an event written meanwhile schedules the next flush
+        cache.delete(f"{key}:scheduled")
+        seq = int(cache.get(f"{key}:seq") or 0)
+        flushed = int(cache.get(f"{key}:flushed") or 0)
+        if flushed > seq:
+            # counter expired and restarted
+            flushed = 0
+
+        upto = min(seq, flushed + batch_max_events())
+        keys = [f"{key}:event:{n}" for n in range(flushed + 1, upto + 1)]
+        found = cache.get_many(keys)
+
+        events, done, seen_missing = [], flushed, []
+        for n, event_key in enumerate(keys, start=flushed + 1):
+            if event_key in found:
+                events.append(found[event_key])
+            elif cache.add(f"{key}:missing:{n}", 1, timeout=ttl):
+                # probably still being written: stop here
+                break
+            else:
+                logger.warning("webhook batch event %s for %s was never written; skipping it", n, url)
+                seen_missing.append(f"{key}:missing:{n}")
+            done = n
+
+        cache.set(f"{key}:flushed", done, timeout=ttl)
+        cache.delete_many(keys[: done - flushed] + seen_missing)
+    finally:
+        cache.delete(f"{key}:flushing")
+
+    return events
+
+
+def webhook_batch_pending(url: str, headers: dict | None = None) -> bool:
+    """True while the buffer holds event numbers no flush has handed on yet."""
+    key = _batch_key(url, headers)
+    found = cache.get_many([f"{key}:seq", f"{key}:flushed"])
+    seq = int(found.get(f"{key}:seq") or 0)
+    flushed = int(found.get(f"{key}:flushed") or 0)
+    if flushed > seq:
+        # counter expired and restarted (see take_webhook_batch)
+        flushed = 0
+    return seq > flushed
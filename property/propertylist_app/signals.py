@@ -3,7 +3,8 @@ from django.dispatch import receiver
 from django.db.models import Avg, Count
 from .models import Message, Notification, MessageThread, Review, Room
 from django.utils import timezone
-from django.db.models.signals import post_save,pre_save
+from django.db.models.signals import post_save,pre_save,m2m_changed
+from django.conf import settings
 from propertylist_app.models import (
     Review,
     Message,
@@ -19,6 +20,12 @@ from propertylist_app.services.reviews import update_room_rating_from_revealed_r
 from django.apps import apps
 
 from propertylist_app.services.deep_links import build_absolute_url
+from propertylist_app.services.saved_rooms import invalidate_saved_room_ids
+from propertylist_app.utils.cache import bump_user_version
+from propertylist_app.services.auth_cache import invalidate_auth_user
+from propertylist_app.services.facet_index import note_rooms_changed
+from propertylist_app.services.saved_searches import schedule_saved_search_matching
+from django.db import transaction
 
 
 
@@ -313,4 +320,155 @@ def tenancy_extension_notifications(sender, instance, created, **kwargs):
             target_id=t.id,
         )
 
-        _maybe_queue(instance.proposed_by, "tenancy.extension.rejected")
\ No newline at end of file
+        _maybe_queue(instance.proposed_by, "tenancy.extension.rejected")
+
+
+
+
+# --------------------
+# Saved rooms: drop the cached per-user id set used for is_saved
+# --------------------
+@receiver(post_save, sender=apps.get_model("propertylist_app", "SavedRoom"))
+def saved_room_saved_invalidate_ids(sender, instance, **kwargs):
+    invalidate_saved_room_ids(instance.user_id)
+    bump_user_version(instance.user_id)
+
+
+@receiver(post_delete, sender=apps.get_model("propertylist_app", "SavedRoom"))
+def saved_room_deleted_invalidate_ids(sender, instance, **kwargs):
+    invalidate_saved_room_ids(instance.user_id)
+    bump_user_version(instance.user_id)
+
+
+# --------------------
+# Per-user response cache (CachedPerUserGETMixin): bump the version of every
+# user whose own pages are built from the changed row.
+# queryset.update()/bulk_create() send no signals; those call sites bump directly
+# (bump_user_version / bump_room_audience_versions). Every bump is repeated on
+# commit, like the facet-index receiver below.
+# --------------------
+def _thread_participant_ids(thread_ids):
+    through = MessageThread.participants.through
+    return list(
+        through.objects.filter(messagethread_id__in=thread_ids).values_list("user_id", flat=True)
+    )
+
+
+def _room_audience_ids(room_id, owner_id):
+    # owner (my listings) + everyone who saved it (saved rooms)
+    SavedRoom = apps.get_model("propertylist_app", "SavedRoom")
+    saver_ids = SavedRoom.objects.filter(room_id=room_id).values_list("user_id", flat=True)
+    return [owner_id, *saver_ids]
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def message_changed_bump_user_cache(sender, instance, **kwargs):
+    bump_user_version(*_thread_participant_ids([instance.thread_id]))
+
+
+@receiver(post_save, sender=apps.get_model("propertylist_app", "MessageRead"))
+@receiver(post_save, sender=apps.get_model("propertylist_app", "MessageThreadState"))
+@receiver(post_delete, sender=apps.get_model("propertylist_app", "MessageThreadState"))
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+@receiver(post_save, sender=UserProfile)
+def user_row_changed_bump_user_cache(sender, instance, **kwargs):
+    bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed_bump_user_cache(sender, instance, **kwargs):
+    bump_user_version(instance.pk)
+
+
+# --------------------
+# Cached auth user (CachedJWTAuthentication): deactivation, password change
+# and profile edits all go through these saves; logout bumps in LogoutView.
+# invalidate_auth_user() bumps now and again on commit.
+# --------------------
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed_invalidate_auth_user(sender, instance, **kwargs):
+    invalidate_auth_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def profile_changed_invalidate_auth_user(sender, instance, **kwargs):
+    invalidate_auth_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=MessageThread.participants.through)
+def thread_participants_changed_bump_user_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    thread_ids = list(pk_set or []) if reverse else [instance.pk]
+    user_ids = [instance.pk] if reverse else list(pk_set or [])
+    bump_user_version(*user_ids, *_thread_participant_ids(thread_ids))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed_bump_user_cache(sender, instance, **kwargs):
+    bump_user_version(instance.reviewer_id, instance.reviewee_id)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def room_changed_bump_user_cache(sender, instance, **kwargs):
+    bump_user_version(*_room_audience_ids(instance.pk, instance.property_owner_id))
+
+
+@receiver(post_save, sender=apps.get_model("propertylist_app", "RoomImage"))
+@receiver(post_delete, sender=apps.get_model("propertylist_app", "RoomImage"))
+def room_image_changed_bump_user_cache(sender, instance, **kwargs):
+    owner_id = Room.objects.filter(pk=instance.room_id).values_list("property_owner_id", flat=True).first()
+    bump_user_version(*_room_audience_ids(instance.room_id, owner_id))
+
+
+# --------------------
+# Room facet index (services/facet_index.py): log the change now for this
+# process, and again on commit so other processes that re-read the room
+# before the commit see its final state.
+# --------------------
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def room_changed_update_facet_index(sender, instance, **kwargs):
+    room_id = instance.pk
+    note_rooms_changed(room_id)
+    transaction.on_commit(lambda: note_rooms_changed(room_id))
+
+
+# --------------------
+# Saved-search alerts (services/saved_searches.py): match a room against
+# saved searches when it goes live (created live, approved, un-hidden,
+# restored, renewed). The stored liveness is read just before a save that can
+# change it, so loading rooms (lists, cards) costs nothing extra.
+# --------------------
+_LIVENESS_FIELDS = ("status", "is_deleted", "paid_until")
+
+
+@receiver(pre_save, sender=Room)
+def room_remember_liveness(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._was_live = None
+    if raw:
+        return
+    if instance._state.adding or instance.pk is None:
+        instance._was_live = False
+        return
+    if update_fields is not None and not set(update_fields) & set(_LIVENESS_FIELDS):
+        return
+    stored = Room.objects.filter(pk=instance.pk).only(*_LIVENESS_FIELDS).first()
+    instance._was_live = bool(stored and stored.is_live)
+
+
+@receiver(post_save, sender=Room)
+def room_went_live_match_saved_searches(sender, instance, **kwargs):
+    was_live = getattr(instance, "_was_live", None)
+    if was_live is None:
+        return
+    is_live = instance.is_live
+    instance._was_live = is_live
+    if is_live and not was_live:
+        schedule_saved_search_matching(instance.pk)
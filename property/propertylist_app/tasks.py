@@ -7,7 +7,10 @@ from django.conf import settings
 
 from notifications.models import NotificationTemplate, OutboundNotification
 from propertylist_app.services.deep_links import build_absolute_url
+from propertylist_app.services.auth_cache import invalidate_auth_user
+from propertylist_app.utils.cache import bump_room_audience_versions, bump_user_version
 from propertylist_app.models import UserProfile, Room, Review
+from propertylist_app.services.stripe_webhooks import process_stripe_receipts, stuck_stripe_object_keys
 from propertylist_app.services.tasks import (
     send_new_message_email,
     expire_paid_listings,
@@ -55,6 +58,30 @@ def task_expire_paid_listings() -> int:
     return expire_paid_listings()
 
 
+@shared_task(name="propertylist_app.match_saved_searches")
+def task_match_saved_searches(room_id: int) -> int:
+    # imported here: the matcher pulls in the search view
+    from propertylist_app.services.saved_searches import notify_saved_search_matches
+
+    return notify_saved_search_matches(room_id)
+
+
+# -------------------------------------------------------------------
+# Stripe webhooks (services/stripe_webhooks.py)
+# -------------------------------------------------------------------
+@shared_task(name="propertylist_app.process_stripe_webhooks")
+def task_process_stripe_webhooks(object_key: str) -> int:
+    return process_stripe_receipts(object_key)
+
+
+@shared_task(name="propertylist_app.sweep_stripe_webhooks")
+def task_sweep_stripe_webhooks() -> int:
+    keys = stuck_stripe_object_keys()
+    for object_key in keys:
+        task_process_stripe_webhooks.delay(object_key)
+    return len(keys)
+
+
 # -------------------------------------------------------------------
 # Account deletion
 # -------------------------------------------------------------------
@@ -274,6 +301,8 @@ def _refresh_user_ratings_for_user_ids(user_ids):
             avg_landlord_rating=float(landlord_agg["avg"] or 0.0),
             number_landlord_ratings=int(landlord_agg["cnt"] or 0),
         )
+        # queryset.update() sends no post_save
+        invalidate_auth_user(user_id)
 
 
 
@@ -447,8 +476,14 @@ def task_tenancy_prompts_sweep() -> int:
         reveal_at__lte=now,
     )
 
+    # both sides' profile pages show revealed reviews; read them before the update
+    revealed_user_ids = set()
+    for reviewer_id, reviewee_id in to_reveal.values_list("reviewer_id", "reviewee_id"):
+        revealed_user_ids.update((reviewer_id, reviewee_id))
+
     revealed_count = to_reveal.update(active=True)
     if revealed_count:
+        bump_user_version(*revealed_user_ids)
         # refresh tenant ratings for tenants affected by newly revealed landlord->tenant reviews
         affected_tenant_ids = (
             Review.objects.filter(
@@ -505,6 +540,8 @@ def task_tenancy_prompts_sweep() -> int:
                 number_rating=cnt_val,
             )
 
+        bump_room_audience_versions(room_ids)
+
     return count
 
 # -------------------------------------------------------------------
@@ -1,40 +1,100 @@
 # property/propertylist_app/tasks_webhooks.py
-import json
+import logging
+import random
+import time
+
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 
-try:
-    import requests
-except Exception:
-    requests = None
-
-@shared_task(
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
-    retry_backoff_max=600,
-    retry_jitter=True,
-    max_retries=7,
+from propertylist_app.services.webhooks import (
+    WebhookDeferred,
+    WebhookDeliveryError,
+    batch_max_events,
+    post_webhook,
+    take_webhook_batch,
+    webhook_batch_pending,
 )
-def deliver_webhook(self, url: str, payload: dict, headers: dict | None = None, timeout: int = 10):
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_MAX = 600
+MAX_FAILURES = 7
+
+
+def _retry_countdown(failures: int, exc: WebhookDeliveryError) -> int:
+    if exc.retry_after:
+        return min(int(exc.retry_after), RETRY_BACKOFF_MAX)
+    # exponential backoff with full jitter
+    return random.randint(1, min(2 ** (failures + 1), RETRY_BACKOFF_MAX))
+
+
+@shared_task(bind=True, max_retries=None)
+def deliver_webhook(
+    self,
+    url: str,
+    payload: dict,
+    headers: dict | None = None,
+    timeout: int | None = None,
+    failures: int = 0,
+    first_attempt_at: float | None = None,
+):
     """
-    Deliver an outbound webhook with exponential backoff on failure.
+    Deliver one outbound webhook (services/webhooks.post_webhook).
     Route: 'webhooks' queue (see settings.py CELERY_TASK_ROUTES).
+
+    - 5xx / timeouts / 408 / 429: retried with exponential backoff, up to
+      MAX_FAILURES failed attempts.
+    - circuit open or destination busy: retried after the deferral, no request
+      made. Deferrals don't count as failures, so a saturated destination
+      delays events; once WEBHOOK_DEFER_MAX_SECONDS have passed since the
+      first attempt the event is dead-lettered (logged, task fails) so a
+      destination that stays down cannot keep the queue growing.
+    - other 4xx: not retried.
     """
-    if requests is None:
-        raise RuntimeError("The 'requests' package is required to deliver webhooks")
+    if first_attempt_at is None:
+        first_attempt_at = time.time()
+    try:
+        status = post_webhook(url, payload, headers, timeout=timeout)
+    except WebhookDeliveryError as exc:
+        if not exc.retryable:
+            logger.warning("webhook to %s rejected: %s", url, exc)
+            raise
+        if isinstance(exc, WebhookDeferred):
+            deferred_for = time.time() - first_attempt_at
+            if deferred_for >= getattr(settings, "WEBHOOK_DEFER_MAX_SECONDS", 6 * 60 * 60):
+                logger.error(
+                    "webhook to %s dead-lettered after %ss of deferrals: %s", url, int(deferred_for), exc,
+                    extra={"webhook_url": url, "webhook_payload": payload},
+                )
+                raise
+        else:
+            failures += 1
+            logger.info("webhook to %s failed (attempt %s): %s", url, failures, exc)
+            if failures >= MAX_FAILURES:
+                raise
+        raise self.retry(
+            exc=exc,
+            countdown=_retry_countdown(failures, exc),
+            kwargs={**(self.request.kwargs or {}), "failures": failures, "first_attempt_at": first_attempt_at},
+        )
 
-    hdrs = {"Content-Type": "application/json"}
-    if headers:
-        hdrs.update(headers)
+    return {"delivered": True, "status": status, "at": timezone.now().isoformat()}
 
-    resp = requests.post(url, data=json.dumps(payload or {}), headers=hdrs, timeout=timeout)
 
-    if resp.status_code >= 500:
-        # transient error → retry
-        raise RuntimeError(f"Receiver 5xx: {resp.status_code}")
-    if resp.status_code >= 400:
-        # client error → fail (still counts toward retries due to autoretry_for)
-        raise RuntimeError(f"Receiver 4xx: {resp.status_code} {resp.text[:200]}")
+@shared_task(bind=True, max_retries=10)
+def flush_webhook_batch(self, url: str, headers: dict | None = None):
+    """Hand the events buffered by enqueue_webhook(batch=True) to one deliver_webhook."""
+    events = take_webhook_batch(url, headers)
+    if events is None:
+        # another worker is flushing this buffer
+        raise self.retry(countdown=1)
 
-    return {"delivered": True, "status": resp.status_code, "at": timezone.now().isoformat()}
+    if events:
+        deliver_webhook.delay(url, {"events": events}, headers)
+    if webhook_batch_pending(url, headers):
+        # more than one batch buffered (flush the rest straight away), or an
+        # event still being written (give its writer a moment)
+        countdown = 0 if len(events) >= batch_max_events() else 1
+        flush_webhook_batch.apply_async(args=[url, headers], countdown=countdown)
+    return {"events": len(events)}
@@ -0,0 +1,139 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from propertylist_app.api.authentication import CachedJWTAuthentication
+from propertylist_app.models import UserProfile
+from propertylist_app.services import auth_cache
+from propertylist_app.services.auth_cache import get_auth_user
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _jwt_client(user):
+    refresh = RefreshToken.for_user(user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    return client, refresh
+
+
+def _user_queries(captured):
+    return [q["sql"] for q in captured.captured_queries if 'FROM "auth_user"' in q["sql"]]
+
+
+def test_default_authentication_class_is_cached():
+    from rest_framework.settings import api_settings
+
+    assert CachedJWTAuthentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+
+
+def test_repeat_requests_skip_user_and_profile_queries(user):
+    client, _ = _jwt_client(user)
+    url = reverse("v1:my-notification-preferences")
+    assert client.get(url).status_code == 200
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+    assert _user_queries(ctx) == []
+    assert not [q for q in ctx.captured_queries if "userprofile" in q["sql"]]
+
+
+def test_profile_comes_with_the_user(user):
+    get_auth_user(user.pk)  # warm
+    cached = get_auth_user(user.pk)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert cached.profile.user_id == user.pk
+    assert ctx.captured_queries == []
+
+
+def test_user_without_profile_is_cached_as_none(user):
+    UserProfile.objects.filter(user=user).delete()
+    get_auth_user(user.pk)
+    cached = get_auth_user(user.pk)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert getattr(cached, "profile", None) is None
+    assert ctx.captured_queries == []
+
+
+def test_deactivation_is_seen_immediately(user):
+    client, _ = _jwt_client(user)
+    url = reverse("v1:my-notification-preferences")
+    assert client.get(url).status_code == 200
+
+    user.is_active = False
+    user.save(update_fields=["is_active"])
+    assert client.get(url).status_code == 401
+
+
+def test_password_change_and_profile_edit_invalidate(user):
+    assert get_auth_user(user.pk).check_password("pass12345")
+
+    user.set_password("another-pass-123")
+    user.save(update_fields=["password"])
+    assert get_auth_user(user.pk).check_password("another-pass-123")
+
+    profile = UserProfile.objects.get(user=user)
+    profile.read_receipts_enabled = False
+    profile.save(update_fields=["read_receipts_enabled"])
+    assert get_auth_user(user.pk).profile.read_receipts_enabled is False
+
+
+def test_logout_invalidates(user):
+    client, refresh = _jwt_client(user)
+    get_auth_user(user.pk)  # warm
+
+    r = client.post(reverse("v1:auth-logout"), {"refresh": str(refresh)}, format="json")
+    assert r.status_code == 200
+
+    with CaptureQueriesContext(connection) as ctx:
+        get_auth_user(user.pk)
+    assert len(_user_queries(ctx)) == 1
+
+
+def test_unknown_user_fails_authentication(user):
+    client, _ = _jwt_client(user)
+    user.delete()
+    assert client.get(reverse("v1:my-notification-preferences")).status_code == 401
+
+
+def test_cache_entry_holds_no_password_hash(user):
+    get_auth_user(user.pk)
+    entry = cache.get(auth_cache._entry_key(user.pk))
+    assert "password" not in entry["user"]
+    assert user.password not in str(entry)
+
+    cached = get_auth_user(user.pk)
+    assert cached.username == user.username
+    assert cached.check_password("pass12345")  # loaded on access
+
+
+def test_cached_user_saves_do_not_touch_the_password(user):
+    get_auth_user(user.pk)
+    cached = get_auth_user(user.pk)
+    cached.first_name = "Renamed"
+    cached.save()
+
+    user.refresh_from_db()
+    assert user.first_name == "Renamed"
+    assert user.check_password("pass12345")
+
+
+def test_deactivation_is_invalidated_again_on_commit(user, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        # a request between the save and the commit caches the row it sees
+        get_auth_user(user.pk)
+
+    for callback in callbacks:
+        callback()
+    with CaptureQueriesContext(connection) as ctx:
+        get_auth_user(user.pk)
+    assert len(_user_queries(ctx)) == 1
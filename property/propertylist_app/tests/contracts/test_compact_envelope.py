@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from propertylist_app.models import Message, MessageThread, Payment
+
+pytestmark = pytest.mark.django_db
+
+
+def _thread_with_messages(user, n):
+    thread = MessageThread.objects.create()
+    thread.participants.add(user)
+    for i in range(n):
+        Message.objects.create(thread=thread, sender=user, body=f"message {i}")
+    return thread
+
+
+def _body(resp):
+    if isinstance(resp, StreamingHttpResponse):
+        return b"".join(resp.streaming_content)
+    return resp.content
+
+
+def test_default_envelope_is_unchanged(auth_client, user):
+    thread = _thread_with_messages(user, 3)
+    r = auth_client.get(reverse("v1:thread-messages", args=[thread.id]))
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["results"] == body["data"]
+    assert body["count"] == 3
+    assert body["meta"]["count"] == 3
+    assert "X-Envelope" in r["Vary"]
+
+
+def test_compact_envelope_carries_results_once(auth_client, user):
+    thread = _thread_with_messages(user, 3)
+    r = auth_client.get(reverse("v1:thread-messages", args=[thread.id]), HTTP_X_ENVELOPE="compact")
+
+    assert r.status_code == 200
+    body = r.json()
+    assert set(body) == {"ok", "message", "data", "meta"}
+    assert len(body["data"]) == 3
+    assert body["meta"] == {"count": 3, "next": None, "previous": None}
+
+
+def test_compact_envelope_via_accept_parameter(auth_client, user):
+    Payment.objects.create(user=user, amount=100, currency="GBP", status="completed")
+    r = auth_client.get(
+        reverse("v1:payments-transactions"),
+        HTTP_ACCEPT="application/json; envelope=compact",
+    )
+
+    assert r.status_code == 200
+    body = r.json()
+    # renderer-wrapped DRF pagination: data={count,...,results} -> data=[...] + meta
+    assert isinstance(body["data"], list) and len(body["data"]) == 1
+    assert body["meta"]["count"] == 1
+    assert "results" not in body
+
+
+def test_compact_envelope_for_plain_list(auth_client):
+    r = auth_client.get(reverse("v1:notifications-list"), HTTP_X_ENVELOPE="compact")
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["ok"] is True
+    assert "results" not in body and "count" not in body
+
+
+def test_large_compact_page_is_streamed_with_identical_bytes(auth_client, user, settings):
+    thread = _thread_with_messages(user, 5)
+    url = reverse("v1:thread-messages", args=[thread.id])
+
+    settings.STREAMING_JSON_MIN_ITEMS = 1000
+    buffered = auth_client.get(url, HTTP_X_ENVELOPE="compact")
+    assert not isinstance(buffered, StreamingHttpResponse)
+
+    settings.STREAMING_JSON_MIN_ITEMS = 2
+    streamed = auth_client.get(url, HTTP_X_ENVELOPE="compact")
+    assert isinstance(streamed, StreamingHttpResponse)
+    assert streamed["Content-Type"].startswith("application/json")
+    assert "X-Envelope" in streamed["Vary"]
+
+    content = _body(streamed)
+    assert content == _body(buffered)
+    assert len(json.loads(content)["data"]) == 5
+
+
+def test_full_envelope_is_never_streamed(auth_client, user, settings):
+    settings.STREAMING_JSON_MIN_ITEMS = 1
+    thread = _thread_with_messages(user, 3)
+    r = auth_client.get(reverse("v1:thread-messages", args=[thread.id]))
+
+    assert not isinstance(r, StreamingHttpResponse)
+    assert r.json()["results"]
@@ -0,0 +1,84 @@
+import json
+import re
+
+import pytest
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from propertylist_app.api.views.public import SearchRoomsView
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _indexes_used(qs) -> set[str]:
+    """
+    Names of the indexes the database plans to scan for `qs`.
+
+    Postgres: EXPLAIN (FORMAT JSON) with sequential/bitmap scans disabled, so a
+    tiny test table still shows which index can serve the query. The test runs
+    inside a transaction, so atomic() is a savepoint and releasing it would keep
+    the SET LOCALs; rolling it back restores the planner settings.
+    SQLite: EXPLAIN QUERY PLAN ("... USING [COVERING] INDEX <name>").
+    """
+    if connection.vendor == "postgresql":
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_bitmapscan = off")
+            plan = json.loads(qs.explain(format="json"))
+            transaction.set_rollback(True)
+
+        names = set()
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if "Index Name" in node:
+                names.add(node["Index Name"])
+            nodes.extend(node.get("Plans", []))
+        return names
+
+    if connection.vendor == "sqlite":
+        return set(re.findall(r"USING (?:COVERING )?INDEX (\w+)", qs.explain()))
+
+    pytest.skip(f"no plan inspection for {connection.vendor}")
+
+
+def _assert_uses_index(qs, index_name):
+    used = _indexes_used(qs)
+    assert index_name in used, {"expected": index_name, "used": sorted(used), "sql": str(qs.query)}
+
+
+@pytest.fixture
+def catalogue(room_factory):
+    first = room_factory(title="Live")
+    owner = first.property_owner
+    room_factory(property_owner=owner, title="Hidden", status="hidden")
+    room_factory(property_owner=owner, title="Draft", status="draft")
+    room_factory(property_owner=owner, title="Deleted").soft_delete()
+
+
+@pytest.mark.parametrize(
+    "ordering, index_name",
+    [
+        ("", "room_live_created_idx"),
+        ("newest", "room_live_created_idx"),
+        ("price_asc", "room_live_price_idx"),
+        ("-avg_rating", "room_live_rating_idx"),
+        ("last_updated", "room_live_updated_idx"),
+    ],
+)
+@pytest.mark.parametrize("cards", [False, True])
+def test_search_orderings_scan_the_live_listing_index(catalogue, ordering, index_name, cards):
+    qs = SearchRoomsView().search_queryset(QueryDict(f"ordering={ordering}"), cards=cards)
+    _assert_uses_index(qs[:20], index_name)
+
+
+def test_plan_inspection_leaves_planner_settings_alone(catalogue):
+    if connection.vendor != "postgresql":
+        pytest.skip("SET LOCAL planner settings are Postgres only")
+
+    _indexes_used(SearchRoomsView().search_queryset(QueryDict(""))[:20])
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW enable_seqscan")
+        assert cursor.fetchone() == ("on",)
@@ -0,0 +1,82 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from propertylist_app.models import Message, MessageThread, Report, Room
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _report(reporter, target, target_type):
+    return Report.objects.create(
+        reporter=reporter,
+        target_type=target_type,
+        content_type=ContentType.objects.get_for_model(target),
+        object_id=target.pk,
+        reason="abuse",
+    )
+
+
+def _reports(reporter, room_factory, n, prefix="author"):
+    """n reports each on a room, a message and a user, all owned by different users."""
+    thread = MessageThread.objects.create()
+    for i in range(n):
+        author = User.objects.create_user(username=f"{prefix}{i}", password="pass12345")
+        room = room_factory(property_owner=author, title=f"Room {prefix}{i}")
+        message = Message.objects.create(thread=thread, sender=author, body=f"message {i}")
+        _report(reporter, room, "room")
+        _report(reporter, message, "message")
+        _report(reporter, author, "user")
+
+
+def _list(client):
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get(reverse("v1:moderation-report-list"), {"limit": 50})
+    assert r.status_code == 200, r.content
+    return r.json()["data"]["results"], len(ctx.captured_queries)
+
+
+@pytest.fixture
+def staff_client(api_client):
+    api_client.force_authenticate(User.objects.create_user(username="mod", password="pass12345", is_staff=True))
+    return api_client
+
+
+def test_report_targets_load_in_one_query_per_type(staff_client, user, room_factory):
+    _reports(user, room_factory, 1)
+    _, small = _list(staff_client)
+
+    _reports(user, room_factory, 5, prefix="more")
+
+    results, large = _list(staff_client)
+    assert len(results) == 18
+    assert large == small
+
+
+def test_report_target_summary(staff_client, user, room_factory):
+    _reports(user, room_factory, 1)
+    author = User.objects.get(username="author0")
+    gone = room_factory(property_owner=author, title="Removed")
+    _report(user, gone, "room")
+    Room.objects.filter(pk=gone.pk).delete()
+
+    results, _ = _list(staff_client)
+    targets = {(r["target_type"], r["object_id"]): r["target"] for r in results}
+
+    room = Room.objects.get(title="Room author0")
+    assert targets[("room", room.pk)] == {
+        "id": room.pk,
+        "label": "Room author0",
+        "status": "active",
+        "owner_id": author.pk,
+        "owner_username": "author0",
+    }
+    message = Message.objects.get()
+    assert targets[("message", message.pk)]["label"] == "message 0"
+    assert targets[("message", message.pk)]["owner_username"] == "author0"
+    assert targets[("user", author.pk)]["owner_id"] == author.pk
+    assert targets[("room", gone.pk)] is None
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from notifications.models import NotificationTemplate, OutboundNotification
+from notifications.services import NotificationService
+from notifications.tasks import send_due_notifications
+from propertylist_app.notifications import tasks as notification_tasks
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    NotificationTemplate.objects.create(key="reminder", channel="email", subject="Reminder", body="Hi")
+    return get_user_model().objects.create_user(username="dq", email="dq@example.com", password="x")
+
+
+@pytest.fixture
+def registered(monkeypatch):
+    """Record delay-queue registrations instead of handing them to Celery."""
+    calls = []
+    monkeypatch.setattr(
+        notification_tasks.dispatch_notification,
+        "apply_async",
+        lambda args, eta: calls.append((args[0], eta)),
+    )
+    return calls
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_queued_notification_is_dispatched_when_due(user, mailoutbox, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        n = NotificationService.queue(user=user, template_key="reminder", context={})
+
+    n.refresh_from_db()
+    assert n.status == OutboundNotification.STATUS_SENT
+    assert len(mailoutbox) == 1
+
+    # the minute scan has nothing left to do
+    assert send_due_notifications()["found"] == 0
+    assert len(mailoutbox) == 1
+
+
+def test_future_notification_is_registered_once_at_its_due_time(user, registered, django_capture_on_commit_callbacks):
+    when = timezone.now() + timedelta(minutes=10)
+    with django_capture_on_commit_callbacks(execute=True):
+        n = NotificationService.queue(user=user, template_key="reminder", context={}, scheduled_for=when)
+
+    assert registered == [(n.pk, when)]
+    assert NotificationService.schedule(n) is False
+    assert send_due_notifications()["scheduled"] == 0
+    assert len(registered) == 1
+
+
+def test_scan_leaves_registered_notifications_to_the_dispatcher_until_overdue(user, registered, settings, mailoutbox):
+    settings.NOTIFICATION_DISPATCH_GRACE_SECONDS = 120
+    n = OutboundNotification.objects.create(
+        user=user, channel="email", template_key="reminder", scheduled_for=timezone.now() - timedelta(seconds=30)
+    )
+    assert NotificationService.schedule(n) is True
+
+    assert send_due_notifications()["found"] == 0
+    assert mailoutbox == []
+
+    OutboundNotification.objects.filter(pk=n.pk).update(scheduled_for=timezone.now() - timedelta(minutes=5))
+    n.refresh_from_db()
+    assert NotificationService.schedule(n) is True
+
+    res = send_due_notifications()
+    assert (res["found"], res["sent"]) == (1, 1)
+    assert len(mailoutbox) == 1
+
+    # the dispatcher firing late does not send it again
+    assert notification_tasks.dispatch_notification.apply(args=[n.pk]).get() is None
+    assert len(mailoutbox) == 1
+
+
+def test_scan_registers_notifications_as_they_come_within_the_horizon(user, registered, settings):
+    settings.NOTIFICATION_ETA_HORIZON_SECONDS = 3600
+    far = OutboundNotification.objects.create(
+        user=user, channel="email", template_key="reminder", scheduled_for=timezone.now() + timedelta(hours=3)
+    )
+    assert NotificationService.schedule(far) is False
+    assert send_due_notifications()["scheduled"] == 0
+
+    OutboundNotification.objects.filter(pk=far.pk).update(scheduled_for=timezone.now() + timedelta(minutes=30))
+    assert send_due_notifications()["scheduled"] == 1
+    assert [pk for pk, _ in registered] == [far.pk]
+
+
+def test_unregistered_due_notifications_are_still_delivered(user, mailoutbox):
+    OutboundNotification.objects.create(
+        user=user, channel="email", template_key="reminder", scheduled_for=timezone.now()
+    )
+    res = send_due_notifications()
+    assert (res["found"], res["sent"]) == (1, 1)
+    assert len(mailoutbox) == 1
+
+
+def test_scan_only_schedules_unregistered_rows_in_one_query(user, registered, monkeypatch):
+    soon = timezone.now() + timedelta(minutes=10)
+    known = OutboundNotification.objects.create(user=user, channel="email", template_key="reminder", scheduled_for=soon)
+    lost = OutboundNotification.objects.create(user=user, channel="email", template_key="reminder", scheduled_for=soon)
+    assert NotificationService.schedule(known) is True
+
+    tried = []
+    real_schedule = NotificationService.schedule
+    monkeypatch.setattr(NotificationService, "schedule", staticmethod(lambda n: tried.append(n.pk) or real_schedule(n)))
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert send_due_notifications()["scheduled"] == 1
+    assert tried == [lost.pk]
+    assert len([q for q in ctx.captured_queries if "outboundnotification" in q["sql"]]) == 1
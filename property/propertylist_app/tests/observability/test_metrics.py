@@ -0,0 +1,125 @@
+import re
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import OutboundNotification
+from property.metrics import INDEX_LOCK_KEY, MetricsRegistry, registry
+from propertylist_app.tasks import task_expire_paid_listings
+
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = "scrape-secret"
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    # drop counts left pending by requests in earlier tests
+    registry.flush()
+    cache.clear()
+
+
+def _scrape(client=None):
+    client = client or APIClient()
+    r = client.get("/metrics/", HTTP_AUTHORIZATION=f"Bearer {TOKEN}")
+    assert r.status_code == 200
+    assert r["Content-Type"].startswith("text/plain")
+    return r.content.decode()
+
+
+def _value(text, sample):
+    m = re.search(r"^" + re.escape(sample) + r" (\S+)$", text, re.M)
+    return None if m is None else float(m.group(1))
+
+
+@override_settings(METRICS_AUTH_TOKEN="")
+def test_metrics_endpoint_disabled_without_token():
+    assert APIClient().get("/metrics/").status_code == 404
+
+
+@override_settings(METRICS_AUTH_TOKEN=TOKEN)
+def test_metrics_endpoint_rejects_wrong_token():
+    r = APIClient().get("/metrics/", HTTP_AUTHORIZATION="Bearer nope")
+    assert r.status_code == 401
+
+
+@override_settings(METRICS_AUTH_TOKEN=TOKEN, METRICS_FLUSH_INTERVAL_SECONDS=0)
+def test_request_latency_histogram_per_route():
+    client = APIClient()
+    for _ in range(3):
+        assert client.get(reverse("v1:health")).status_code == 200
+
+    text = _scrape(client)
+    assert "# TYPE http_request_duration_seconds histogram" in text
+
+    labels = 'method="GET",route="v1:health"'
+    assert _value(text, f"http_request_duration_seconds_count{{{labels}}}") == 3
+    assert _value(text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 3
+    assert _value(text, f'http_requests_total{{{labels},status="2xx"}}') == 3
+
+    # buckets are cumulative
+    buckets = [
+        float(v)
+        for v in re.findall(r'^http_request_duration_seconds_bucket\{' + re.escape(labels) + r',le="[^"]+"\} (\S+)$', text, re.M)
+    ]
+    assert buckets == sorted(buckets)
+
+
+@override_settings(METRICS_AUTH_TOKEN=TOKEN, METRICS_FLUSH_INTERVAL_SECONDS=0)
+def test_celery_task_outcome_and_duration():
+    task_expire_paid_listings.delay()
+
+    text = _scrape()
+    name = "propertylist_app.expire_paid_listings"
+    assert _value(text, f'celery_tasks_total{{outcome="success",task="{name}"}}') == 1
+    assert _value(text, f'celery_task_duration_seconds_count{{task="{name}"}}') == 1
+
+
+@override_settings(METRICS_AUTH_TOKEN=TOKEN)
+def test_cache_ratio_and_queue_depth(user):
+    registry.inc("cache_lookups_total", {"cache": "geo", "result": "hit"}, 3)
+    registry.inc("cache_lookups_total", {"cache": "geo", "result": "miss"}, 1)
+
+    now = timezone.now()
+    OutboundNotification.objects.create(user=user, template_key="x", scheduled_for=now - timezone.timedelta(minutes=1))
+    OutboundNotification.objects.create(user=user, template_key="x", scheduled_for=now + timezone.timedelta(hours=1))
+    OutboundNotification.objects.create(
+        user=user, template_key="x", scheduled_for=now, status=OutboundNotification.STATUS_SENT
+    )
+
+    text = _scrape()
+    assert _value(text, 'cache_hit_ratio{cache="geo"}') == 0.75
+    assert _value(text, 'notification_queue_depth{state="due"}') == 1
+    assert _value(text, 'notification_queue_depth{state="scheduled"}') == 1
+
+
+def test_registries_in_separate_processes_merge_through_the_cache():
+    # two registries stand in for two gunicorn workers
+    a, b = MetricsRegistry(), MetricsRegistry()
+    a.observe("http_request_duration_seconds", {"route": "r", "method": "GET"}, 0.02)
+    b.observe("http_request_duration_seconds", {"route": "r", "method": "GET"}, 0.2)
+    a.flush()
+    b.flush()
+
+    snap = a.snapshot()
+    labels = (("method", "GET"), ("route", "r"))
+    assert snap[("http_request_duration_seconds_count", labels)] == 2
+    assert snap[("http_request_duration_seconds_sum", labels)] == 220_000
+
+
+def test_series_skipped_while_the_index_is_locked_are_registered_later():
+    worker = MetricsRegistry()
+    worker.inc("celery_tasks_total", {"task": "rare", "outcome": "retry"})
+    cache.add(INDEX_LOCK_KEY, 1, timeout=5)  # another process is writing the index
+    worker.flush()
+    assert worker.snapshot() == {}
+
+    cache.delete(INDEX_LOCK_KEY)
+    worker.flush()  # nothing pending for the series any more
+    labels = (("outcome", "retry"), ("task", "rare"))
+    assert worker.snapshot() == {("celery_tasks_total", labels): 1}
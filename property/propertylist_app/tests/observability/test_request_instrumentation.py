@@ -0,0 +1,133 @@
+import logging
+import time
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from property.instrumentation import end_request_stats, start_request_stats
+from propertylist_app.api.renderers import EnvelopeJSONRenderer
+from propertylist_app.models import Message, MessageThread
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _timing(response):
+    """Server-Timing header -> {metric: {param: value}}."""
+    out = {}
+    for part in response["Server-Timing"].split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        out[name] = dict(p.split("=", 1) for p in params)
+    return out
+
+
+def test_server_timing_reports_db_and_serialisation():
+    r = APIClient().get(reverse("v1:health"))
+    assert r.status_code == 200
+    assert r["X-Request-ID"]
+
+    timing = _timing(r)
+    assert set(timing) == {"db", "cache", "serialize", "total"}
+    assert int(timing["db"]["desc"].strip('"').split()[0]) >= 1
+    assert float(timing["serialize"]["dur"]) >= 0
+    assert float(timing["total"]["dur"]) >= float(timing["db"]["dur"])
+
+
+def test_cache_hits_and_misses_are_counted(auth_client, room_factory):
+    room_factory()
+    url = reverse("v1:search-rooms")
+
+    # different query strings so cache_page doesn't answer the second one
+    first = _timing(auth_client.get(url, {"limit": 10}))
+    second = _timing(auth_client.get(url, {"limit": 20}))
+
+    # cache_page misses both times; the saved-room id set misses, then hits
+    assert first["cache"]["desc"] == '"0 hits 2 misses"'
+    assert second["cache"]["desc"] == '"1 hits 1 misses"'
+
+
+def test_request_log_has_structured_fields(caplog):
+    with caplog.at_level(logging.INFO, logger="property.request"):
+        APIClient().get(reverse("v1:health"), HTTP_X_REQUEST_ID="req-abc")
+
+    records = [r for r in caplog.records if r.name == "property.request"]
+    assert len(records) == 1
+    rec = records[0]
+    assert rec.request_id == "req-abc"
+    assert rec.status == 200
+    assert rec.db_queries >= 1
+    for field in ("db_ms", "cache_hits", "cache_misses", "serialize_ms", "duration_ms"):
+        assert hasattr(rec, field)
+
+
+@override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_REQUEST_TOP_QUERIES=2)
+def test_slow_request_logs_top_queries(caplog, room_factory):
+    room = room_factory()
+    room_factory(property_owner=room.property_owner, title="Second room")
+
+    with caplog.at_level(logging.INFO, logger="property.request"):
+        APIClient().get(reverse("v1:search-rooms"))
+
+    rec = next(r for r in caplog.records if r.name == "property.request")
+    assert rec.levelno == logging.WARNING
+    assert 1 <= len(rec.top_queries) <= 2
+    ms, sql = rec.top_queries[0]
+    assert "SELECT" in sql.upper()
+    assert rec.top_queries == sorted(rec.top_queries, key=lambda q: q[0], reverse=True)
+
+
+@override_settings(REQUEST_SERVER_TIMING=False)
+def test_server_timing_header_can_be_disabled():
+    r = APIClient().get(reverse("v1:health"))
+    assert "Server-Timing" not in r
+    assert r["X-Response-Time-ms"]
+
+
+class _SlowInner(serializers.Serializer):
+    def to_representation(self, instance):
+        time.sleep(0.05)
+        return {"inner": instance}
+
+
+class _SlowOuter(serializers.Serializer):
+    def to_representation(self, instance):
+        time.sleep(0.05)
+        return {"outer": instance, "nested": _SlowInner(instance).data}
+
+
+def test_serializer_data_counts_as_serialisation_once():
+    stats = start_request_stats()
+    try:
+        _SlowOuter(1).data
+    finally:
+        end_request_stats()
+    # outer and nested sleep 50ms each: counted once, not 150ms
+    assert 100 <= stats.serialize_ms < 150
+
+
+def test_streamed_body_encoding_is_logged_once_sent(auth_client, user, settings, caplog, monkeypatch):
+    settings.STREAMING_JSON_MIN_ITEMS = 2
+    thread = MessageThread.objects.create()
+    thread.participants.add(user)
+    for i in range(3):
+        Message.objects.create(thread=thread, sender=user, body=f"message {i}")
+
+    real_iter_render = EnvelopeJSONRenderer.iter_render
+
+    def slow_iter_render(self, payload, chunk_items=100):
+        for chunk in real_iter_render(self, payload, chunk_items):
+            time.sleep(0.02)
+            yield chunk
+
+    monkeypatch.setattr(EnvelopeJSONRenderer, "iter_render", slow_iter_render)
+
+    with caplog.at_level(logging.INFO, logger="property.request"):
+        r = auth_client.get(reverse("v1:thread-messages", args=[thread.id]), HTTP_X_ENVELOPE="compact")
+        assert not [rec for rec in caplog.records if rec.name == "property.request"]
+        b"".join(r.streaming_content)
+
+    rec = next(rec for rec in caplog.records if rec.name == "property.request")
+    assert rec.serialize_ms >= 60  # three chunks
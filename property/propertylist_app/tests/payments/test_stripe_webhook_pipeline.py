@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from propertylist_app.api import views as api_views
+from propertylist_app.api.views import payments as payments_views
+from propertylist_app.models import Notification, Payment, WebhookReceipt
+from propertylist_app.services import stripe_webhooks
+from propertylist_app.services.stripe_webhooks import process_stripe_receipts
+from propertylist_app.tasks import task_sweep_stripe_webhooks
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def payment(user, room_factory):
+    return Payment.objects.create(
+        user=user, room=room_factory(property_owner=user), amount="1.00", currency="GBP", status="created"
+    )
+
+
+def _event(payment, event_id, event_type="checkout.session.completed", created=1_700_000_000):
+    return {
+        "id": event_id,
+        "type": event_type,
+        "created": created,
+        "data": {"object": {"id": "cs_test_1", "payment_intent": "pi_1", "metadata": {"payment_id": str(payment.id)}}},
+    }
+
+
+def _post(api_client, monkeypatch, event):
+    monkeypatch.setattr(api_views.stripe.Webhook, "construct_event", lambda payload, sig_header, secret: event)
+    r = api_client.post(reverse("v1:stripe-webhook"), data=b"{}", content_type="application/json", HTTP_STRIPE_SIGNATURE="t=1,v1=x")
+    assert r.status_code == 200, r.content
+    return r.json()["data"]
+
+
+@pytest.fixture
+def no_consumer(monkeypatch):
+    """Receipts are stored but not applied (the worker hasn't picked them up yet)."""
+    queued = []
+    monkeypatch.setattr(payments_views.task_process_stripe_webhooks, "delay", queued.append)
+    return queued
+
+
+def test_webhook_stores_the_receipt_and_acknowledges_without_applying(api_client, monkeypatch, payment, no_consumer):
+    data = _post(api_client, monkeypatch, _event(payment, "evt_1"))
+    assert data["detail"] == "accepted"
+    assert no_consumer == [f"payment:{payment.id}"]
+
+    payment.refresh_from_db()
+    assert payment.status == "created"
+    receipt = WebhookReceipt.objects.get(event_id="evt_1")
+    assert (receipt.processed, receipt.object_key) == (False, f"payment:{payment.id}")
+    assert receipt.event_created == datetime(2023, 11, 14, 22, 13, 20, tzinfo=dt_timezone.utc)
+
+    assert process_stripe_receipts(receipt.object_key) == 1
+    payment.refresh_from_db()
+    receipt.refresh_from_db()
+    assert payment.status == "succeeded"
+    assert receipt.processed and receipt.processed_at and receipt.attempts == 1
+    assert Notification.objects.filter(user=payment.user, title="Payment confirmed").count() == 1
+
+    assert _post(api_client, monkeypatch, _event(payment, "evt_1"))["detail"] == "already processed"
+
+
+def test_events_for_one_object_apply_in_event_order(api_client, monkeypatch, payment, no_consumer):
+    seen = []
+    for event_type in ("checkout.session.completed", "checkout.session.expired"):
+        monkeypatch.setitem(stripe_webhooks._HANDLERS, event_type, lambda event_id, obj: seen.append(event_id))
+
+    # delivered out of order
+    _post(api_client, monkeypatch, _event(payment, "evt_late", "checkout.session.expired", created=1_700_000_100))
+    _post(api_client, monkeypatch, _event(payment, "evt_early", created=1_700_000_000))
+
+    assert process_stripe_receipts(f"payment:{payment.id}") == 2
+    assert seen == ["evt_early", "evt_late"]
+
+
+def test_failed_receipt_blocks_its_object_until_the_sweeper_retries(api_client, monkeypatch, settings, payment, no_consumer):
+    failures = []
+
+    def flaky(event_id, obj):
+        if not failures:
+            failures.append(event_id)
+            raise RuntimeError("database hiccup")
+
+    monkeypatch.setitem(stripe_webhooks._HANDLERS, "checkout.session.completed", flaky)
+    _post(api_client, monkeypatch, _event(payment, "evt_a", created=1_700_000_000))
+    _post(api_client, monkeypatch, _event(payment, "evt_b", created=1_700_000_001))
+
+    key = f"payment:{payment.id}"
+    assert process_stripe_receipts(key) == 0
+    a, b = WebhookReceipt.objects.get(event_id="evt_a"), WebhookReceipt.objects.get(event_id="evt_b")
+    assert (a.processed, a.attempts, "hiccup" in a.last_error) == (False, 1, True)
+    assert (b.processed, b.attempts) == (False, 0)
+
+    # not stuck yet
+    assert task_sweep_stripe_webhooks() == 0
+
+    WebhookReceipt.objects.update(received_at=timezone.now() - timedelta(minutes=10))
+    no_consumer.clear()
+    assert task_sweep_stripe_webhooks() == 1
+    assert no_consumer == [key]
+
+    assert process_stripe_receipts(key) == 2
+
+    settings.STRIPE_WEBHOOK_MAX_ATTEMPTS = 1
+    WebhookReceipt.objects.update(processed=False)
+    assert task_sweep_stripe_webhooks() == 0
+
+
+def test_exhausted_receipt_is_dead_lettered_and_unblocks_its_object(api_client, monkeypatch, settings, payment, no_consumer, caplog):
+    settings.STRIPE_WEBHOOK_MAX_ATTEMPTS = 2
+    seen = []
+
+    def broken(event_id, obj):
+        raise RuntimeError("always fails")
+
+    monkeypatch.setitem(stripe_webhooks._HANDLERS, "checkout.session.completed", broken)
+    monkeypatch.setitem(stripe_webhooks._HANDLERS, "checkout.session.expired", lambda event_id, obj: seen.append(event_id))
+    _post(api_client, monkeypatch, _event(payment, "evt_head", created=1_700_000_000))
+    _post(api_client, monkeypatch, _event(payment, "evt_next", "checkout.session.expired", created=1_700_000_001))
+
+    key = f"payment:{payment.id}"
+    assert process_stripe_receipts(key) == 0
+    assert seen == []
+
+    # the sweeper's retry uses the last attempt: the head is dead-lettered, the next event applies
+    assert process_stripe_receipts(key) == 1
+    head = WebhookReceipt.objects.get(event_id="evt_head")
+    assert (head.processed, head.attempts) == (True, 2)
+    assert head.last_error.startswith("dead-lettered after 2 attempts")
+    assert "stripe_webhook_dead_lettered" in caplog.text
+    assert seen == ["evt_next"]
+
+    WebhookReceipt.objects.update(received_at=timezone.now() - timedelta(minutes=10))
+    assert task_sweep_stripe_webhooks() == 0
+
+
+def test_receipt_exhausted_before_the_run_is_not_retried(api_client, monkeypatch, settings, payment, no_consumer):
+    calls = []
+    monkeypatch.setitem(stripe_webhooks._HANDLERS, "checkout.session.completed", lambda event_id, obj: calls.append(event_id))
+    _post(api_client, monkeypatch, _event(payment, "evt_old"))
+    WebhookReceipt.objects.filter(event_id="evt_old").update(attempts=8, last_error="RuntimeError()")
+
+    assert process_stripe_receipts(f"payment:{payment.id}") == 0
+    assert calls == []
+    assert WebhookReceipt.objects.get(event_id="evt_old").processed is True
+
+
+def test_unusable_event_is_acknowledged_and_recorded(api_client, monkeypatch, payment):
+    event = _event(payment, "evt_bad")
+    event["data"]["object"]["metadata"]["user_id"] = str(payment.user_id + 1000)
+
+    assert _post(api_client, monkeypatch, event)["detail"] == "accepted"
+
+    payment.refresh_from_db()
+    receipt = WebhookReceipt.objects.get(event_id="evt_bad")
+    assert payment.status == "created"
+    assert receipt.processed
+    assert "user mismatch" in receipt.last_error
@@ -0,0 +1,63 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from propertylist_app.models import Message, MessageThread, Room, RoomImage
+
+
+pytestmark = pytest.mark.django_db
+
+SMALL = {"rooms": 24, "users": 12, "messages": 60, "messages_per_thread": 5, "photos_per_room": 2}
+
+
+def _run(**options):
+    out = StringIO()
+    call_command("benchmark", stdout=out, **options)
+    return out.getvalue()
+
+
+def test_seed_builds_dataset_with_coordinates_and_photos():
+    _run(seed=True, skip_run=True, **SMALL)
+
+    assert Room.objects.filter(property_owner__username__startswith="bench_").count() == 24
+    assert not Room.objects.filter(latitude__isnull=True).exists()
+    assert RoomImage.objects.filter(status="approved").count() == 48
+    assert MessageThread.objects.count() == 12
+    assert Message.objects.count() == 60
+
+    with pytest.raises(CommandError):
+        _run(seed=True, skip_run=True, **SMALL)
+
+    # --reset clears the previous run so it can be seeded again
+    _run(seed=True, reset=True, skip_run=True, **SMALL)
+    assert Room.objects.count() == 24
+
+
+def test_run_reports_every_scenario_and_saves_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+
+    out = _run(seed=True, iterations=2, warmup=0, dispatch_batch=3, baseline=str(baseline), save_baseline=True, **SMALL)
+
+    saved = json.loads(baseline.read_text())["scenarios"]
+    for name in ("search_keyword", "search_radius", "search_filters", "nearby", "home", "inbox", "threads", "notification_dispatch"):
+        assert name in out
+        assert saved[name]["errors"] == 0
+        assert saved[name]["queries"] > 0
+        assert saved[name]["peak_kb"] > 0
+        assert saved[name]["p50_ms"] <= saved[name]["p95_ms"] <= saved[name]["max_ms"]
+
+
+def test_regression_against_baseline_fails_when_asked(tmp_path):
+    _run(seed=True, skip_run=True, **SMALL)
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"scenarios": {"home": {"p95_ms": 100000, "queries": 0, "peak_kb": 100000}}}))
+
+    with pytest.raises(CommandError, match="regression"):
+        _run(scenarios="home", iterations=1, warmup=0, baseline=str(baseline), fail_on_regression=True)
+
+    # without the flag it only warns
+    out = _run(scenarios="home", iterations=1, warmup=0, baseline=str(baseline))
+    assert "REGRESSION home: queries 0 ->" in out
@@ -0,0 +1,78 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from propertylist_app.api.renderers import EnvelopeJSONRenderer
+from propertylist_app.utils.cache import bump_buster
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_anonymous_hit_serves_cached_bytes_with_etag(room_factory, monkeypatch):
+    room_factory(title="Cached room")
+    client = APIClient()
+    url = reverse("v1:room-list-alt")
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    # a hit must not go through the renderer again
+    def boom(*args, **kwargs):
+        raise AssertionError("re-rendered on a cache hit")
+
+    monkeypatch.setattr(EnvelopeJSONRenderer, "render", boom)
+    second = client.get(url)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second["ETag"] == etag
+    assert second["Content-Type"] == first["Content-Type"]
+
+
+def test_if_none_match_returns_304(room_factory):
+    room_factory()
+    client = APIClient()
+    url = reverse("v1:room-list-alt")
+
+    etag = client.get(url)["ETag"]
+
+    r = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r["ETag"] == etag
+
+    r = client.get(url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+    assert r.status_code == 304
+
+    r = client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+    assert r.status_code == 200
+
+
+def test_changed_data_gets_new_etag(room_factory):
+    room = room_factory(title="Before")
+    client = APIClient()
+    url = reverse("v1:room-list-alt")
+
+    old = client.get(url)["ETag"]
+
+    room.title = "After"
+    room.save()
+    bump_buster()
+
+    r = client.get(url, HTTP_IF_NONE_MATCH=old)
+    assert r.status_code == 200
+    assert r["ETag"] != old
+    assert b"After" in r.content
+
+
+def test_authenticated_requests_bypass_byte_cache(room_factory, user):
+    room_factory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("v1:room-list-alt")
+
+    r = client.get(url)
+    assert r.status_code == 200
+    assert not r.has_header("ETag")
@@ -0,0 +1,137 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from property.query_budget import QueryBudgetExceeded, budget_for_view, fingerprint_sql, query_budget
+from propertylist_app.api.views.messaging import InboxListView, MessageThreadListCreateView
+from propertylist_app.api.views.rooms import RoomAvailabilityPublicView
+from propertylist_app.models import AvailabilitySlot, Booking, Message, MessageRead, MessageThread, Notification
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _inbox_user(threads):
+    me = User.objects.create_user(username="budget_me", password="pass12345")
+    for i in range(threads):
+        other = User.objects.create_user(username=f"budget_o{i}", password="pass12345")
+        thread = MessageThread.objects.create()
+        thread.participants.set([me, other])
+        Message.objects.create(thread=thread, sender=me, body=f"hello {i}")
+        reply = Message.objects.create(thread=thread, sender=other, body=f"reply {i}")
+        if i % 2:
+            MessageRead.objects.create(message=reply, user=me)
+        Notification.objects.create(user=me, title=f"N{i}", body="b")
+    client = APIClient()
+    client.force_authenticate(user=me)
+    return client
+
+
+def test_inbox_and_thread_list_stay_within_budget_for_many_threads():
+    # QUERY_BUDGET_MODE="raise" in test settings: an N+1 would fail these requests
+    client = _inbox_user(threads=12)
+
+    inbox = client.get(reverse("v1:inbox-list"), {"limit": 50})
+    assert inbox.status_code == 200
+
+    r = client.get(reverse("v1:message-threads"), {"limit": 50})
+    assert r.status_code == 200
+    threads = r.json()["data"]
+    assert len(threads) == 12
+    for t in threads:
+        assert t["last_message"]["body"].startswith("reply")
+        assert t["last_message"]["sender"].startswith("budget_o")
+        assert t["label"] is None and t["in_bin"] is False
+    assert sorted(t["unread_count"] for t in threads) == [0] * 6 + [1] * 6
+
+
+def test_public_availability_only_free_is_one_query(room_factory, user):
+    room = room_factory()
+    start = timezone.now() + timedelta(days=1)
+    slots = [
+        AvailabilitySlot.objects.create(room=room, start=start + timedelta(hours=i), end=start + timedelta(hours=i, minutes=30))
+        for i in range(8)
+    ]
+    for slot in slots[:3]:
+        Booking.objects.create(user=user, room=room, slot=slot, start=slot.start, end=slot.end)
+    Booking.objects.create(
+        user=user, room=room, slot=slots[3], start=slots[3].start, end=slots[3].end, canceled_at=timezone.now()
+    )
+
+    url = reverse("v1:room-slots-public", kwargs={"pk": room.pk})
+    body = APIClient().get(url, {"only_free": "1"}).json()
+    results = body["data"]["results"] if isinstance(body["data"], dict) else body["data"]
+
+    assert [s["id"] for s in results] == [s.id for s in slots[3:]]
+    assert all(s["is_full"] is False for s in results)
+
+
+def test_budgets_are_declared_on_list_views():
+    assert budget_for_view(InboxListView.as_view(), "GET") == 8
+    assert budget_for_view(MessageThreadListCreateView.as_view(), "GET") == 10
+    assert budget_for_view(MessageThreadListCreateView.as_view(), "POST") is None
+    assert budget_for_view(RoomAvailabilityPublicView.as_view(), "GET") == 4
+
+
+def test_violation_raises_with_fingerprints_grouped_by_call_site(caplog):
+    client = _inbox_user(threads=3)
+    InboxListView.query_budget = 1
+    try:
+        with caplog.at_level(logging.WARNING, logger="property.query_budget"):
+            with pytest.raises(QueryBudgetExceeded) as exc:
+                client.get(reverse("v1:inbox-list"))
+    finally:
+        InboxListView.query_budget = 8
+
+    assert "GET InboxListView" in str(exc.value)
+    record = next(r for r in caplog.records if r.name == "property.query_budget")
+    assert record.query_budget == 1
+    assert record.queries > 1
+    sites = {g["call_site"] for g in record.query_groups}
+    assert any(site.startswith("propertylist_app/api/views/messaging.py:") for site in sites)
+    assert all("%s" not in g["fingerprint"] for g in record.query_groups)
+
+
+@override_settings(QUERY_BUDGET_MODE="log", QUERY_BUDGET_SAMPLE_RATE=1.0)
+def test_log_mode_only_logs(caplog):
+    client = _inbox_user(threads=2)
+    InboxListView.query_budget = 0
+    try:
+        with caplog.at_level(logging.WARNING, logger="property.query_budget"):
+            r = client.get(reverse("v1:inbox-list"))
+    finally:
+        InboxListView.query_budget = 8
+
+    assert r.status_code == 200
+    assert any(rec.name == "property.query_budget" for rec in caplog.records)
+
+
+@override_settings(QUERY_BUDGET_MODE="log", QUERY_BUDGET_SAMPLE_RATE=0.0)
+def test_unsampled_requests_are_not_checked(caplog):
+    client = _inbox_user(threads=2)
+    InboxListView.query_budget = 0
+    try:
+        with caplog.at_level(logging.WARNING, logger="property.query_budget"):
+            client.get(reverse("v1:inbox-list"))
+    finally:
+        InboxListView.query_budget = 8
+
+    assert not any(rec.name == "property.query_budget" for rec in caplog.records)
+
+
+def test_fingerprint_and_decorator():
+    a = fingerprint_sql('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'bob\' LIMIT 21')
+    b = fingerprint_sql('SELECT *  FROM "t" WHERE "id" IN (%s) AND "name" = \'alice\' LIMIT 5')
+    assert a == b == 'SELECT * FROM "t" WHERE "id" IN (...) AND "name" = ? LIMIT ?'
+
+    @query_budget(2)
+    def view(request):
+        return None
+
+    assert budget_for_view(view, "GET") == 2
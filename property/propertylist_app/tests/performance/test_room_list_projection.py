@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from propertylist_app.api.serializers import ROOM_CARD_FIELDS
+from propertylist_app.models import Room, RoomImage, SavedRoom
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def no_deferred_loads(monkeypatch):
+    """Fail on any deferred-field load (DeferredAttribute -> refresh_from_db)."""
+    original = Model.refresh_from_db
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        if fields:
+            raise AssertionError(f"deferred load of {type(self).__name__}.{list(fields)}")
+        return original(self, using=using, fields=fields, **kwargs)
+
+    monkeypatch.setattr(Model, "refresh_from_db", refresh_from_db)
+
+
+@pytest.fixture
+def rooms(user, room_factory):
+    out = []
+    for i in range(2):
+        room = room_factory(
+            property_owner=user,
+            title=f"Projected room {i}",
+            paid_until=timezone.localdate() + timedelta(days=10),
+            latitude=51.501,
+            longitude=-0.1416,
+        )
+        RoomImage.objects.create(room=room, image=f"room_images/projected{i}.jpg", status="approved")
+        SavedRoom.objects.create(user=user, room=room)
+        out.append(room)
+    return out
+
+
+def _room_select_lists(ctx):
+    """Column lists of the queries that load Room rows."""
+    out = []
+    for q in ctx.captured_queries:
+        columns, _, rest = q["sql"].partition(' FROM "propertylist_app_room"')
+        if rest and '"propertylist_app_room"."title"' in columns:
+            out.append(columns)
+    return out
+
+
+@pytest.mark.parametrize(
+    "url_name, params",
+    [
+        ("search-rooms", {}),
+        ("search-rooms", {"furnished": "false"}),  # facet index path
+        ("search-rooms", {"q": "projected"}),  # SQL path
+        ("api-home", {}),
+        ("my-listings", {}),
+        ("my-saved-rooms", {}),
+    ],
+)
+def test_card_lists_load_only_the_card_projection(auth_client, rooms, no_deferred_loads, url_name, params):
+    with CaptureQueriesContext(connection) as ctx:
+        r = auth_client.get(reverse(f"v1:{url_name}"), {**params, "view": "card"})
+    assert r.status_code == 200, r.content
+
+    selects = _room_select_lists(ctx)
+    assert selects
+    for columns in selects:
+        assert '"propertylist_app_room"."description"' not in columns
+        assert '"propertylist_app_room"."view_available_custom_dates"' not in columns
+        assert '"auth_user"."password"' not in columns
+
+
+def test_card_projection_covers_the_card_fields():
+    concrete = {f.attname for f in Room._meta.concrete_fields}
+    assert set(ROOM_CARD_FIELDS) <= concrete
+    assert len(ROOM_CARD_FIELDS) < len(concrete) / 2
+
+
+def test_full_serializer_and_detail_load_the_full_row(auth_client, rooms, no_deferred_loads):
+    r = auth_client.get(reverse("v1:search-rooms"))
+    assert r.status_code == 200
+    assert "description" in r.json()["results"][0]
+
+    r = auth_client.get(reverse("v1:room-detail", args=[rooms[0].pk]))
+    assert r.status_code == 200
+
+
+def test_deferred_load_guard_fires(rooms, no_deferred_loads):
+    room = Room.objects.only("id").get(pk=rooms[0].pk)
+    with pytest.raises(AssertionError, match="deferred load of Room"):
+        room.description
+    user = User.objects.only("id").get(pk=rooms[0].property_owner_id)
+    with pytest.raises(AssertionError, match="deferred load of User"):
+        user.username
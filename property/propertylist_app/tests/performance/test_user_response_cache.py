@@ -0,0 +1,146 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from propertylist_app.api.renderers import EnvelopeJSONRenderer
+from propertylist_app.models import Message, MessageThread, Notification, SavedRoom
+from propertylist_app.utils.cache import _user_version_key, bump_user_version, get_user_version
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _no_render(monkeypatch):
+    def boom(*args, **kwargs):
+        raise AssertionError("re-rendered on a cache hit")
+
+    monkeypatch.setattr(EnvelopeJSONRenderer, "render", boom)
+
+
+def test_repeat_view_is_served_from_cache(auth_client, user, monkeypatch):
+    Notification.objects.create(user=user, title="Hello")
+    url = reverse("v1:notifications-list")
+
+    first = auth_client.get(url)
+    assert first.status_code == 200
+
+    _no_render(monkeypatch)
+    second = auth_client.get(url)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second["ETag"] == first["ETag"]
+
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+
+def test_new_notification_invalidates(auth_client, user):
+    url = reverse("v1:notifications-list")
+    assert auth_client.get(url).json()["data"] == []
+
+    Notification.objects.create(user=user, title="Fresh")
+    assert [n["title"] for n in auth_client.get(url).json()["data"]] == ["Fresh"]
+
+
+def test_mark_all_read_invalidates(auth_client, user):
+    Notification.objects.create(user=user, title="Unread")
+    url = reverse("v1:notifications-list")
+    assert auth_client.get(url).json()["data"][0]["is_read"] is False
+
+    # queryset.update() path
+    auth_client.post(reverse("v1:notifications-mark-all-read"))
+    assert auth_client.get(url).json()["data"][0]["is_read"] is True
+
+
+def test_entries_are_per_user(api_client, user, user2):
+    Notification.objects.create(user=user, title="For alice")
+    url = reverse("v1:notifications-list")
+
+    api_client.force_authenticate(user=user)
+    assert len(api_client.get(url).json()["data"]) == 1
+
+    other = APIClient()
+    other.force_authenticate(user=user2)
+    assert other.get(url).json()["data"] == []
+
+
+def test_saving_a_room_invalidates_saved_rooms(auth_client, user, room_factory):
+    room = room_factory()
+    url = reverse("v1:my-saved-rooms")
+    assert auth_client.get(url).json()["data"]["results"] == []
+
+    SavedRoom.objects.create(user=user, room=room)
+    assert [r["id"] for r in auth_client.get(url).json()["data"]["results"]] == [room.id]
+
+
+def test_new_message_invalidates_every_participants_thread_list(api_client, user, user2):
+    thread = MessageThread.objects.create()
+    thread.participants.add(user, user2)
+    url = reverse("v1:message-threads")
+
+    api_client.force_authenticate(user=user2)
+    before = api_client.get(url).json()["data"][0]
+
+    Message.objects.create(thread=thread, sender=user, body="new message")
+    after = api_client.get(url).json()["data"][0]
+    assert after != before
+    assert after["last_message"]["body"] == "new message"
+
+
+def test_room_edit_invalidates_owner_listings(api_client, room_factory):
+    room = room_factory(title="Before")
+    api_client.force_authenticate(user=room.property_owner)
+    url = reverse("v1:my-listings")
+    assert api_client.get(url).json()["data"][0]["title"] == "Before"
+
+    room.title = "After"
+    room.save()
+    assert api_client.get(url).json()["data"][0]["title"] == "After"
+
+
+def test_admin_bulk_hide_invalidates_owner_and_saver_pages(admin_client, api_client, user, room_factory):
+    room = room_factory(status="active")
+    SavedRoom.objects.create(user=user, room=room)
+
+    owner = APIClient()
+    owner.force_authenticate(user=room.property_owner)
+    api_client.force_authenticate(user=user)
+    assert owner.get(reverse("v1:my-listings")).json()["data"][0]["status"] == "active"
+    before = api_client.get(reverse("v1:my-saved-rooms")).json()["data"]["results"]
+
+    # queryset.update() path: no post_save
+    r = admin_client.post(
+        reverse("admin:propertylist_app_room_changelist"),
+        {"action": "hide_rooms", "_selected_action": [room.pk]},
+    )
+    assert r.status_code == 302
+
+    assert owner.get(reverse("v1:my-listings")).json()["data"][0]["status"] == "hidden"
+    assert api_client.get(reverse("v1:my-saved-rooms")).json()["data"]["results"] != before
+
+
+def test_evicted_version_never_reuses_old_values(user):
+    first = int(get_user_version(user.pk))
+    bump_user_version(user.pk)
+    assert int(get_user_version(user.pk)) == first + 1
+
+    cache.delete(_user_version_key(user.pk))
+    assert int(get_user_version(user.pk)) > first + 1
+
+
+def test_bump_without_counter_is_a_noop(user):
+    bump_user_version(user.pk, None)
+    assert cache.get(_user_version_key(user.pk)) is None
+
+
+def test_page_cached_before_the_commit_is_dropped_on_commit(auth_client, user, django_capture_on_commit_callbacks):
+    url = reverse("v1:notifications-list")
+    with django_capture_on_commit_callbacks() as callbacks:
+        Notification.objects.create(user=user, title="Pending")
+        # a GET between the signal's bump and the commit caches what it sees
+        auth_client.get(url)
+        before_commit = get_user_version(user.pk)
+
+    for callback in callbacks:
+        callback()
+    assert get_user_version(user.pk) != before_commit
@@ -58,4 +58,120 @@ def test_find_address_returns_empty_list(monkeypatch):
 
     data = resp.json()
     assert data["ok"] is True
-    assert data["data"]["addresses"] == []
\ No newline at end of file
+    assert data["data"]["addresses"] == []
+
+@pytest.mark.django_db
+def test_find_address_caches_per_normalised_postcode_and_404s(monkeypatch):
+    from urllib.error import HTTPError
+
+    client = APIClient()
+    calls = []
+
+    def fake_fetch(postcode):
+        calls.append(postcode)
+        if postcode == "SW1A 2AA":
+            raise HTTPError("https://example.test", 404, "Not Found", {}, None)
+        return [{"id": "addr_1", "label": "1 Test Street"}]
+
+    monkeypatch.setattr(
+        "propertylist_app.api.views.public._fetch_ideal_postcodes_suggestions",
+        fake_fetch,
+    )
+
+    for raw in ("SW1A 1AA", "sw1a1aa", " SW1A  1AA "):
+        resp = client.get("/api/v1/search/find-address/", {"postcode": raw})
+        assert resp.status_code == 200
+        assert resp.json()["data"]["addresses"][0]["id"] == "addr_1"
+
+    for _ in range(2):
+        resp = client.get("/api/v1/search/find-address/", {"postcode": "SW1A 2AA"})
+        assert resp.status_code == 200
+        assert resp.json()["data"]["addresses"] == []
+
+    assert calls == ["SW1A 1AA", "SW1A 2AA"]
+
+
+def test_address_lookup_waits_for_in_flight_call():
+    import threading
+    from django.core.cache import cache
+    from propertylist_app.services.address_lookup import cached_address_suggestions
+
+    # another worker holds the lock for this postcode and is about to fill the cache
+    cache.add("address:lock:M1 1AE", 1, timeout=10)
+    threading.Timer(
+        0.1, lambda: cache.set("address:postcode:M1 1AE", [{"id": "x", "label": "Leader"}])
+    ).start()
+
+    def must_not_fetch(_postcode):
+        raise AssertionError("coalesced caller should not hit the provider")
+
+    assert cached_address_suggestions("M1 1AE", must_not_fetch) == [{"id": "x", "label": "Leader"}]
+
+
+def test_address_lookup_timed_out_follower_does_not_call_upstream(settings):
+    from django.core.cache import cache
+    from propertylist_app.services.address_lookup import (
+        AddressLookupPending,
+        cached_address_suggestions,
+    )
+
+    settings.ADDRESS_LOOKUP_COALESCE_WAIT_SECONDS = 0.1
+    # the leader is still waiting on the provider and never fills the cache in time
+    cache.add("address:lock:M1 1AE", 1, timeout=10)
+
+    def must_not_fetch(_postcode):
+        raise AssertionError("coalesced caller should not hit the provider")
+
+    with pytest.raises(AddressLookupPending):
+        cached_address_suggestions("M1 1AE", must_not_fetch)
+
+
+@pytest.mark.django_db
+def test_find_address_returns_503_while_lookup_in_flight(monkeypatch, settings):
+    from django.core.cache import cache
+
+    client = APIClient()
+    settings.ADDRESS_LOOKUP_COALESCE_WAIT_SECONDS = 0.1
+    cache.add("address:lock:SW1A 1AA", 1, timeout=10)
+
+    def must_not_fetch(_postcode):
+        raise AssertionError("coalesced caller should not hit the provider")
+
+    monkeypatch.setattr(
+        "propertylist_app.api.views.public._fetch_ideal_postcodes_suggestions",
+        must_not_fetch,
+    )
+
+    resp = client.get("/api/v1/search/find-address/", {"postcode": "sw1a1aa"})
+    assert resp.status_code == 503
+    assert resp["Retry-After"] == "1"
+
+
+def test_ideal_postcodes_circuit_opens_after_upstream_failures(monkeypatch, settings):
+    from urllib.error import URLError
+    from propertylist_app.api.views import messaging
+
+    settings.IDEAL_POSTCODES_API_KEY = "test-key"
+    hits = []
+
+    class FakeResponse:
+        status_code = 503
+        reason = "Service Unavailable"
+        headers = {}
+
+    class FakeSession:
+        def get(self, url, **kwargs):
+            hits.append(url)
+            return FakeResponse()
+
+    monkeypatch.setattr(messaging, "get_pooled_session", lambda name: FakeSession())
+
+    for _ in range(5):
+        with pytest.raises(Exception):
+            messaging._fetch_ideal_postcodes_suggestions("SW1A 1AA")
+    assert len(hits) == 5
+
+    # open: fail fast without touching the provider
+    with pytest.raises(URLError):
+        messaging._fetch_ideal_postcodes_suggestions("SW1A 1AA")
+    assert len(hits) == 5
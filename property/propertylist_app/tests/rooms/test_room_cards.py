@@ -0,0 +1,86 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from propertylist_app.api.serializers import RoomCardSerializer
+from propertylist_app.models import Room, RoomImage, SavedRoom
+
+
+pytestmark = pytest.mark.django_db
+
+
+CARD_KEYS = {
+    "id", "title", "price_per_month", "location", "category", "property_owner",
+    "property_type", "number_of_bedrooms", "number_of_bathrooms", "furnished",
+    "bills_included", "available_from", "is_available", "avg_rating", "number_rating",
+    "latitude", "longitude", "created_at", "updated_at", "is_saved", "distance_miles",
+    "owner_name", "owner_avatar", "main_photo", "photo_count", "listing_state",
+}
+
+
+def _live_rooms(room_factory, owner, n=3):
+    rooms = []
+    for i in range(n):
+        room = room_factory(
+            property_owner=owner,
+            title=f"Card room {i}",
+            paid_until=timezone.localdate() + timedelta(days=10),
+        )
+        RoomImage.objects.create(room=room, image=f"room_images/card{i}.jpg", status="approved")
+        rooms.append(room)
+    return rooms
+
+
+def test_search_card_view_returns_compact_preloaded_cards(auth_client, user, user_factory, room_factory):
+    owner = user_factory(username="card_owner", email="card_owner@example.com")
+    rooms = _live_rooms(room_factory, owner)
+    SavedRoom.objects.create(user=user, room=rooms[0])
+
+    # the guard in settings_test turns any per-card query into a failure
+    r = auth_client.get(reverse("v1:search-rooms"), {"view": "card"})
+    assert r.status_code == 200
+
+    results = r.json()["results"]
+    assert len(results) == 3
+    assert set(results[0]) == CARD_KEYS
+
+    by_id = {c["id"]: c for c in results}
+    assert by_id[rooms[0].id]["is_saved"] is True
+    assert by_id[rooms[1].id]["is_saved"] is False
+    assert by_id[rooms[0].id]["main_photo"].startswith("http://testserver/")
+    assert by_id[rooms[0].id]["photo_count"] == 1
+    assert by_id[rooms[0].id]["listing_state"] == "active"
+
+
+def test_card_view_on_home_saved_and_my_listings(auth_client, user, room_factory):
+    rooms = _live_rooms(room_factory, user, n=2)
+    SavedRoom.objects.create(user=user, room=rooms[1])
+
+    home = auth_client.get(reverse("v1:api-home"), {"view": "card"}).json()["data"]
+    assert set(home["latest_rooms"][0]) == CARD_KEYS
+
+    saved = auth_client.get(reverse("v1:my-saved-rooms"), {"view": "card"}).json()["data"]["results"]
+    assert [c["id"] for c in saved] == [rooms[1].id]
+    assert saved[0]["is_saved"] is True
+
+    mine = auth_client.get(reverse("v1:my-listings"), {"view": "card"}).json()["data"]
+    assert {c["id"] for c in mine} == {r.id for r in rooms}
+    assert set(mine[0]) == CARD_KEYS
+
+
+def test_card_guard_fails_when_view_forgets_to_preload(user, room_factory):
+    _live_rooms(room_factory, user, n=1)
+
+    with pytest.raises(AssertionError, match="RoomCardSerializer hit the database"):
+        RoomCardSerializer(Room.objects.all(), many=True).data
+
+
+def test_card_without_prefetched_images_fails_even_without_the_guard(user, room_factory, settings):
+    settings.ROOM_CARD_QUERY_GUARD = False
+    _live_rooms(room_factory, user, n=1)
+    rooms = Room.objects.select_related("category", "property_owner", "property_owner__profile")
+
+    with pytest.raises(ImproperlyConfigured, match="prefetched_approved_images"):
+        RoomCardSerializer(rooms, many=True).data
@@ -0,0 +1,45 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from propertylist_app.models import SavedRoom
+from propertylist_app.services.saved_rooms import get_saved_room_ids
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _saved_room_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "propertylist_app_savedroom" in q["sql"]]
+
+
+def test_search_loads_saved_ids_once_not_per_room(auth_client, user, user_factory, room_factory):
+    landlord = user_factory(username="ids_landlord", email="ids_landlord@example.com")
+    rooms = [room_factory(property_owner=landlord, title=f"Ids room {i}") for i in range(6)]
+    SavedRoom.objects.create(user=user, room=rooms[2])
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = auth_client.get(reverse("v1:search-rooms"))
+    assert r.status_code == 200
+
+    assert len(_saved_room_queries(ctx)) <= 1
+    flags = {item["id"]: item["is_saved"] for item in r.json()["results"]}
+    assert flags[rooms[2].id] is True
+    assert sum(flags.values()) == 1
+
+
+def test_saved_ids_cache_is_dropped_on_save_and_unsave(auth_client, user, room_factory):
+    room = room_factory(title="Cache me")
+    url = reverse("v1:room-detail", kwargs={"pk": room.pk})
+
+    assert room.id not in get_saved_room_ids(user)
+    assert auth_client.get(url).json()["data"]["is_saved"] is False
+
+    auth_client.post(reverse("v1:room-save", kwargs={"pk": room.pk}))
+    assert room.id in get_saved_room_ids(user)
+    assert auth_client.get(url).json()["data"]["is_saved"] is True
+
+    auth_client.delete(reverse("v1:room-save", kwargs={"pk": room.pk}))
+    assert room.id not in get_saved_room_ids(user)
+    assert auth_client.get(url).json()["data"]["is_saved"] is False
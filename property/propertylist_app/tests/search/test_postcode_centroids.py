@@ -0,0 +1,98 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+
+from propertylist_app.models import PostcodeCentroid
+from propertylist_app.services import geo
+
+
+pytestmark = pytest.mark.django_db
+
+
+CSV = """pcds,lat,long,oseast1m
+SW1A 1AA,51.501009,-0.141588,529090
+SW1A 2AA,51.503540,-0.127695,530047
+sw1a2ab,51.503000,-0.128000,530040
+M1 1AE,53.480000,-2.240000,384000
+ZZ9 9ZZ,99.999999,0.000000,
+not a postcode,51.0,-1.0,
+"""
+
+
+@pytest.fixture
+def loaded_centroids(tmp_path):
+    path = tmp_path / "postcodes.csv"
+    path.write_text(CSV, encoding="utf-8")
+    call_command("load_postcode_centroids", str(path))
+
+
+@pytest.fixture
+def no_remote(monkeypatch):
+    def boom(_postcode):
+        raise AssertionError("remote geocoder should not be called")
+
+    monkeypatch.setattr(geo, "_raw_geocode", boom)
+
+
+def test_loader_stores_postcodes_and_outward_centroids(loaded_centroids, tmp_path):
+    assert PostcodeCentroid.objects.filter(is_outward=False).count() == 4
+    sw1a = PostcodeCentroid.objects.get(postcode="SW1A")
+    assert sw1a.is_outward is True
+    assert sw1a.latitude == pytest.approx((51.501009 + 51.503540 + 51.503) / 3)
+
+    # re-running is an upsert, not a duplicate
+    path = tmp_path / "postcodes.csv"
+    call_command("load_postcode_centroids", str(path))
+    assert PostcodeCentroid.objects.filter(is_outward=False).count() == 4
+
+
+def test_geocode_uses_local_table_and_outward_fallback(loaded_centroids, no_remote):
+    assert geo.geocode_postcode_cached("sw1a1aa") == (51.501009, -0.141588)
+
+    # partial postcode -> outward centroid
+    lat, lon = geo.geocode_postcode_cached("M1")
+    assert (lat, lon) == (53.48, -2.24)
+
+
+def test_unknown_full_postcode_in_a_known_district_asks_the_remote(loaded_centroids, monkeypatch):
+    calls = []
+
+    def not_found(postcode):
+        calls.append(postcode)
+        raise ValidationError("Postcode not found.", code="postcode_not_found")
+
+    monkeypatch.setattr(geo, "_raw_geocode", not_found)
+
+    # a typo is not silently placed at the district centre
+    with pytest.raises(ValidationError):
+        geo.geocode_postcode_cached("SW1A 9ZZ")
+    assert calls == ["SW1A 9ZZ"]
+
+
+def test_outward_centroid_only_stands_in_while_the_remote_is_down(loaded_centroids, monkeypatch):
+    def unavailable(postcode):
+        raise ValidationError("Failed to geocode postcode.", code="geocode_unavailable")
+
+    monkeypatch.setattr(geo, "_raw_geocode", unavailable)
+    lat, _lon = geo.geocode_postcode_cached("SW1A 9ZZ")
+    assert lat == pytest.approx(PostcodeCentroid.objects.get(postcode="SW1A").latitude)
+
+    # not cached under the full postcode: the next lookup asks the remote again
+    monkeypatch.setattr(geo, "_raw_geocode", lambda postcode: (51.5, -0.13))
+    assert geo.geocode_postcode_cached("SW1A 9ZZ") == (51.5, -0.13)
+
+
+def test_remote_geocoder_is_last_resort(loaded_centroids, monkeypatch):
+    calls = []
+
+    def fake_remote(postcode):
+        calls.append(postcode)
+        return 55.95, -3.19
+
+    monkeypatch.setattr(geo, "_raw_geocode", fake_remote)
+
+    assert geo.geocode_postcode_cached("EH1 1YZ") == (55.95, -3.19)
+    assert calls == ["EH1 1YZ"]
+
+    with pytest.raises(ValidationError):
+        geo.geocode_postcode_cached("EH1")
@@ -0,0 +1,183 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from propertylist_app.models import Room
+from propertylist_app.services import facet_index
+from propertylist_app.services.facet_index import note_rooms_changed, room_facet_index
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def rooms(room_factory):
+    first = room_factory(title="A", price_per_month="500.00", furnished=True, bathroom_type="private")
+    owner = first.property_owner
+    return [
+        first,
+        room_factory(property_owner=owner, title="B", price_per_month="650.00", property_type="house", pets_allowed="yes"),
+        room_factory(property_owner=owner, title="C", price_per_month="800.00", furnished=True, number_of_bedrooms=3),
+        room_factory(property_owner=owner, title="D", price_per_month="950.00", property_type="studio", room_size="double"),
+        room_factory(property_owner=owner, title="E", price_per_month="700.00", furnished=True, status="hidden"),
+    ]
+
+
+def _ids(client, **params):
+    r = client.get(reverse("v1:search-rooms"), params)
+    assert r.status_code == 200, r.content
+    body = r.json()
+    return body["count"], [row["id"] for row in body["results"]]
+
+
+QUERIES = [
+    {},
+    {"furnished": "true"},
+    {"furnished": "false", "ordering": "price_asc"},
+    {"property_types": ["flat", "house"], "max_price": "900", "ordering": "price_desc"},
+    {"min_price": "600", "rooms_max": "2"},
+    {"bathroom_type": "private", "furnished": "yes"},
+    {"pets_allowed": "no_preference", "room_size": "dont_mind"},
+    {"room_size": "double"},
+    {"limit": "2", "offset": "1", "ordering": "price_asc"},
+]
+
+
+@pytest.mark.parametrize("params", QUERIES)
+def test_index_matches_sql_path(api_client, rooms, settings, params):
+    settings.ROOM_FACET_INDEX_ENABLED = False
+    expected = _ids(api_client, **params)
+
+    settings.ROOM_FACET_INDEX_ENABLED = True
+    cache.clear()  # search responses are cache_page'd
+    assert _ids(api_client, **params) == expected
+
+
+def test_indexed_search_fetches_only_the_page(api_client, rooms):
+    _ids(api_client)  # build the index
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert _ids(api_client, furnished="true", limit="1", ordering="price_asc") == (2, [rooms[0].id])
+    room_queries = [q["sql"] for q in ctx.captured_queries if 'FROM "propertylist_app_room"' in q["sql"]]
+    assert len(room_queries) == 1
+    assert "COUNT(" not in room_queries[0]
+
+
+def test_room_changes_are_applied_incrementally(api_client, rooms, room_factory, monkeypatch):
+    assert _ids(api_client, furnished="true")[0] == 2
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("full rebuild")
+
+    monkeypatch.setattr(room_facet_index, "rebuild", no_rebuild)
+
+    new_room = room_factory(property_owner=rooms[0].property_owner, title="F", furnished=True)
+    rooms[0].soft_delete()
+    rooms[1].furnished = True
+    rooms[1].save()
+
+    count, ids = _ids(api_client, furnished="true", ordering="price_asc")
+    assert count == 3
+    assert set(ids) == {rooms[1].id, rooms[2].id, new_room.id}
+
+
+def test_changes_logged_by_another_process_are_replayed(rooms):
+    room_facet_index.sync()
+    before = room_facet_index.generation
+
+    # another process updated the row and logged it; this process saw no signal
+    Room.objects.filter(pk=rooms[3].pk).update(furnished=True)
+    note_rooms_changed(rooms[3].pk)
+
+    room_facet_index.sync()
+    assert room_facet_index.generation == before + 1
+    filters = {"terms": {"furnished": [True]}, "ranges": {}}
+    assert rooms[3].pk in [
+        rid for rid in room_facet_index.ordered_ids(room_facet_index.match(filters), "-created_at", 0, 10)
+    ]
+
+
+def test_expired_listings_drop_out_without_a_change(rooms):
+    rooms[0].paid_until = timezone.now().date()
+    rooms[0].save()
+    room_facet_index.sync()
+    everything = {"terms": {}, "ranges": {}}
+    assert room_facet_index.match(everything) >> rooms[0].pk & 1
+
+    tomorrow = timezone.now() + timedelta(days=1)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(facet_index.timezone, "now", lambda: tomorrow)
+        assert not room_facet_index.match(everything) >> rooms[0].pk & 1
+
+
+def test_range_bitsets_are_reused_until_the_index_changes(rooms, monkeypatch):
+    room_facet_index.sync()
+    built = []
+    real_bits = facet_index._bits
+    monkeypatch.setattr(facet_index, "_bits", lambda ids: built.append(1) or real_bits(ids))
+
+    cheap = {"terms": {}, "ranges": {"price_per_month": (None, 700)}}
+    first = room_facet_index.match(cheap)
+    assert built and room_facet_index.match(cheap) == first
+    assert len(built) == 2  # the price range and the expired rooms, once each
+
+    Room.objects.filter(pk=rooms[2].pk).update(price_per_month="600.00")
+    note_rooms_changed(rooms[2].pk)
+    room_facet_index.sync()
+    assert room_facet_index.match(cheap) >> rooms[2].pk & 1
+    assert len(built) == 4
+
+
+def test_ordered_ids_pages_through_sparse_matches(rooms):
+    room_facet_index.sync()
+    only = facet_index._bits([rooms[3].pk, rooms[0].pk])
+    assert room_facet_index.ordered_ids(only, "price_per_month", 0, 10) == [rooms[0].pk, rooms[3].pk]
+    assert room_facet_index.ordered_ids(only, "-price_per_month", 1, 2) == [rooms[0].pk]
+    assert room_facet_index.ordered_ids(0, "price_per_month", 0, 10) == []
+
+
+def test_other_filters_use_sql(api_client, rooms, monkeypatch):
+    def boom():
+        raise AssertionError("index used")
+
+    monkeypatch.setattr(facet_index, "get_room_facet_index", boom)
+    monkeypatch.setattr("propertylist_app.api.views.public.get_room_facet_index", boom)
+    assert _ids(api_client, q="natural light", furnished="true")[0] == 2
+    assert _ids(api_client, ordering="last_updated")[0] == 4
+
+
+def test_invalid_filters_are_rejected_like_sql(api_client, rooms):
+    r = api_client.get(reverse("v1:search-rooms"), {"min_price": "cheap"})
+    assert r.status_code == 400
+    assert "min_price" in str(r.json())
+
+
+def test_full_rebuild_runs_in_the_background_and_search_uses_sql_meanwhile(api_client, rooms, settings, monkeypatch):
+    settings.ROOM_FACET_INDEX_BACKGROUND_REBUILD = True
+    started = []
+    monkeypatch.setattr(facet_index, "_start_thread", started.append)
+    facet_index.invalidate_room_facet_index()
+
+    assert facet_index.get_room_facet_index() is None
+    assert _ids(api_client, furnished="true")[0] == 2
+    assert len(started) == 1  # one rebuild however many requests arrive
+
+    started[0]()
+    assert facet_index.get_room_facet_index() is room_facet_index
+    assert len(started) == 1
+    assert _ids(api_client, furnished="true")[0] == 2
+
+
+def test_rebuild_matches_incremental_adds(rooms):
+    room_facet_index.sync()
+    built = (room_facet_index.all_bits, room_facet_index.term_bits, room_facet_index.sorted, room_facet_index.paid_until)
+
+    incremental = facet_index.RoomFacetIndex()
+    for row in facet_index._live_rooms().values(*facet_index._ROW_FIELDS).order_by("?"):
+        incremental._add(row)
+    assert built == (incremental.all_bits, incremental.term_bits, incremental.sorted, incremental.paid_until)
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def rooms(room_factory):
+    first = room_factory(title="A", price_per_month="450.00", furnished=True, bathroom_type="private")
+    owner = first.property_owner
+    return [
+        first,
+        room_factory(property_owner=owner, title="B", price_per_month="600.00", property_type="house"),
+        room_factory(property_owner=owner, title="C", price_per_month="800.00", furnished=True),
+        room_factory(property_owner=owner, title="D", price_per_month="2500.00", property_type="studio"),
+        room_factory(property_owner=owner, title="E", price_per_month="600.00", furnished=True, status="hidden"),
+    ]
+
+
+def _facets(client, params=None):
+    r = client.get(reverse("v1:search-room-facets"), params or {})
+    assert r.status_code == 200, r.content
+    return r.json()["data"]
+
+
+def _counts(data, field):
+    return {item["value"]: item["count"] for item in data["facets"][field]}
+
+
+def _assert_expected(data):
+    # furnished=true only: other facets are counted within furnished rooms,
+    # the furnished facet itself ignores its own selection
+    assert data["count"] == 2
+    assert _counts(data, "furnished") == {True: 2, False: 2}
+    assert _counts(data, "property_type") == {"flat": 2, "house": 0, "studio": 0}
+    assert _counts(data, "bathroom_type") == {"private": 1, "shared": 0}
+    assert [b["count"] for b in data["price_histogram"]] == [1, 0, 1, 0, 0, 0, 0]
+    assert data["price_histogram"][0] == {"min": 0, "max": 500, "count": 1}
+    assert data["price_histogram"][-1]["max"] is None
+
+
+def test_facet_counts_from_the_index(api_client, rooms):
+    _assert_expected(_facets(api_client, {"furnished": "true"}))
+
+
+def test_facet_counts_from_one_sql_query(api_client, rooms, settings):
+    settings.ROOM_FACET_INDEX_ENABLED = False
+    with CaptureQueriesContext(connection) as ctx:
+        data = _facets(api_client, {"furnished": "true"})
+    _assert_expected(data)
+    assert len([q for q in ctx.captured_queries if "propertylist_app_room" in q["sql"]]) == 1
+
+
+def test_non_facet_filters_go_through_search_parsing(api_client, rooms, monkeypatch):
+    def boom():
+        raise AssertionError("index used")
+
+    monkeypatch.setattr("propertylist_app.api.views.public.get_room_facet_index", boom)
+    data = _facets(api_client, {"q": "natural light", "max_price": "1000"})
+    assert data["count"] == 3
+    # the price histogram ignores the price filter itself
+    assert sum(b["count"] for b in data["price_histogram"]) == 4
+
+
+def test_results_are_cached_per_filter_set(api_client, rooms, settings):
+    settings.ROOM_FACET_INDEX_ENABLED = False
+    first = _facets(api_client, {"property_types": ["house", "flat"], "furnished": "1"})
+
+    with CaptureQueriesContext(connection) as ctx:
+        # same filters, different spelling and order
+        again = _facets(api_client, {"furnished": "yes", "property_types": ["flat", "house"]})
+    assert again == first
+    assert ctx.captured_queries == []
+
+
+def test_index_answers_follow_room_changes(api_client, rooms):
+    assert _facets(api_client)["count"] == 4
+    rooms[0].soft_delete()
+    assert _facets(api_client)["count"] == 3
+
+
+def test_invalid_filters_are_rejected(api_client, rooms):
+    r = api_client.get(reverse("v1:search-room-facets"), {"rooms_min": "3", "rooms_max": "1"})
+    assert r.status_code == 400
+    assert "rooms_min" in str(r.json())
@@ -0,0 +1,98 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from propertylist_app.models import MAP_CELL_ZOOM, Room
+from propertylist_app.validators import map_tile_quadkey
+
+
+pytestmark = pytest.mark.django_db
+
+UK = "-8.0,49.5,2.0,59.0"
+
+
+@pytest.fixture
+def rooms(room_factory):
+    first = room_factory(title="Westminster", price_per_month="900.00", latitude=51.5010, longitude=-0.1416)
+    owner = first.property_owner
+    return [
+        first,
+        room_factory(property_owner=owner, title="Pimlico", price_per_month="700.00", latitude=51.4890, longitude=-0.1340),
+        room_factory(property_owner=owner, title="Manchester", price_per_month="500.00", latitude=53.4794, longitude=-2.2453),
+        room_factory(property_owner=owner, title="Hidden", latitude=51.5000, longitude=-0.1400, status="hidden"),
+        room_factory(property_owner=owner, title="Nowhere"),
+    ]
+
+
+def _map(client, **params):
+    r = client.get(reverse("v1:rooms-map"), params)
+    assert r.status_code == 200, r.content
+    return r.json()["data"]
+
+
+def test_map_cell_follows_coordinates(rooms):
+    room = rooms[0]
+    assert room.map_cell == map_tile_quadkey(51.5010, -0.1416, MAP_CELL_ZOOM)
+    assert len(room.map_cell) == MAP_CELL_ZOOM
+    assert rooms[4].map_cell == ""
+
+    room.latitude, room.longitude = 53.4794, -2.2453
+    room.save(update_fields=["latitude", "longitude"])
+    assert Room.objects.get(pk=room.pk).map_cell == rooms[2].map_cell
+
+
+def test_zoomed_out_returns_clusters_from_one_query(api_client, rooms):
+    with CaptureQueriesContext(connection) as ctx:
+        data = _map(api_client, bbox=UK, zoom=6)
+    assert len([q for q in ctx.captured_queries if "propertylist_app_room" in q["sql"]]) == 1
+
+    assert data["mode"] == "clusters"
+    assert data["pins"] == []
+    assert data["count"] == 3
+    by_count = sorted(data["clusters"], key=lambda c: c["count"])
+    manchester, london = by_count
+    assert london["count"] == 2
+    assert london["min_price"] == "700.00"
+    assert london["latitude"] == pytest.approx((51.5010 + 51.4890) / 2)
+    assert manchester == {
+        "cell": rooms[2].map_cell[:9],
+        "count": 1,
+        "latitude": pytest.approx(53.4794),
+        "longitude": pytest.approx(-2.2453),
+        "min_price": "500.00",
+    }
+
+
+def test_zoomed_in_returns_pins(api_client, rooms):
+    data = _map(api_client, bbox="-0.16,51.48,-0.12,51.51", zoom=16)
+    assert data["mode"] == "pins"
+    assert data["clusters"] == []
+    assert {p["id"]: p["price_per_month"] for p in data["pins"]} == {rooms[0].id: "900.00", rooms[1].id: "700.00"}
+
+
+def test_pins_are_capped(api_client, rooms, settings):
+    settings.MAP_MAX_PINS = 1
+    data = _map(api_client, bbox="-0.16,51.48,-0.12,51.51", zoom=16)
+    assert len(data["pins"]) == 1
+    assert data["count"] == 2
+
+
+def test_search_filters_apply(api_client, rooms):
+    data = _map(api_client, bbox=UK, zoom=6, max_price="800")
+    assert data["count"] == 2
+    assert {c["min_price"] for c in data["clusters"]} == {"700.00", "500.00"}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"zoom": 6},
+        {"bbox": "1,2,3", "zoom": 6},
+        {"bbox": "2.0,49.5,-8.0,59.0", "zoom": 6},
+        {"bbox": UK, "zoom": "far"},
+        {"bbox": UK, "zoom": 30},
+    ],
+)
+def test_invalid_viewport_is_rejected(api_client, params):
+    assert api_client.get(reverse("v1:rooms-map"), params).status_code == 400
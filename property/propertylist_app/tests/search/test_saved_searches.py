@@ -0,0 +1,186 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notifications.models import NotificationTemplate, OutboundNotification
+from propertylist_app.models import PostcodeCentroid, Room, SavedSearch, SavedSearchKey, SavedSearchMatch
+from propertylist_app.services import saved_searches
+from propertylist_app.services.saved_searches import candidate_saved_searches, notify_saved_search_matches
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def match_template():
+    return NotificationTemplate.objects.create(
+        key="saved_search.match",
+        subject="New room for {{ saved_search_name }}",
+        body="{{ room_title }}",
+    )
+
+
+@pytest.fixture
+def owner(user_factory):
+    return user_factory(username="landlord", email="landlord@example.com")
+
+
+def _save(client, query_string, name="alert"):
+    return client.post(
+        reverse("v1:my-saved-searches"),
+        {"name": name, "query_string": query_string},
+        format="json",
+    )
+
+
+def _alerts(user):
+    return OutboundNotification.objects.filter(user=user, template_key="saved_search.match")
+
+
+def test_room_going_live_alerts_matching_searches_once(
+    auth_client, user, owner, room_factory, django_capture_on_commit_callbacks
+):
+    assert _save(auth_client, "max_price=900&furnished=true", name="cheap").status_code == 201
+    assert _save(auth_client, "property_types=house").status_code == 201
+
+    with django_capture_on_commit_callbacks(execute=True):
+        room = room_factory(property_owner=owner, title="Cosy", price_per_month="800.00", furnished=True)
+
+    alerts = list(_alerts(user))
+    assert len(alerts) == 1
+    assert alerts[0].context["room_id"] == room.id
+    assert alerts[0].context["saved_search_name"] == "cheap"
+
+    # hidden and shown again: already alerted
+    with django_capture_on_commit_callbacks(execute=True):
+        room.status = "hidden"
+        room.save()
+        room.status = "active"
+        room.save()
+    assert _alerts(user).count() == 1
+
+
+def test_non_live_and_own_rooms_do_not_alert(
+    auth_client, user, owner, room_factory, django_capture_on_commit_callbacks
+):
+    assert _save(auth_client, "max_price=900").status_code == 201
+
+    with django_capture_on_commit_callbacks(execute=True):
+        room_factory(property_owner=owner, title="Draft", status="draft")
+        room_factory(property_owner=user, title="Mine")
+    assert _alerts(user).count() == 0
+
+
+def test_stored_liveness_is_only_read_by_saves_that_can_change_it(
+    auth_client, user, owner, room_factory, django_capture_on_commit_callbacks
+):
+    assert _save(auth_client, "max_price=900").status_code == 201
+    draft = room_factory(property_owner=owner, title="Later", price_per_month="800.00", status="draft")
+
+    room = Room.objects.get(pk=draft.pk)
+    # loading rooms does no liveness work
+    assert not hasattr(room, "_was_live")
+
+    with CaptureQueriesContext(connection) as ctx:
+        room.title = "Renamed"
+        room.save(update_fields=["title"])
+    room_reads = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('SELECT "propertylist_app_room"')]
+    assert room_reads == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        room.status = "active"
+        room.save(update_fields=["status"])
+    assert _alerts(user).count() == 1
+
+
+def test_concurrent_match_runs_alert_once(auth_client, user, owner, room_factory, monkeypatch):
+    assert _save(auth_client, "max_price=900").status_code == 201
+    room = room_factory(property_owner=owner, title="Race", price_per_month="800.00")
+    SavedSearchMatch.objects.all().delete()
+    _alerts(user).delete()
+
+    real_matches = saved_searches._matches_exactly
+
+    def other_run_inserts_first(saved_search, room):
+        # the other task (approve, then save) records the match after our dedupe read
+        SavedSearchMatch.objects.get_or_create(saved_search=saved_search, room=room)
+        return real_matches(saved_search, room)
+
+    monkeypatch.setattr(saved_searches, "_matches_exactly", other_run_inserts_first)
+    assert notify_saved_search_matches(room.pk) == 0
+    assert _alerts(user).count() == 0
+
+
+def test_matches_are_not_recorded_while_the_template_is_inactive(
+    auth_client, user, owner, room_factory, match_template
+):
+    assert _save(auth_client, "max_price=900").status_code == 201
+    match_template.is_active = False
+    match_template.save()
+    room = room_factory(property_owner=owner, title="Quiet", price_per_month="800.00")
+
+    assert notify_saved_search_matches(room.pk) == 0
+    assert not SavedSearchMatch.objects.filter(room=room).exists()
+
+    match_template.is_active = True
+    match_template.save()
+    assert notify_saved_search_matches(room.pk) == 1
+    assert _alerts(user).count() == 1
+
+
+def test_inverted_index_narrows_candidates(auth_client, owner, room_factory):
+    PostcodeCentroid.objects.create(postcode="SW1A 1AA", latitude=51.501, longitude=-0.1416)
+    PostcodeCentroid.objects.create(postcode="M1 1AE", latitude=53.4794, longitude=-2.2453)
+
+    for query in (
+        "max_price=900&furnished=true",
+        "min_price=1000",
+        "furnished=false",
+        "postcode=SW1A 1AA&radius_miles=5",
+        "postcode=M1 1AE&radius_miles=5",
+        "q=garden",
+    ):
+        assert _save(auth_client, query).status_code == 201
+
+    room = room_factory(
+        property_owner=owner,
+        price_per_month="800.00",
+        furnished=True,
+        latitude=51.5,
+        longitude=-0.14,
+        status="draft",
+    )
+    assert SavedSearchKey.objects.filter(dimension="cell").exists()
+
+    candidates = {tuple(sorted(s.query)) for s in candidate_saved_searches(room)}
+    # price/furnished/location keys rule out three searches; free text is only checked exactly
+    assert candidates == {("furnished", "max_price"), ("postcode", "radius_miles"), ("q",)}
+
+
+def test_saved_search_api(auth_client, user, user2):
+    r = _save(auth_client, "furnished=yes&max_price=900&limit=20&ordering=price_asc", name="flats")
+    assert r.status_code == 201, r.content
+    saved = SavedSearch.objects.get(user=user)
+    assert saved.query == {"furnished": "yes", "max_price": "900"}
+    assert saved.dimension_count == 2
+
+    # same search in another order, with paging -> duplicate
+    r = _save(auth_client, "max_price=900&furnished=yes&offset=20")
+    assert r.status_code == 400
+
+    assert _save(auth_client, "rooms_min=3&rooms_max=1").status_code == 400
+    assert _save(auth_client, "limit=10").status_code == 400
+
+    r = auth_client.get(reverse("v1:my-saved-searches"))
+    assert r.status_code == 200
+    assert r.json()["data"]["count"] == 1
+
+    url = reverse("v1:my-saved-search-detail", args=[saved.pk])
+    other = auth_client.__class__()
+    other.force_authenticate(user2)
+    assert other.delete(url).status_code == 404
+
+    assert auth_client.delete(url).status_code == 204
+    assert not SavedSearch.objects.exists()
+    assert not SavedSearchKey.objects.exists()
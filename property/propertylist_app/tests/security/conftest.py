@@ -0,0 +1,71 @@
+import pytest
+from django.core.cache.backends.redis import RedisCacheClient
+
+
+class FakeRedis:
+    """
+    Just enough of a redis client for the pipelined counter paths: only
+    pipelines, so a per-key cache.add/incr/touch fallback fails against it.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.round_trips = 0
+        self.commands = []
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def flushdb(self):
+        self.data.clear()
+        self.ttls.clear()
+        return True
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.ops.append((name, args))
+        return queue
+
+    def execute(self):
+        self.client.round_trips += 1
+        out = []
+        for name, args in self.ops:
+            self.client.commands.append(name)
+            data = self.client.data
+            if name in ("incr", "incrby"):
+                data[args[0]] = data.get(args[0], 0) + (args[1] if len(args) > 1 else 1)
+                out.append(data[args[0]])
+            elif name == "decrby":
+                data[args[0]] = data.get(args[0], 0) - args[1]
+                out.append(data[args[0]])
+            elif name == "get":
+                value = data.get(args[0])
+                out.append(None if value is None else str(value).encode())
+            elif name == "expire":
+                self.client.ttls[args[0]] = args[1]
+                out.append(True)
+            else:
+                out.append(True)
+        return out
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def redis_default_cache(fake_redis, settings, monkeypatch):
+    """The default cache is a real RedisCache whose connection is a FakeRedis."""
+    monkeypatch.setattr(RedisCacheClient, "get_client", lambda self, key=None, *, write=False: fake_redis)
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://127.0.0.1:6379/9"}
+    }
+    return fake_redis
@@ -0,0 +1,125 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from propertylist_app.api import throttling
+from propertylist_app.api.throttling import (
+    AnonCounterThrottle,
+    CounterRateThrottle,
+    ScopedCounterThrottle,
+)
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TwoScopeView(APIView):
+    permission_classes = []
+    authentication_classes = []
+    throttle_classes = [AnonCounterThrottle, ScopedCounterThrottle]
+    throttle_scope = "test-scope"
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+@pytest.fixture
+def rates(settings):
+    api_settings.reload()
+    throttle_rates = settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    saved = dict(throttle_rates)
+    throttle_rates.update({"anon": "100/hour", "test-scope": "2/hour"})
+    yield
+    throttle_rates.clear()
+    throttle_rates.update(saved)
+
+
+def _call(ip="198.51.100.20"):
+    request = APIRequestFactory().get("/x/", REMOTE_ADDR=ip)
+    request.user = AnonymousUser()
+    return TwoScopeView.as_view()(request)
+
+
+def test_all_scopes_in_one_pipelined_round_trip(rates, fake_redis, monkeypatch):
+    monkeypatch.setattr(throttling, "redis_client", lambda c: fake_redis)
+
+    assert _call().status_code == 200
+    assert fake_redis.round_trips == 1
+    # two scopes: INCRBY + EXPIRE on the current window, GET on the previous one
+    assert sorted(fake_redis.commands) == sorted(["incrby", "expire", "get"] * 2)
+
+
+def test_scope_limit_and_denied_requests_do_not_count(rates, fake_redis, monkeypatch):
+    monkeypatch.setattr(throttling, "redis_client", lambda c: fake_redis)
+
+    assert _call().status_code == 200
+    assert _call().status_code == 200
+    denied = _call()
+    assert denied.status_code == 429
+    assert int(denied["Retry-After"]) > 0
+
+    # throttled request handed back its increment
+    scope_counters = [v for k, v in fake_redis.data.items() if "test-scope" in k]
+    assert scope_counters == [2]
+
+    # another client has its own bucket
+    assert _call(ip="198.51.100.21").status_code == 200
+
+
+def test_redis_backend_behind_the_cache_proxy_takes_the_pipeline(rates, redis_default_cache):
+    # SimpleRateThrottle.cache is the django.core.cache proxy, not the backend;
+    # FakeRedis only implements pipeline(), so any per-key fallback call fails here
+    assert [_call().status_code for _ in range(3)] == [200, 200, 429]
+    # one round trip per request, plus the give-back of the throttled one
+    assert redis_default_cache.round_trips == 4
+
+
+def test_locmem_fallback_counts_the_same(rates):
+    cache.clear()
+    assert [_call().status_code for _ in range(3)] == [200, 200, 429]
+
+
+def _throttle(num_requests, duration=60):
+    t = CounterRateThrottle.__new__(CounterRateThrottle)
+    t.rate, t.num_requests, t.duration = f"{num_requests}/m", num_requests, duration
+    t.key = "throttle:unit:1"
+    t.cache = cache
+    return t
+
+
+def test_sliding_window_weights_previous_window(settings):
+    cache.clear()
+    settings.THROTTLE_ALGORITHM = "sliding"
+    t = _throttle(2)
+
+    # two requests late in window 0
+    assert throttling.evaluate_counter_throttles([t], 59)[t.key][0] is True
+    assert throttling.evaluate_counter_throttles([t], 59)[t.key][0] is True
+    # just after the boundary the previous window still counts ~fully
+    allowed, wait = throttling.evaluate_counter_throttles([t], 61)[t.key]
+    assert allowed is False and wait > 0
+    # once most of window 0 has slid out, requests are allowed again
+    assert throttling.evaluate_counter_throttles([t], 100)[t.key][0] is True
+
+
+def test_fixed_window_resets_at_boundary(settings):
+    cache.clear()
+    settings.THROTTLE_ALGORITHM = "fixed"
+    t = _throttle(2)
+
+    assert throttling.evaluate_counter_throttles([t], 59)[t.key][0] is True
+    assert throttling.evaluate_counter_throttles([t], 59)[t.key][0] is True
+    assert throttling.evaluate_counter_throttles([t], 59)[t.key][0] is False
+    assert throttling.evaluate_counter_throttles([t], 61)[t.key][0] is True
+
+
+def test_cache_outage_fails_open(rates, monkeypatch):
+    def down(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(throttling, "evaluate_counter_throttles", down)
+    assert [_call().status_code for _ in range(3)] == [200, 200, 200]
@@ -0,0 +1,115 @@
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from propertylist_app.services import security
+from propertylist_app.services.security import (
+    clear_login_failures,
+    client_ip,
+    is_locked_out,
+    register_login_failure,
+)
+
+
+@pytest.fixture
+def limits(settings):
+    settings.LOGIN_FAIL_LIMIT = 3
+    settings.LOGIN_IP_FAIL_LIMIT = 5
+    settings.LOGIN_LOCKOUT_SECONDS = 600
+
+
+def test_record_reports_lockout_once_limit_is_exceeded(limits):
+    results = [register_login_failure("203.0.113.1", "alice") for _ in range(4)]
+    assert results == [False, False, False, True]
+    assert is_locked_out("203.0.113.1", "alice")
+    # the username is locked from any address
+    assert is_locked_out("198.51.100.9", "ALICE")
+
+
+def test_counters_are_plain_integers(limits):
+    register_login_failure("203.0.113.1", "alice")
+    register_login_failure("203.0.113.1", "alice")
+    assert cache.get(security._user_key("alice")) == 2
+    assert cache.get(security._ip_key("203.0.113.1")) == 2
+
+
+def test_ip_limit_covers_many_usernames(limits):
+    for i in range(5):
+        assert register_login_failure("203.0.113.2", f"user{i}") is False
+    assert register_login_failure("203.0.113.2", "user5") is True
+    assert is_locked_out("203.0.113.2", "someone-new")
+    assert not is_locked_out("203.0.113.3", "someone-new")
+
+
+def test_ip_counter_is_off_unless_configured(settings):
+    settings.LOGIN_FAIL_LIMIT = 3
+    settings.LOGIN_IP_FAIL_LIMIT = 0
+    for i in range(30):
+        register_login_failure("203.0.113.7", f"user{i}")
+
+    assert cache.get(security._ip_key("203.0.113.7")) is None
+    assert not is_locked_out("203.0.113.7", "someone-new")
+
+
+def test_client_ip_trusts_only_the_configured_proxies(settings):
+    rf = RequestFactory()
+    request = rf.post("/", REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="6.6.6.6, 198.51.100.20")
+
+    settings.TRUSTED_PROXY_COUNT = 0
+    assert client_ip(request) == "10.0.0.2"
+
+    # one proxy: its own entry is the last one, the spoofed one on the left is ignored
+    settings.TRUSTED_PROXY_COUNT = 1
+    assert client_ip(request) == "198.51.100.20"
+
+    settings.TRUSTED_PROXY_COUNT = 3
+    assert client_ip(request) == "10.0.0.2"
+
+
+def test_success_clears_username_but_not_ip(limits):
+    for _ in range(3):
+        register_login_failure("203.0.113.4", "bob")
+    clear_login_failures("203.0.113.4", "bob")
+
+    assert cache.get(security._user_key("bob")) is None
+    assert cache.get(security._ip_key("203.0.113.4")) == 3
+
+
+def test_long_usernames_get_fixed_size_keys(limits):
+    assert len(security._user_key("x" * 5000)) == len(security._user_key("y"))
+
+
+def test_concurrent_first_failure_is_not_lost(limits, monkeypatch):
+    key = security._user_key("dave")
+    real_incr = cache.incr
+    calls = []
+
+    def racing_incr(k, delta=1):
+        calls.append(k)
+        if len(calls) == 1:
+            # another request creates the counter between our incr() and add()
+            cache.add(k, 1, 600)
+            raise ValueError(k)
+        return real_incr(k, delta)
+
+    monkeypatch.setattr(security.cache, "incr", racing_incr)
+    assert security._incr_with_ttl([key], 600) == [2]
+    assert cache.get(key) == 2
+
+
+def test_redis_backend_counts_both_keys_in_one_round_trip(limits, redis_default_cache):
+    results = [register_login_failure("203.0.113.6", "erin") for _ in range(4)]
+    assert results == [False, False, False, True]
+    assert redis_default_cache.round_trips == 4
+    assert sorted(redis_default_cache.data.values()) == [4, 4]
+    assert set(redis_default_cache.ttls.values()) == {600}
+
+
+def test_cache_outage_fails_open(limits, monkeypatch):
+    def down(*args, **kwargs):
+        raise ConnectionError("cache down")
+
+    monkeypatch.setattr(security.cache, "get_many", down)
+    monkeypatch.setattr(security, "_incr_with_ttl", down)
+    assert register_login_failure("203.0.113.5", "carol") is False
+    assert is_locked_out("203.0.113.5", "carol") is False
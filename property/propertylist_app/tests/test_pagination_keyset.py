@@ -0,0 +1,93 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from propertylist_app.models import MessageThread, Message, Notification
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _thread_with_messages(n):
+    u1 = User.objects.create_user(username="keyset_a", email="ka@x.com", password="pass12345")
+    u2 = User.objects.create_user(username="keyset_b", email="kb@x.com", password="pass12345")
+
+    thread = MessageThread.objects.create()
+    thread.participants.set([u1, u2])
+
+    for i in range(n):
+        Message.objects.create(thread=thread, sender=u1, body=f"Message {i+1}")
+
+    # same timestamp everywhere: only the id tie-breaker keeps pages stable
+    Message.objects.filter(thread=thread).update(created=timezone.now())
+
+    client = APIClient()
+    client.force_authenticate(user=u1)
+    return client, thread
+
+
+def test_messages_cursor_walks_forward_and_back_without_gaps():
+    client, thread = _thread_with_messages(7)
+    url = reverse("v1:thread-messages", kwargs={"thread_id": thread.pk})
+
+    r1 = client.get(url, {"cursor": "", "limit": 3})
+    assert r1.status_code == 200
+    body1 = r1.json()
+    assert body1["ok"] is True
+    assert body1["meta"]["count"] is None
+    assert body1["meta"]["previous"] is None
+    assert "offset=" not in body1["meta"]["next"]
+
+    seen = [m["id"] for m in body1["data"]]
+    next_url = body1["meta"]["next"]
+    pages = [body1]
+    while next_url:
+        body = client.get(next_url).json()
+        pages.append(body)
+        seen.extend(m["id"] for m in body["data"])
+        next_url = body["meta"]["next"]
+
+    expected = list(
+        Message.objects.filter(thread=thread).order_by("-created", "-id").values_list("id", flat=True)
+    )
+    assert seen == expected
+    assert [len(p["data"]) for p in pages] == [3, 3, 1]
+
+    # previous from the last page gives back the middle page exactly
+    back = client.get(pages[-1]["meta"]["previous"]).json()
+    assert [m["id"] for m in back["data"]] == [m["id"] for m in pages[1]["data"]]
+    assert back["meta"]["next"]
+
+
+def test_cursor_exact_count_and_invalid_cursor():
+    client, thread = _thread_with_messages(4)
+    url = reverse("v1:thread-messages", kwargs={"thread_id": thread.pk})
+
+    r = client.get(url, {"cursor": "", "count": "exact", "limit": 2})
+    assert r.status_code == 200
+    assert r.json()["meta"]["count"] == 4
+
+    r = client.get(url, {"cursor": "not-a-cursor"})
+    assert r.status_code == 404
+
+
+def test_notifications_cursor_mode_keeps_envelope():
+    user = User.objects.create_user(username="keyset_n", password="pass12345")
+    for i in range(5):
+        Notification.objects.create(user=user, type="message", title=f"N{i}", body="b", is_read=i % 2 == 0)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("v1:notifications-list")
+
+    offset_ids = [n["id"] for n in client.get(url, {"limit": 10}).json()["results"]]
+
+    r1 = client.get(url, {"cursor": "", "limit": 2}).json()
+    r2 = client.get(r1["next"]).json()
+    r3 = client.get(r2["next"]).json()
+
+    assert r1["ok"] is True and "results" in r1
+    assert [n["id"] for n in r1["results"] + r2["results"] + r3["results"]] == offset_ids
+    assert r3["next"] is None
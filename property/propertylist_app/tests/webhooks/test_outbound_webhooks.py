@@ -0,0 +1,225 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from celery.exceptions import Retry
+from django.core.cache import cache
+
+from propertylist_app import tasks_webhooks
+from propertylist_app.services.http import close_pooled_sessions
+from propertylist_app.services.webhooks import (
+    WebhookDeferred,
+    WebhookDeliveryError,
+    _batch_key,
+    _in_flight_slot,
+    destination_for,
+    enqueue_webhook,
+    post_webhook,
+    take_webhook_batch,
+    webhook_batch_pending,
+)
+
+
+class _Receiver(ThreadingHTTPServer):
+    """Stub webhook receiver: records requests, answers with queued statuses (then 200)."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _ReceiverHandler)
+        self.requests = []
+        self.statuses = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+
+class _ReceiverHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests.append(
+            {"port": self.client_address[1], "headers": dict(self.headers), "json": json.loads(body)}
+        )
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver():
+    # pooled sessions are per destination and per process: drop keep-alive
+    # connections to an earlier test's receiver that may have had this port
+    close_pooled_sessions()
+    server = _Receiver()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    close_pooled_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+def test_deliveries_reuse_one_pooled_connection(receiver):
+    for i in range(3):
+        result = tasks_webhooks.deliver_webhook.delay(receiver.url, {"n": i}, {"X-Event": "room.updated"}).get()
+        assert result["status"] == 200
+
+    assert [r["json"] for r in receiver.requests] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert receiver.requests[0]["headers"]["X-Event"] == "room.updated"
+    assert len({r["port"] for r in receiver.requests}) == 1
+
+
+def test_server_errors_are_retried_and_client_errors_are_not(receiver):
+    receiver.statuses = [503]
+    with pytest.raises(Retry, match="503"):
+        tasks_webhooks.deliver_webhook.delay(receiver.url, {"n": 1})
+
+    receiver.statuses = [400]
+    with pytest.raises(WebhookDeliveryError, match="400"):
+        tasks_webhooks.deliver_webhook.delay(receiver.url, {"n": 2})
+    assert len(receiver.requests) == 2
+
+
+def test_failing_destination_opens_its_circuit(receiver, settings):
+    settings.WEBHOOK_BREAKER_FAILURES = 2
+    receiver.statuses = [500, 502]
+
+    for _ in range(2):
+        with pytest.raises(WebhookDeliveryError) as exc_info:
+            post_webhook(receiver.url, {})
+        assert not isinstance(exc_info.value, WebhookDeferred)
+
+    with pytest.raises(WebhookDeferred) as exc_info:
+        post_webhook(receiver.url, {})
+    assert exc_info.value.retry_after == settings.WEBHOOK_BREAKER_RESET_SECONDS
+    assert len(receiver.requests) == 2
+
+    # other destinations are unaffected
+    assert post_webhook(receiver.url.replace("127.0.0.1", "localhost"), {}) == 200
+
+
+def test_busy_destination_defers_without_a_request(receiver, settings):
+    settings.WEBHOOK_MAX_IN_FLIGHT = 1
+
+    with _in_flight_slot(destination_for(receiver.url), hold_seconds=30):
+        with pytest.raises(WebhookDeferred, match="busy"):
+            post_webhook(receiver.url, {})
+    assert receiver.requests == []
+
+    assert post_webhook(receiver.url, {}) == 200
+
+
+def test_deferrals_do_not_use_up_the_failure_budget(receiver, settings):
+    settings.WEBHOOK_MAX_IN_FLIGHT = 1
+
+    with _in_flight_slot(destination_for(receiver.url), hold_seconds=30):
+        # long after the failure budget would have run out, a busy destination still defers
+        with pytest.raises(Retry) as exc_info:
+            tasks_webhooks.deliver_webhook.apply(args=[receiver.url, {"n": 1}], retries=50, throw=True)
+    assert exc_info.value.sig.kwargs["failures"] == 0
+    assert receiver.requests == []
+
+    receiver.statuses = [503]
+    with pytest.raises(WebhookDeliveryError, match="503"):
+        tasks_webhooks.deliver_webhook.apply(
+            args=[receiver.url, {"n": 2}],
+            kwargs={"failures": tasks_webhooks.MAX_FAILURES - 1},
+            throw=True,
+        )
+
+
+def test_deferrals_stop_at_the_deadline(receiver, settings, caplog):
+    settings.WEBHOOK_MAX_IN_FLIGHT = 1
+    settings.WEBHOOK_DEFER_MAX_SECONDS = 3600
+
+    with _in_flight_slot(destination_for(receiver.url), hold_seconds=30):
+        with pytest.raises(Retry) as first:
+            tasks_webhooks.deliver_webhook.apply(args=[receiver.url, {"n": 1}], throw=True)
+        first_attempt_at = first.value.sig.kwargs["first_attempt_at"]
+
+        # the retry keeps the original start, so the deadline is not pushed back
+        with pytest.raises(Retry) as second:
+            tasks_webhooks.deliver_webhook.apply(
+                args=[receiver.url, {"n": 1}], kwargs=first.value.sig.kwargs, throw=True
+            )
+        assert second.value.sig.kwargs["first_attempt_at"] == first_attempt_at
+
+        with pytest.raises(WebhookDeferred):
+            tasks_webhooks.deliver_webhook.apply(
+                args=[receiver.url, {"n": 1}], kwargs={"first_attempt_at": first_attempt_at - 3600}, throw=True
+            )
+    assert "dead-lettered" in caplog.text
+    assert receiver.requests == []
+
+
+def test_batched_events_are_sent_together(receiver, settings, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        tasks_webhooks.flush_webhook_batch,
+        "apply_async",
+        lambda args, countdown: scheduled.append((args, countdown)),
+    )
+    settings.WEBHOOK_BATCH_MAX_EVENTS = 2
+
+    for i in range(3):
+        enqueue_webhook(receiver.url, {"n": i}, batch=True)
+    assert scheduled == [([receiver.url, None], settings.WEBHOOK_BATCH_WINDOW_SECONDS)]
+    assert receiver.requests == []
+
+    monkeypatch.undo()
+    tasks_webhooks.flush_webhook_batch.delay(receiver.url, None)
+
+    # two events per request; the remainder is flushed straight after
+    assert [r["json"] for r in receiver.requests] == [
+        {"events": [{"n": 0}, {"n": 1}]},
+        {"events": [{"n": 2}]},
+    ]
+    assert tasks_webhooks.flush_webhook_batch.delay(receiver.url, None).get() == {"events": 0}
+
+
+@pytest.fixture
+def unscheduled_flushes(monkeypatch):
+    monkeypatch.setattr(tasks_webhooks.flush_webhook_batch, "apply_async", lambda *args, **kwargs: None)
+    return "http://127.0.0.1:9/hook"
+
+
+def test_flush_does_not_skip_an_event_still_being_written(unscheduled_flushes):
+    url = unscheduled_flushes
+    enqueue_webhook(url, {"n": 1}, batch=True)
+
+    # a second writer has taken its number (incr) but not written the payload yet
+    key = _batch_key(url, None)
+    seq = cache.incr(f"{key}:seq")
+    assert take_webhook_batch(url) == [{"n": 1}]
+    assert webhook_batch_pending(url)
+
+    cache.set(f"{key}:event:{seq}", {"n": 2})
+    enqueue_webhook(url, {"n": 3}, batch=True)
+    assert take_webhook_batch(url) == [{"n": 2}, {"n": 3}]
+    assert not webhook_batch_pending(url)
+
+
+def test_event_missing_on_two_flushes_is_given_up(unscheduled_flushes):
+    url = unscheduled_flushes
+    key = _batch_key(url, None)
+    cache.add(f"{key}:seq", 0)
+    cache.incr(f"{key}:seq")  # the writer died before writing its payload
+    enqueue_webhook(url, {"n": 2}, batch=True)
+
+    assert take_webhook_batch(url) == []
+    assert take_webhook_batch(url) == [{"n": 2}]
+    assert not webhook_batch_pending(url)
+
+
+def test_unbatched_enqueue_delivers_directly(receiver):
+    enqueue_webhook(receiver.url, {"n": 1})
+    assert [r["json"] for r in receiver.requests] == [{"n": 1}]
@@ -1,10 +1,33 @@
 import hashlib
 import json
+import logging
+import time
 from typing import Any, Dict, Optional
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
 from django.conf import settings
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
 from django.utils.encoding import force_bytes
 
+from property.instrumentation import record_cache_lookup
+from propertylist_app.models import Room, SavedRoom
+
+logger = logging.getLogger(__name__)
+
+def redis_client(backend=None):
+    """
+    The redis-py client (write connection) behind a RedisCache, or None for any
+    other backend. django.core.cache.cache and SimpleRateThrottle.cache are
+    ConnectionProxy objects, so the proxy is resolved to its backend first.
+    """
+    backend = cache if backend is None else backend
+    if isinstance(backend, ConnectionProxy):
+        backend = caches[backend._alias]
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)
+    return None
+
 BUSTER_KEY = f"{getattr(settings, 'CACHE_KEY_PREFIX', 'rentout')}:rooms:buster"
 
 def get_buster() -> str:
@@ -29,6 +52,62 @@ def bump_buster() -> None:
         # worst case, just overwrite
         cache.set(BUSTER_KEY, "1", None)
 
+def _user_version_key(user_id) -> str:
+    return f"{getattr(settings, 'CACHE_KEY_PREFIX', 'rentout')}:user:{user_id}:version"
+
+def get_user_version(user_id) -> str:
+    """
+    Per-user counterpart of get_buster(): part of every per-user cache key, bumped
+    whenever that user's data changes (see bump_user_version and signals.py).
+
+    A missing counter starts from the clock rather than 1, so a counter that was
+    evicted can never come back at a value old cached entries were stored under.
+    """
+    key = _user_version_key(user_id)
+    val = cache.get(key)
+    if val is None:
+        val = time.time_ns() // 1000
+        if not cache.add(key, val, None):
+            val = cache.get(key, val)
+    return str(val)
+
+def _incr_user_versions(user_ids) -> None:
+    for user_id in user_ids:
+        try:
+            cache.incr(_user_version_key(user_id))
+        except ValueError:
+            # no counter yet -> nothing has been cached under it
+            pass
+        except Exception:
+            logger.warning("user cache version bump failed for user %s", user_id, exc_info=True)
+
+def bump_user_version(*user_ids) -> None:
+    """
+    Invalidate every per-user cached response of these users (atomic incr).
+
+    Bumped now and again when the surrounding transaction commits, so a GET
+    that runs in between cannot keep its pre-commit page under the new version.
+    """
+    user_ids = {u for u in user_ids if u}
+    if not user_ids:
+        return
+    _incr_user_versions(user_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _incr_user_versions(user_ids))
+
+def bump_room_audience_versions(room_ids) -> None:
+    """
+    bump_user_version() for the owners of these rooms (my listings) and everyone
+    who saved them (saved rooms). For queryset.update() call sites, which send
+    no post_save; call it before an update that changes the owner.
+    """
+    room_ids = list(room_ids)
+    if not room_ids:
+        return
+    owner_ids = Room.objects.filter(pk__in=room_ids).values_list("property_owner_id", flat=True)
+    saver_ids = SavedRoom.objects.filter(room_id__in=room_ids).values_list("user_id", flat=True)
+    bump_user_version(*owner_ids, *saver_ids)
+
 def _canonical_querydict(querydict) -> Dict[str, Any]:
     """
     Convert QueryDict to a normalized dict (sorted keys, single or list values).
@@ -46,7 +125,8 @@ def _canonical_querydict(querydict) -> Dict[str, Any]:
 def make_cache_key(prefix: str, path: str, request=None, extra: Optional[Dict[str, Any]] = None) -> str:
     """
     Build a stable cache key: prefix + path + normalized query + optional extras + buster.
-    We DO NOT include user id, because we only cache for anonymous GETs.
+    No user id here: per-user keys pass user + user version in `extra`
+    (CachedPerUserGETMixin).
     """
     base: Dict[str, Any] = {"path": path, "buster": get_buster()}
     if request is not None:
@@ -61,8 +141,9 @@ def make_cache_key(prefix: str, path: str, request=None, extra: Optional[Dict[st
     key_prefix = getattr(settings, "CACHE_KEY_PREFIX", "rentout")
     return f"{key_prefix}:{prefix}:{digest}"
 
-def get_cached_json(key: str):
+def get_cached_json(key: str, name: str = "views"):
     data = cache.get(key)
+    record_cache_lookup(name, data is not None)
     return data
 
 def set_cached_json(key: str, data, ttl: Optional[int] = None):
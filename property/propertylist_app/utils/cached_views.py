@@ -1,8 +1,30 @@
+import hashlib
 from typing import Optional
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from rest_framework.response import Response
 
-from .cache import make_cache_key, get_cached_json, set_cached_json
+from propertylist_app.api.renderers import wants_compact_envelope
+
+from .cache import make_cache_key, get_cached_json, set_cached_json, get_user_version
+
+
+def _etag_for(content: bytes) -> str:
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def _etag_matches(request, etag: str) -> bool:
+    """If-None-Match check (comma separated list, weak validators allowed, '*')."""
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
 
 
 class CachedAnonymousGETMixin:
@@ -10,7 +32,9 @@ class CachedAnonymousGETMixin:
     Drop-in mixin for DRF views:
     - Caches ONLY anonymous GET responses
     - Uses per-view prefix to isolate keys
-    - Stores/returns 'data' payload (JSON-serializable)
+    - Stores the final rendered bytes + an ETag (sha256 of the bytes),
+      so a hit is served without re-serialising or re-rendering
+    - Answers a matching If-None-Match with 304 (hit or miss)
     - Uses the global cache buster so when data changes,
       new keys are automatically used.
     """
@@ -19,6 +43,9 @@ class CachedAnonymousGETMixin:
     cache_ttl: Optional[int] = None  # override per-view
     cache_timeout: int = 60  # fallback default
 
+    # response headers kept alongside the cached bytes
+    cached_headers = ("Vary", "Allow")
+
     def _cache_should_use(self, request) -> bool:
         """Only use cache for anonymous GETs."""
         return request.method == "GET" and not request.user.is_authenticated
@@ -29,31 +56,115 @@ class CachedAnonymousGETMixin:
             return self.cache_ttl
         return getattr(settings, "CACHE_DEFAULT_TTL", self.cache_timeout)
 
+    def _cache_key_extra(self, request) -> dict:
+        # rendered bytes depend on the negotiated renderer (JSON vs browsable API)
+        # and on the envelope shape (full vs compact)
+        return {
+            "accept": getattr(request, "accepted_media_type", None),
+            "envelope": "compact" if wants_compact_envelope(request) else "full",
+        }
+
     def _make_key(self, request):
-        return make_cache_key(self.cache_prefix, request.path, request=request)
+        return make_cache_key(
+            self.cache_prefix,
+            request.path,
+            request=request,
+            extra=self._cache_key_extra(request),
+        )
+
+    def _cached_response(self, request):
+        """Serve from cache, or remember the key so finalize_response can store the result."""
+        if getattr(self, "_cache_checked", False):
+            return None  # get() already looked (ListAPIView.get -> list)
+        self._cache_checked = True
+        self._cache_store_key = None
+        if not self._cache_should_use(request):
+            return None
+
+        key = self._make_key(request)
+        cached = get_cached_json(key, name=self.cache_prefix)
+        if not (isinstance(cached, dict) and "body" in cached):
+            self._cache_store_key = key
+            return None
+
+        if _etag_matches(request, cached["etag"]):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(cached["body"], content_type=cached["content_type"])
+        response["ETag"] = cached["etag"]
+        for name, value in cached.get("headers", {}).items():
+            response[name] = value
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        key = getattr(self, "_cache_store_key", None)
+        if not key or not isinstance(response, Response) or response.status_code != 200:
+            return response
+
+        response.render()
+        etag = _etag_for(response.content)
+        set_cached_json(
+            key,
+            {
+                "body": response.content,
+                "content_type": response["Content-Type"],
+                "etag": etag,
+                "headers": {h: response[h] for h in self.cached_headers if response.has_header(h)},
+            },
+            ttl=self._cache_ttl(),
+        )
+        response["ETag"] = etag
+
+        if _etag_matches(request, etag):
+            not_modified = HttpResponseNotModified()
+            not_modified["ETag"] = etag
+            for h in self.cached_headers:
+                if response.has_header(h):
+                    not_modified[h] = response[h]
+            return not_modified
+        return response
 
     # For ListAPIView
     def list(self, request, *args, **kwargs):
-        if self._cache_should_use(request):
-            key = self._make_key(request)
-            cached = get_cached_json(key)
-            if cached is not None:
-                return Response(cached)
-            resp = super().list(request, *args, **kwargs)
-            if getattr(resp, "status_code", None) == 200:
-                set_cached_json(key, resp.data, ttl=self._cache_ttl())
-            return resp
+        cached = self._cached_response(request)
+        if cached is not None:
+            return cached
         return super().list(request, *args, **kwargs)
 
     # For RetrieveAPIView / APIView.get
     def get(self, request, *args, **kwargs):
-        if self._cache_should_use(request):
-            key = self._make_key(request)
-            cached = get_cached_json(key)
-            if cached is not None:
-                return Response(cached)
-            resp = super().get(request, *args, **kwargs)
-            if getattr(resp, "status_code", None) == 200:
-                set_cached_json(key, resp.data, ttl=self._cache_ttl())
-            return resp
+        cached = self._cached_response(request)
+        if cached is not None:
+            return cached
         return super().get(request, *args, **kwargs)
+
+
+# CachedAnonymousGETMixin for the signed-in user's own pages
+# (my listings, saved rooms, profile page, notifications, threads):
+# - Caches ONLY authenticated GET responses
+# - Key includes the user id and the user's version counter
+#   (utils.cache.get_user_version); signals.py bumps it whenever data the
+#   page is built from changes, so a repeat view is served from cache
+#   and a changed one is recomputed
+# - USER_RESPONSE_CACHE_TTL only bounds time-dependent fields
+#   (e.g. listing state by date, reviews passing reveal_at)
+# Views that define their own get() call self._cached_response(request) first.
+# (A comment, not a docstring: drf-spectacular would publish it as the view description.)
+class CachedPerUserGETMixin(CachedAnonymousGETMixin):
+    cache_prefix: str = "user"
+
+    def _cache_should_use(self, request) -> bool:
+        return request.method == "GET" and request.user.is_authenticated
+
+    def _cache_ttl(self) -> int:
+        if self.cache_ttl is not None:
+            return self.cache_ttl
+        return getattr(settings, "USER_RESPONSE_CACHE_TTL", self.cache_timeout)
+
+    def _cache_key_extra(self, request) -> dict:
+        extra = super()._cache_key_extra(request)
+        extra["user"] = request.user.pk
+        extra["user_version"] = get_user_version(request.user.pk)
+        return extra
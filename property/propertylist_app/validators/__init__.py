@@ -15,8 +15,10 @@ from .images import (
 # --- GEO ---
 from .geo import (
     normalize_uk_postcode,
+    normalize_uk_outward_code,
     validate_radius_miles,
     haversine_miles,
+    map_tile_quadkey,
 )
 
 # --- BOOKING ---
@@ -73,7 +75,7 @@ except NameError:
 
 __all__ = [
     # geo
-    "normalize_uk_postcode", "normalise_uk_postcode", "validate_radius_miles", "haversine_miles", "geocode_postcode",
+    "normalize_uk_postcode", "normalise_uk_postcode", "normalize_uk_outward_code", "validate_radius_miles", "haversine_miles", "map_tile_quadkey", "geocode_postcode",
     # booking
     "validate_no_booking_conflict",
     # images/files
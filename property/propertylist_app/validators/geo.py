@@ -14,6 +14,14 @@ _UK_POSTCODE_RE = re.compile(
     r" ?[0-9][ABD-HJLNP-UW-Z]{2})$"
 )
 
+# outward code only ("SW1A", "M1", "EC1V") - the part before the space
+_UK_OUTWARD_RE = re.compile(
+    r"^(?:[A-PR-UWYZ][0-9]{1,2}|"
+    r"[A-PR-UWYZ][A-HK-Y][0-9]{1,2}|"
+    r"[A-PR-UWYZ][0-9][A-HJKSTUW]|"
+    r"[A-PR-UWYZ][A-HK-Y][0-9][ABEHMNPRVWXY])$"
+)
+
 def normalize_uk_postcode(raw: str) -> str:
     """
     Basic UK postcode normalizer:
@@ -41,6 +49,26 @@ def normalize_uk_postcode(raw: str) -> str:
     s = s[:-3] + " " + s[-3:]
     return s.strip()
 
+def normalize_uk_outward_code(raw: str) -> str:
+    """
+    Partial postcode -> outward code ("sw1a" -> "SW1A").
+    Also accepts a full postcode and returns its outward part.
+    """
+    if not raw:
+        raise ValidationError("Postcode is required.")
+
+    s = "".join(
+        ch for ch in str(raw).upper().strip()
+        if ch in _UK_POSTCODE_CHARS
+    ).replace(" ", "")
+
+    if _UK_POSTCODE_RE.match(s):
+        return s[:-3]
+
+    if not _UK_OUTWARD_RE.match(s):
+        raise ValidationError("Invalid UK postcode.")
+    return s
+
 def validate_radius_miles(val, *, max_miles: int = 100) -> int:
     try:
         v = int(val)
@@ -62,3 +90,28 @@ def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float
     a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dl/2)**2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return round(R * c, 6)
+
+
+_MERCATOR_MAX_LAT = 85.05112878
+
+
+def map_tile_quadkey(lat: float, lon: float, zoom: int) -> str:
+    """
+    Quadkey of the Web-Mercator map tile containing (lat, lon) at `zoom`
+    (one digit 0-3 per zoom level). The first n digits are the containing
+    tile at zoom n, so truncating the key gives coarser grid cells.
+    """
+    lat = max(-_MERCATOR_MAX_LAT, min(_MERCATOR_MAX_LAT, lat))
+    x = (lon + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+
+    n = 1 << zoom
+    tx = min(max(int(x * n), 0), n - 1)
+    ty = min(max(int(y * n), 0), n - 1)
+
+    digits = []
+    for level in range(zoom, 0, -1):
+        mask = 1 << (level - 1)
+        digits.append(str((1 if tx & mask else 0) + (2 if ty & mask else 0)))
+    return "".join(digits)
@@ -1,4 +1,4 @@
-import json, urllib.request
+import json, urllib.error, urllib.request
 from django.core.exceptions import ValidationError
 
 # Low-level geocode that **does network I/O** (kept separate from pure validators).
@@ -7,7 +7,9 @@ from django.core.exceptions import ValidationError
 def geocode_postcode(postcode: str):
     """
     Dummy example using postcodes.io (UK). Replace with your real provider.
-    Returns (lat, lon) as floats or raises ValidationError.
+    Returns (lat, lon) as floats or raises ValidationError, with code
+    "postcode_not_found" when the provider does not know the postcode and
+    "geocode_unavailable" when it could not be asked.
     """
     if not postcode:
         raise ValidationError("Postcode required.")
@@ -15,9 +17,13 @@ def geocode_postcode(postcode: str):
     try:
         with urllib.request.urlopen(url, timeout=5) as resp:
             data = json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise ValidationError("Postcode not found.", code="postcode_not_found")
+        raise ValidationError("Failed to geocode postcode.", code="geocode_unavailable")
     except Exception:
-        raise ValidationError("Failed to geocode postcode.")
+        raise ValidationError("Failed to geocode postcode.", code="geocode_unavailable")
     if data.get("status") != 200 or not data.get("result"):
-        raise ValidationError("Postcode not found.")
+        raise ValidationError("Postcode not found.", code="postcode_not_found")
     res = data["result"]
     return float(res["latitude"]), float(res["longitude"])